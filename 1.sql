@@ -25,7 +25,8 @@ CREATE TABLE IF NOT EXISTS `chat_messages` (
   `username` varchar(50) NOT NULL,
   `message` text NOT NULL,
   `created_at` timestamp NULL DEFAULT current_timestamp(),
-  PRIMARY KEY (`id`)
+  PRIMARY KEY (`id`),
+  KEY `idx_chat_created_at` (`created_at`)
 ) ENGINE=InnoDB AUTO_INCREMENT=21 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_uca1400_ai_ci;
 
 -- 테이블 데이터 baemin.chat_messages:~20 rows (대략적) 내보내기
@@ -51,6 +52,21 @@ INSERT INTO `chat_messages` (`id`, `username`, `message`, `created_at`) VALUES
 	(19, '룰.렛.봇', '오늘 점심은 ㅁㄴㅇㄹ 님이 쏘세요', '2026-01-30 00:08:22'),
 	(20, 'dummy data', 'this message is auto-generated dummy message data for testing purpose', '2026-01-30 00:09:27');
 
+-- 테이블 baemin.data_versions 구조 내보내기
+CREATE TABLE IF NOT EXISTS `data_versions` (
+  `table_name` varchar(50) NOT NULL,
+  `version` bigint(20) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`table_name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_uca1400_ai_ci;
+
+-- 테이블 데이터 baemin.data_versions:~4 rows (대략적) 내보내기
+INSERT IGNORE INTO `data_versions` (`table_name`, `version`) VALUES
+	('chat_messages', 0),
+	('menus', 0),
+	('orders', 0),
+	('orders_history', 0),
+	('stores', 0);
+
 -- 테이블 baemin.menus 구조 내보내기
 CREATE TABLE IF NOT EXISTS `menus` (
   `id` int(11) NOT NULL AUTO_INCREMENT,
@@ -156,6 +172,22 @@ INSERT INTO `menus` (`id`, `store_id`, `menu_name`, `price`) VALUES
 	(94, 25, '치즈버거', 6800),
 	(95, 25, 'JG버거', 10200);
 
+-- 테이블 baemin.order_rounds 구조 내보내기 (점심 한 판 단위, closed_at이 NULL인 판이 지금 받는 중인 판)
+CREATE TABLE IF NOT EXISTS `order_rounds` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `started_at` timestamp NULL DEFAULT current_timestamp(),
+  `closed_at` timestamp NULL DEFAULT NULL,
+  `order_count` int(11) NOT NULL DEFAULT 0,
+  `eater_count` int(11) NOT NULL DEFAULT 0,
+  `total` bigint(20) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`id`),
+  KEY `idx_order_rounds_closed_at` (`closed_at`)
+) ENGINE=InnoDB AUTO_INCREMENT=2 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_uca1400_ai_ci;
+
+-- 테이블 데이터 baemin.order_rounds:~1 rows (대략적) 내보내기
+INSERT INTO `order_rounds` (`id`, `started_at`, `closed_at`) VALUES
+	(1, '2026-01-29 07:48:58', NULL);
+
 -- 테이블 baemin.orders 구조 내보내기
 CREATE TABLE IF NOT EXISTS `orders` (
   `id` int(11) NOT NULL AUTO_INCREMENT,
@@ -167,11 +199,15 @@ CREATE TABLE IF NOT EXISTS `orders` (
   `price` int(11) NOT NULL,
   `quantity` int(11) DEFAULT 1,
   `created_at` timestamp NULL DEFAULT current_timestamp(),
+  `round_id` int(11) DEFAULT NULL,
   PRIMARY KEY (`id`),
   KEY `FK_orders_stores` (`store_name`),
   KEY `FK_orders_menus` (`menu_name`),
   KEY `FK_orders_stores_id` (`store_id`),
   KEY `FK_orders_menus_id` (`menu_id`),
+  KEY `idx_orders_created_at` (`created_at`),
+  KEY `idx_orders_store_totals` (`store_id`,`price`,`quantity`),
+  KEY `idx_orders_round_id` (`round_id`),
   CONSTRAINT `FK_orders_menus_id` FOREIGN KEY (`menu_id`) REFERENCES `menus` (`id`) ON DELETE CASCADE,
   CONSTRAINT `FK_orders_stores_id` FOREIGN KEY (`store_id`) REFERENCES `stores` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB AUTO_INCREMENT=21 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_uca1400_ai_ci;
@@ -191,6 +227,39 @@ INSERT INTO `orders` (`id`, `eater_name`, `store_id`, `menu_id`, `store_name`, `
 	(14, 'asdf', 6, 25, '맥도날드 대구시지DT점', '1955버거', 7200, 8, '2026-01-29 08:26:59'),
 	(17, 'zxcvb', 14, 42, '김치찜은 못참지 경산점', '(단품)삼겹 김치찜', 23900, 1, '2026-01-29 08:28:53'),
 	(18, 'asdf', 21, 74, '삼국지', '광주식 짬짜면', 10000, 5, '2026-01-29 08:29:18');
+UPDATE `orders` SET `round_id` = 1 WHERE `round_id` IS NULL;
+
+-- 테이블 baemin.orders_history 구조 내보내기 (마감한 판의 주문 보관함, 가게/메뉴 이름은 마감 시점 기준)
+CREATE TABLE IF NOT EXISTS `orders_history` (
+  `id` int(11) NOT NULL,
+  `round_id` int(11) NOT NULL,
+  `eater_name` varchar(50) NOT NULL,
+  `store_id` int(11) NOT NULL,
+  `store_name` varchar(255) DEFAULT NULL,
+  `category` varchar(50) DEFAULT NULL,
+  `menu_id` int(11) NOT NULL,
+  `menu_name` varchar(255) DEFAULT NULL,
+  `price` int(11) NOT NULL,
+  `quantity` int(11) DEFAULT 1,
+  `created_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  KEY `idx_orders_history_round_id` (`round_id`),
+  KEY `idx_orders_history_store_id` (`store_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_uca1400_ai_ci;
+
+-- 테이블 baemin.store_totals 구조 내보내기 (가게별 주문 합계 요약, 주문을 쓸 때마다 갱신)
+CREATE TABLE IF NOT EXISTS `store_totals` (
+  `store_id` int(11) NOT NULL,
+  `total` bigint(20) NOT NULL DEFAULT 0,
+  `order_count` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`store_id`),
+  KEY `idx_store_totals_total` (`total`),
+  KEY `idx_store_totals_order_count` (`order_count`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_uca1400_ai_ci;
+
+-- 테이블 데이터 baemin.store_totals: orders에서 집계
+REPLACE INTO `store_totals` (`store_id`, `total`, `order_count`)
+SELECT `store_id`, SUM(`price` * `quantity`), COUNT(*) FROM `orders` GROUP BY `store_id`;
 
 -- 테이블 baemin.stores 구조 내보내기
 CREATE TABLE IF NOT EXISTS `stores` (
@@ -204,7 +273,8 @@ CREATE TABLE IF NOT EXISTS `stores` (
   `close_time` varchar(10) DEFAULT NULL,
   `created_at` timestamp NULL DEFAULT current_timestamp(),
   PRIMARY KEY (`id`),
-  KEY `name` (`name`)
+  KEY `name` (`name`),
+  KEY `idx_stores_category` (`category`)
 ) ENGINE=InnoDB AUTO_INCREMENT=26 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_uca1400_ai_ci;
 
 -- 테이블 데이터 baemin.stores:~19 rows (대략적) 내보내기
@@ -0,0 +1,95 @@
+import pandas as pd
+import streamlit as st
+import metrics
+from db import get_pool_stats, get_read_stats
+from snapshot import get_snapshot_stats
+from writer import get_writer_stats
+
+# ---------------------------------------------------------
+# 관리자 패널 (main.py?admin=1 로 접속했을 때만 표시)
+# ---------------------------------------------------------
+# 쿼리 통계는 프로세스 메모리에 쌓이므로 별도 페이지가 아니라
+# 실제로 사용자들이 붙어있는 main.py 프로세스 안에서 보여준다.
+
+def render_admin_panel():
+    st.subheader("🛠️ DB 쿼리 통계")
+
+    c1, c2, c3 = st.columns([2, 2, 1])
+    with c1:
+        threshold_ms = st.number_input(
+            "느린 쿼리 기준(ms)", min_value=1, step=50,
+            value=max(1, int(metrics.query_stats.slow_seconds * 1000)), key="admin_slow_ms",
+        )
+        metrics.query_stats.slow_seconds = threshold_ms / 1000
+    with c3:
+        if st.button("통계 초기화", use_container_width=True):
+            metrics.query_stats.reset()
+            st.rerun()
+
+    summary = metrics.query_stats.summary()
+    if summary:
+        summary_df = pd.DataFrame(summary)
+        summary_df["callers"] = summary_df["callers"].map(lambda callers: ", ".join(f"{k}×{v}" for k, v in callers.items()))
+        st.dataframe(
+            summary_df,
+            column_config={
+                "query": "쿼리", "count": "횟수",
+                "total_ms": st.column_config.NumberColumn("총 시간", format="%.1fms"),
+                "avg_ms": st.column_config.NumberColumn("평균", format="%.2fms"),
+                "max_ms": st.column_config.NumberColumn("최대", format="%.2fms"),
+                "rows": "행 수", "callers": "호출한 곳",
+            },
+            hide_index=True, use_container_width=True,
+        )
+    else:
+        st.caption("아직 기록된 쿼리가 없습니다.")
+
+    c_caller, c_pool = st.columns(2)
+    with c_caller:
+        st.markdown("**화면별 쿼리 수**")
+        st.dataframe(pd.Series(metrics.query_stats.by_caller(), name="쿼리 수"), use_container_width=True)
+    with c_pool:
+        st.markdown("**커넥션 풀 / 읽기 분산 / 묶음 쓰기 / 공유 캐시**")
+        st.json({"pool": get_pool_stats(), "reads": get_read_stats(), "writer": get_writer_stats(),
+                 "snapshot": get_snapshot_stats()}, expanded=False)
+
+    slow = metrics.query_stats.slow_queries()
+    st.markdown(f"**최근 느린 쿼리** ({len(slow)}건)")
+    if slow:
+        slow_df = pd.DataFrame(slow[::-1])
+        slow_df["at"] = pd.to_datetime(slow_df["at"], unit="s")
+        slow_df["seconds"] = slow_df["seconds"] * 1000
+        st.dataframe(slow_df.rename(columns={"seconds": "ms"}), hide_index=True, use_container_width=True)
+
+    with st.expander("Prometheus 텍스트"):
+        st.code(metrics.prometheus_text(), language="text")
+
+
+def render_diagnostics():
+    """화면 조각별 실행 비용 (사이드바용, main.py?diag=1)"""
+    st.subheader("🩺 화면 진단")
+    summary = metrics.render_stats.summary()
+    if summary:
+        st.markdown("**화면 조각별 평균 (프로세스 전체)**")
+        st.dataframe(
+            pd.DataFrame(summary).set_index("fragment"),
+            column_config={
+                "runs": "실행", "total_ms": None,
+                "avg_ms": st.column_config.NumberColumn("전체", format="%.1fms"),
+                "avg_db_ms": st.column_config.NumberColumn("DB", format="%.1fms"),
+                "avg_python_ms": st.column_config.NumberColumn("파이썬", format="%.1fms"),
+                "max_ms": st.column_config.NumberColumn("최대", format="%.1fms"),
+                "avg_queries": st.column_config.NumberColumn("쿼리", format="%.1f"),
+                "avg_rows": st.column_config.NumberColumn("보낸 행", format="%.0f"),
+                "avg_kb": st.column_config.NumberColumn("보낸 KB", format="%.1f"),
+            },
+            use_container_width=True,
+        )
+    runs = st.session_state.get("_render_runs", {})
+    if runs:
+        st.markdown("**이 탭에서의 실행 횟수 / 마지막 실행**")
+        st.dataframe(pd.DataFrame(runs).T, use_container_width=True)
+    if st.button("진단 통계 초기화", use_container_width=True):
+        metrics.render_stats.reset()
+        st.session_state.pop("_render_runs", None)
+        st.rerun()
@@ -0,0 +1,62 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import db
+
+# ---------------------------------------------------------
+# 비동기 DB API (스레드 풀 기반)
+# ---------------------------------------------------------
+# pymysql은 블로킹 드라이버라서 db.py 함수를 전용 스레드 풀에서 돌리고 asyncio로 기다린다.
+# 커넥션은 여전히 db.py의 풀에서 빌리므로 스레드 수는 풀 크기에 맞춘다.
+#
+#     dashboard, catalog = aiodb.run(aiodb.get_dashboard_snapshot(), aiodb.get_catalog_rows())
+#
+# 여러 조회를 동시에 보내고 전부 받을 때까지 기다리므로, 걸리는 시간은 가장 느린 조회 하나 정도가 된다.
+
+_executor = ThreadPoolExecutor(max_workers=db.POOL_SIZE, thread_name_prefix="db-async")
+
+
+def to_thread(func, *args, **kwargs):
+    """func를 DB 스레드 풀에서 실행하는 awaitable.
+
+    지금의 contextvars(metrics의 화면 조각 이름 등)를 그대로 넘겨서 쿼리 통계가 호출한 화면에 잡히게 한다.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return loop.run_in_executor(_executor, functools.partial(context.run, func, *args, **kwargs))
+
+
+def asyncify(func):
+    """동기 DB 함수를 같은 인자를 받는 async 함수로 감싼다."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await to_thread(func, *args, **kwargs)
+    return wrapper
+
+
+async def gather(*awaitables):
+    return await asyncio.gather(*awaitables)
+
+
+def run(*awaitables):
+    """이벤트 루프가 없는 곳(streamlit 스크립트 등)에서 여러 조회를 동시에 실행하고 결과 리스트를 돌려준다."""
+    return asyncio.run(gather(*awaitables))
+
+
+# --- db.py 조회 함수의 async 버전 ---
+get_data_versions = asyncify(db.get_data_versions)
+get_recent_chat_messages = asyncify(db.get_recent_chat_messages)
+get_chat_messages_since = asyncify(db.get_chat_messages_since)
+get_catalog_rows = asyncify(db.get_catalog_rows)
+get_categories = asyncify(db.get_categories)
+get_stores = asyncify(db.get_stores)
+get_menus = asyncify(db.get_menus)
+get_current_orders = asyncify(db.get_current_orders)
+get_orders_page = asyncify(db.get_orders_page)
+get_store_totals = asyncify(db.get_store_totals)
+get_popular_store_stats = asyncify(db.get_popular_store_stats)
+get_dashboard_snapshot = asyncify(db.get_dashboard_snapshot)
+get_round_summaries = asyncify(db.get_round_summaries)
+get_history_store_stats = asyncify(db.get_history_store_stats)
+get_multi_orders = asyncify(db.get_multi_orders)
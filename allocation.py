@@ -0,0 +1,240 @@
+import random
+import time
+from dataclasses import dataclass, field
+
+# ---------------------------------------------------------
+# 파티 배정 추천 (최소주문금액 맞추기)
+# ---------------------------------------------------------
+# 사람마다 갈 수 있는 가게(지금 주문한 가게 + 옮겨도 괜찮은 가게)와 그 가게에서 낼 금액을 받아서,
+# 한 사람당 가게 하나씩 배정했을 때 최소주문금액을 넘긴 가게에 배정된 사람("먹을 수 있는 사람")이
+# 가장 많아지는 배정을 찾는다. 정확히 풀면 NP-hard(bin covering)라서
+#   1) 지금 주문한 가게(금액이 가장 큰 곳)에서 시작해
+#   2) 한 명 옮기기 / 가게 하나 살리기(그 가게를 고를 수 있는 사람을 모으기) / 가게 하나 접기 로 좋아지는 동안 계속 옮기고
+#   3) 더 나아지지 않으면 몇 명을 무작위로 흔든 뒤 다시 2)를 하는 것을 시간 예산(SOLVE_TIME_BUDGET) 안에서 반복한다.
+# 같은 인원이면 덜 모자란 가게, 덜 옮기는 배정을 고른다. 사람 수백 명 / 가게 수십 곳에서 수십 ms.
+
+SOLVE_TIME_BUDGET = 0.05   # 초
+MAX_KICKS = 200            # 나아지지 않는 흔들기를 이만큼 하면 시간이 남아도 멈춤
+
+
+@dataclass
+class Allocation:
+    """solve()의 결과"""
+    assignment: dict                 # 먹을 사람 -> store_id
+    fed: list                        # 최소주문금액을 넘긴 가게에 배정된 사람
+    reached: list                    # 최소주문금액을 넘긴 가게 id
+    totals: dict                     # store_id -> 배정대로 모였을 때의 합계
+    moved: list = field(default_factory=list)   # 지금 가게(current)와 다른 곳으로 배정된 사람
+    elapsed_ms: float = 0.0
+    rounds: int = 0                  # 흔들고 다시 찾은 횟수
+
+
+class _State:
+    """배정 상태와 점수 (한 명을 옮길 때마다 바뀐 두 가게만 다시 계산)"""
+
+    def __init__(self, options, min_amounts, current):
+        self.options = options
+        self.min_amounts = min_amounts
+        self.current = current
+        self.assign = {}
+        self.load = {store_id: 0 for store_id in min_amounts}
+        self.count = {store_id: 0 for store_id in min_amounts}
+        self.fed = 0          # 최소금액 넘긴 가게에 배정된 사람 수
+        self.shortfall = 0.0  # 사람이 있는데 못 넘긴 가게들의 모자란 비율 합 (작을수록 좋음)
+        self.stays = 0        # 지금 가게에 그대로 있는 사람 수
+        for eater, store_id in current.items():
+            self._place(eater, store_id)
+
+    def _store_score(self, store_id):
+        load, count, minimum = self.load[store_id], self.count[store_id], self.min_amounts[store_id]
+        if count == 0:
+            return 0, 0.0
+        if load >= minimum:
+            return count, 0.0
+        return 0, (minimum - load) / minimum if minimum else 0.0
+
+    def _update(self, store_id, eater, sign):
+        fed, shortfall = self._store_score(store_id)
+        self.load[store_id] += sign * self.options[eater][store_id]
+        self.count[store_id] += sign
+        new_fed, new_shortfall = self._store_score(store_id)
+        self.fed += new_fed - fed
+        self.shortfall += new_shortfall - shortfall
+
+    def _place(self, eater, store_id):
+        self.assign[eater] = store_id
+        self._update(store_id, eater, 1)
+        self.stays += store_id == self.current[eater]
+
+    def move(self, eater, store_id):
+        old = self.assign[eater]
+        self.stays -= old == self.current[eater]
+        self._update(old, eater, -1)
+        self._place(eater, store_id)
+        return old
+
+    def score(self):
+        return (self.fed, -round(self.shortfall, 9), self.stays)
+
+    def reached(self, store_id):
+        return self.count[store_id] > 0 and self.load[store_id] >= self.min_amounts[store_id]
+
+
+def _try(state, moves):
+    """moves를 차례로 적용해 보고 점수가 좋아지면 남기고 아니면 되돌린다."""
+    before = state.score()
+    undo = []
+    for eater, store_id in moves:
+        if state.assign[eater] != store_id:
+            undo.append((eater, state.move(eater, store_id)))
+    if state.score() > before:
+        return True
+    for eater, store_id in reversed(undo):
+        state.move(eater, store_id)
+    return False
+
+def _open_moves(state, store_id, eaters_by_store):
+    """store_id를 살리려고 옮길 사람들 (큰 금액부터, 다른 살아있는 가게를 무너뜨리지 않는 사람만)"""
+    needed = state.min_amounts[store_id] - state.load[store_id]
+    moves = []
+    for eater in sorted(eaters_by_store[store_id], key=lambda e: -state.options[e][store_id]):
+        if needed <= 0:
+            break
+        old = state.assign[eater]
+        if old == store_id:
+            continue
+        if state.reached(old) and state.load[old] - state.options[eater][old] < state.min_amounts[old]:
+            continue
+        moves.append((eater, store_id))
+        needed -= state.options[eater][store_id]
+    return moves
+
+def _close_moves(state, store_id, members):
+    """못 넘긴 store_id의 사람들을 각자 고를 수 있는 살아있는 가게(없으면 그대로)로"""
+    moves = []
+    for eater in members:
+        open_options = [s for s in state.options[eater] if s != store_id and state.reached(s)]
+        if open_options:
+            moves.append((eater, max(open_options, key=lambda s: state.load[s] - state.min_amounts[s])))
+    return moves
+
+def _improve(state, eaters, eaters_by_store, deadline):
+    """더 이상 좋아지지 않을 때까지(또는 시간이 다 될 때까지) 한 명 옮기기 / 가게 살리기 / 가게 접기"""
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for eater in eaters:
+            if time.perf_counter() >= deadline:
+                return
+            for store_id, amount in state.options[eater].items():
+                old = state.assign[eater]
+                if store_id == old:
+                    continue
+                # 이미 먹을 수 있는 사람은 옮겨서 새 가게가 넘어가거나, 원래 가게로 돌아갈 때만 나아질 수 있음
+                if state.reached(old) and store_id != state.current[eater] and (
+                        state.reached(store_id) or state.load[store_id] + amount < state.min_amounts[store_id]):
+                    continue
+                if _try(state, [(eater, store_id)]):
+                    improved = True
+        for store_id in eaters_by_store:
+            if time.perf_counter() >= deadline:
+                return
+            if not state.reached(store_id):
+                if _try(state, _open_moves(state, store_id, eaters_by_store)):
+                    improved = True
+                elif state.count[store_id]:
+                    members = [e for e in eaters_by_store[store_id] if state.assign[e] == store_id]
+                    improved |= _try(state, _close_moves(state, store_id, members))
+
+
+def solve(options, min_amounts, current=None, time_budget=SOLVE_TIME_BUDGET, seed=0):
+    """사람마다 가게 하나씩 배정해서 최소주문금액을 넘긴 가게에서 먹는 사람 수를 최대로
+
+    options: {먹을 사람: {store_id: 그 가게에서 낼 금액}} - 갈 수 있는 가게 전부
+    min_amounts: {store_id: 최소주문금액}
+    current: {먹을 사람: store_id} 지금 가게 (없으면 금액이 가장 큰 가게). 같은 인원이면 덜 옮기는 쪽을 고른다.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget
+    rng = random.Random(seed)
+    options = {eater: dict(stores) for eater, stores in options.items() if stores}
+    if current is None:
+        current = {}
+    current = {eater: current.get(eater) if current.get(eater) in stores else max(stores, key=stores.get)
+               for eater, stores in options.items()}
+    min_amounts = {store_id: min_amounts.get(store_id, 0)
+                   for stores in options.values() for store_id in stores}
+
+    eaters = list(options)
+    eaters_by_store = {store_id: [] for store_id in min_amounts}
+    for eater, stores in options.items():
+        for store_id in stores:
+            eaters_by_store[store_id].append(eater)
+    flexible = [eater for eater in eaters if len(options[eater]) > 1]
+
+    state = _State(options, min_amounts, current)
+    _improve(state, eaters, eaters_by_store, deadline)
+    best_score, best = state.score(), dict(state.assign)
+
+    perfect = (len(eaters), 0, len(eaters))   # 모두 먹을 수 있고 아무도 안 옮김
+    rounds = kicks = 0
+    while flexible and best_score != perfect and kicks < MAX_KICKS and time.perf_counter() < deadline:
+        # 제자리에서 더 못 나아가면 몇 명을 다른 가게로 흔들어 보고 다시 찾음
+        for eater in rng.sample(flexible, min(len(flexible), rng.randint(1, 3))):
+            state.move(eater, rng.choice(list(options[eater])))
+        rng.shuffle(eaters)
+        _improve(state, eaters, eaters_by_store, deadline)
+        rounds += 1
+        if state.score() > best_score:
+            best_score, best, kicks = state.score(), dict(state.assign), 0
+        else:
+            kicks += 1
+            for eater, store_id in best.items():
+                if state.assign[eater] != store_id:
+                    state.move(eater, store_id)
+
+    totals = {}
+    for eater, store_id in best.items():
+        totals[store_id] = totals.get(store_id, 0) + options[eater][store_id]
+    reached = sorted(store_id for store_id, total in totals.items() if total >= min_amounts[store_id])
+    return Allocation(
+        assignment=best,
+        fed=sorted(eater for eater, store_id in best.items() if store_id in reached),
+        reached=reached,
+        totals=totals,
+        moved=sorted(eater for eater, store_id in best.items() if store_id != current[eater]),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+        rounds=rounds,
+    )
+
+
+def options_from_orders(orders, flexible=(), candidate_stores=None):
+    """주문 목록으로 solve()의 options / current를 만든다.
+
+    orders: (먹을 사람, store_id, 금액) 목록 (주문 한 건씩, 같은 가게 여러 건이면 합침)
+    flexible: 다른 가게로 옮겨도 괜찮은 사람. candidate_stores(없으면 주문이 있는 가게 전부) 어디든
+              지금 가장 많이 낸 금액만큼 시킨다고 보고 후보에 넣는다.
+    """
+    options = {}
+    for eater, store_id, amount in orders:
+        stores = options.setdefault(eater, {})
+        stores[store_id] = stores.get(store_id, 0) + amount
+    current = {eater: max(stores, key=stores.get) for eater, stores in options.items()}
+    stores = set(candidate_stores) if candidate_stores is not None else {s for o in options.values() for s in o}
+    for eater in flexible:
+        if eater not in options:
+            continue
+        budget = max(options[eater].values())
+        for store_id in stores:
+            options[eater].setdefault(store_id, budget)
+    return options, current
+
+
+def fed_now(orders, min_amounts):
+    """지금 주문 그대로일 때 (최소주문금액 넘긴 가게, 그 가게들에 주문이 있는 사람)"""
+    totals, eaters = {}, {}
+    for eater, store_id, amount in orders:
+        totals[store_id] = totals.get(store_id, 0) + amount
+        eaters.setdefault(store_id, set()).add(eater)
+    reached = [store_id for store_id, total in totals.items() if total >= min_amounts.get(store_id, 0)]
+    return reached, sorted(set().union(*(eaters[store_id] for store_id in reached)))
@@ -0,0 +1,196 @@
+import functools
+import os
+import re
+import sqlite3
+from datetime import datetime
+import pymysql
+
+# ---------------------------------------------------------
+# 저장소 백엔드 (MariaDB / 내장 SQLite)
+# ---------------------------------------------------------
+# db.py의 쿼리는 MariaDB 문법(%s 자리표시자, INSERT IGNORE, FOR UPDATE ...)으로 쓰고,
+# 실제 실행은 db.execute() -> 백엔드.execute()를 거친다.
+# MariaDBBackend는 그대로 보내고, SQLiteBackend는 몇 가지 문법만 SQLite에 맞게 바꿔서 보낸다.
+# 어느 백엔드를 쓸지는 db.py의 DB_BACKEND(환경 변수 BAEMIN_DB_BACKEND)로 정한다.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SQLITE_PATH = os.environ.get("BAEMIN_SQLITE_PATH", os.path.join(BASE_DIR, "baemin.sqlite3"))
+SQLITE_SCHEMA = os.path.join(BASE_DIR, "sqlite_schema.sql")
+SEED_SQL = os.path.join(BASE_DIR, "1.sql")
+
+
+class MariaDBBackend:
+    """pymysql로 MariaDB 서버에 접속 (기본값)"""
+
+    name = "mariadb"
+
+    def __init__(self, config):
+        self.config = config
+
+    def connect(self):
+        return pymysql.connect(**self.config)
+
+    def ping(self, conn):
+        conn.ping(reconnect=False)
+
+    def dict_cursor(self, conn):
+        return conn.cursor(pymysql.cursors.DictCursor)
+
+    def translate(self, query):
+        return query
+
+    def execute(self, cursor, query, params=None):
+        cursor.execute(query, params)
+
+    def executemany(self, cursor, query, seq_of_params):
+        cursor.executemany(query, seq_of_params)
+
+    def bootstrap(self):
+        """스키마는 1.sql로 직접 만든다 (README 참고)"""
+        return False
+
+    def describe(self):
+        return f"mariadb://{self.config.get('host')}/{self.config.get('database')}"
+
+
+# --- SQLite ---
+
+class _SQLiteCursor(sqlite3.Cursor):
+    # pymysql 커서처럼 `with conn.cursor() as cursor:` 로 쓸 수 있게
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _SQLiteConnection(sqlite3.Connection):
+    def cursor(self, factory=_SQLiteCursor):
+        return super().cursor(factory)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def _concat(*args):
+    # MariaDB CONCAT과 같이 하나라도 NULL이면 NULL
+    return None if any(arg is None for arg in args) else "".join(str(arg) for arg in args)
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _parse_timestamp(value):
+    return datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_converter("timestamp", _parse_timestamp)
+sqlite3.register_adapter(datetime, lambda value: value.strftime("%Y-%m-%d %H:%M:%S"))
+
+_LOCKING_READ = re.compile(r"\s+(FOR UPDATE|LOCK IN SHARE MODE)\b")
+_NOW_MINUS = re.compile(r"NOW\(\)\s*-\s*INTERVAL\s+(\d+)\s+(SECOND|MINUTE|HOUR|DAY)", re.IGNORECASE)
+_VALUES_REF = re.compile(r"\bVALUES\((\w+)\)")
+
+
+class SQLiteBackend:
+    """프로세스 안에서 바로 읽고 쓰는 SQLite 파일 DB (WAL 모드)
+
+    서버 없이 돌릴 때(작은 팀, 로컬 개발, 벤치마크)용. 네트워크 왕복이 없어서 조회가 마이크로초 단위.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=SQLITE_PATH, timeout=5):
+        self.path = path
+        self.timeout = timeout
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self.path, timeout=self.timeout, factory=_SQLiteConnection,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,      # 풀이 스레드 사이에서 돌려 씀 (한 번에 한 스레드만 사용)
+            isolation_level="IMMEDIATE",  # 쓰기 트랜잭션은 시작할 때 바로 쓰기 잠금 (나중에 올리다 교착되지 않게)
+        )
+        conn.execute("PRAGMA journal_mode=WAL")   # 읽는 쪽이 쓰는 쪽을 기다리지 않음
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.create_function("NOW", 0, _now)
+        conn.create_function("CONCAT", -1, _concat)
+        return conn
+
+    def ping(self, conn):
+        conn.execute("SELECT 1")
+
+    def dict_cursor(self, conn):
+        cursor = conn.cursor()
+        cursor.row_factory = _dict_row
+        return cursor
+
+    @functools.lru_cache(maxsize=512)
+    def translate(self, query):
+        """MariaDB 문법을 SQLite 문법으로 (쿼리 문자열마다 한 번만 변환)"""
+        query = _LOCKING_READ.sub("", query)
+        query = query.replace("INSERT IGNORE", "INSERT OR IGNORE")
+        query = _NOW_MINUS.sub(lambda m: f"datetime('now', 'localtime', '-{m.group(1)} {m.group(2).lower()}s')", query)
+        query = query.replace("ON DUPLICATE KEY UPDATE", "ON CONFLICT DO UPDATE SET")
+        query = _VALUES_REF.sub(r"excluded.\1", query)
+        return query.replace("%s", "?")
+
+    def _begin_if_locking(self, cursor, query):
+        # FOR UPDATE / LOCK IN SHARE MODE 대신 DB 전체 쓰기 잠금으로 트랜잭션을 시작
+        if not cursor.connection.in_transaction and _LOCKING_READ.search(query):
+            cursor.execute("BEGIN IMMEDIATE")
+
+    def execute(self, cursor, query, params=None):
+        self._begin_if_locking(cursor, query)
+        cursor.execute(self.translate(query), params or ())
+
+    def executemany(self, cursor, query, seq_of_params):
+        cursor.executemany(self.translate(query), seq_of_params)
+
+    def bootstrap(self):
+        """DB 파일이 비어 있으면 스키마와 1.sql의 기본 데이터를 넣고 True"""
+        conn = self.connect()
+        try:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'stores'").fetchone():
+                return False
+            with open(SQLITE_SCHEMA, encoding="utf-8") as f:
+                conn.executescript(f.read())
+            # 1.sql 덤프처럼 외래 키 검사를 끄고 테이블 이름 순서대로 넣음
+            conn.execute("PRAGMA foreign_keys=OFF")
+            for statement in seed_statements():
+                conn.execute(self.translate(statement))
+            conn.commit()
+            conn.execute("PRAGMA foreign_keys=ON")
+            return True
+        finally:
+            conn.close()
+
+    def describe(self):
+        return f"sqlite:///{self.path}"
+
+
+def seed_statements(path=SEED_SQL):
+    """1.sql에서 데이터를 넣는 문장(INSERT/REPLACE/UPDATE)만 꺼낸다."""
+    statements, current = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            stripped = line.strip()
+            if not current and not stripped.startswith(("INSERT", "REPLACE", "UPDATE")):
+                continue
+            current.append(line)
+            if stripped.endswith(";"):
+                statements.append("".join(current).strip().rstrip(";"))
+                current = []
+    return statements
+
+
+def make_backend(name, **options):
+    """이름('mariadb' / 'sqlite')으로 백엔드 생성. options는 각 백엔드 생성자 인자"""
+    if name == "mariadb":
+        return MariaDBBackend(options)
+    if name == "sqlite":
+        return SQLiteBackend(**options)
+    raise ValueError(f"알 수 없는 DB 백엔드: {name} (mariadb 또는 sqlite)")
@@ -0,0 +1 @@
+# 성능 측정 스크립트 모음. 프로젝트 폴더에서 `python -m benchmarks.<이름>`으로 실행
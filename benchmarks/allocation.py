@@ -0,0 +1,44 @@
+"""파티 배정 추천(allocation.solve) 벤치마크
+
+가짜 주문(사람 N명, 가게 M곳, 일부는 두 가게에 주문, 일부는 옮겨도 괜찮은 사람)으로
+지금 주문 그대로일 때와 추천 배정의 "먹을 수 있는 사람" 수, 옮긴 사람 수, 계산 시간을 비교한다.
+
+    python -m benchmarks.allocation --eaters 100 300 600 --stores 30
+"""
+import argparse
+import random
+from allocation import solve, options_from_orders, fed_now
+
+
+def make_orders(n_eaters, n_stores, flexible_ratio=0.4, seed=0):
+    """(주문 목록, 가게별 최소주문금액, 옮겨도 괜찮은 사람)"""
+    rng = random.Random(seed)
+    min_amounts = {store_id: rng.randint(15, 40) * 1000 for store_id in range(1, n_stores + 1)}
+    orders = []
+    for i in range(n_eaters):
+        # 15%는 두 가게에 주문 (중복 참여자)
+        for store_id in rng.sample(range(1, n_stores + 1), 2 if rng.random() < 0.15 else 1):
+            orders.append((f"eater{i}", store_id, rng.randint(6, 15) * 1000))
+    flexible = [f"eater{i}" for i in range(n_eaters) if rng.random() < flexible_ratio]
+    return orders, min_amounts, flexible
+
+
+def run(eater_sizes, n_stores, seeds):
+    print(f"{'사람':>6} {'가게':>5} {'지금(명)':>9} {'추천(명)':>9} {'옮김':>6} {'시간(ms)':>9}")
+    for n_eaters in eater_sizes:
+        for seed in range(seeds):
+            orders, min_amounts, flexible = make_orders(n_eaters, n_stores, seed=seed)
+            options, current = options_from_orders(orders, flexible)
+            _, before = fed_now(orders, min_amounts)
+            result = solve(options, min_amounts, current, seed=seed)
+            print(f"{n_eaters:>6} {n_stores:>5} {len(before):>9} {len(result.fed):>9} {len(result.moved):>6} "
+                  f"{result.elapsed_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eaters", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--stores", type=int, default=30)
+    parser.add_argument("--seeds", type=int, default=3, help="크기마다 돌려볼 데이터 수")
+    args = parser.parse_args()
+    run(args.eaters, args.stores, args.seeds)
@@ -0,0 +1,103 @@
+"""대시보드 계산 마이크로 벤치마크
+
+예전 방식(행마다 apply / 문자열 검사 / iterrows)과 지금 방식(dashboard.py의 컬럼 단위 계산)을
+같은 가짜 주문 데이터로 비교한다. DB 없이 pandas 계산만 잰다.
+
+    python -m benchmarks.dashboard --orders 10000 20000 50000 --stores 300
+"""
+import argparse
+import timeit
+import numpy as np
+import pandas as pd
+from dashboard import build_dashboard, store_status
+
+
+def make_orders(n_orders, n_stores, n_eaters=None, seed=0):
+    """build_dashboard()에 넣을 수 있는 가짜 주문 목록"""
+    rng = np.random.default_rng(seed)
+    n_eaters = n_eaters or max(n_orders // 3, 1)
+    store_ids = rng.integers(1, n_stores + 1, n_orders)
+    min_amounts = rng.integers(5, 40, n_stores + 1) * 1000
+    prices = rng.integers(10, 300, n_orders) * 100
+    quantities = rng.integers(1, 4, n_orders)
+    return pd.DataFrame({
+        "id": np.arange(n_orders, 0, -1),
+        "eater_name": [f"eater{i}" for i in rng.integers(0, n_eaters, n_orders)],
+        "store_id": store_ids,
+        "store_name": [f"store{i}" for i in store_ids],
+        "min_order_amount": min_amounts[store_ids],
+        "menu_name": [f"menu{i}" for i in rng.integers(0, 50, n_orders)],
+        "price": prices,
+        "quantity": quantities,
+        "total": prices * quantities,
+    })
+
+
+# --- 예전 방식 (비교용으로 그대로 옮겨둠) ---
+
+def legacy_status(store_totals):
+    def get_status(row):
+        if row['total'] >= row['min_order_amount']:
+            return "✅ 주문 가능"
+        diff = row['min_order_amount'] - row['total']
+        return f"❌ {int(diff):,}원 부족"
+
+    display_sums = store_totals.copy()
+    display_sums['상태'] = display_sums.apply(get_status, axis=1)
+    display_sums.insert(0, "선택", False)
+    display_sums["선택"] = display_sums["선택"].astype(object)
+    display_sums.loc[display_sums['상태'].str.contains("❌"), "선택"] = None
+    return display_sums
+
+
+def legacy_multi_orderers(orders, store_totals):
+    valid_stores = store_totals[store_totals['total'] >= store_totals['min_order_amount']]['store_name'].tolist()
+    success_orders = orders[orders['store_name'].isin(valid_stores)]
+    dup_check = success_orders['eater_name'].value_counts()
+    multi_eaters = dup_check[dup_check > 1].index.tolist()
+    dup_orders = success_orders[success_orders['eater_name'].isin(multi_eaters)]
+    return [(row['eater_name'], row['store_name'], row['menu_name']) for _, row in dup_orders.iterrows()]
+
+
+def legacy_store_totals(raw):
+    grouped = raw.groupby(["store_id", "store_name", "min_order_amount"], as_index=False)["total"].sum()
+    return grouped.sort_values("total", ascending=False)[["store_name", "total", "min_order_amount"]]
+
+
+# --- 지금 방식 ---
+
+def current_multi_orderers(dashboard):
+    dup_orders = dashboard.multi_orders
+    return list(zip(dup_orders['eater_name'], dup_orders['store_name'], dup_orders['menu_name']))
+
+
+def best_of(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run(order_sizes, n_stores, repeat):
+    print(f"{'주문 수':>8} {'항목':<14} {'예전(ms)':>10} {'지금(ms)':>10} {'배율':>7}")
+    for n_orders in order_sizes:
+        raw = make_orders(n_orders, n_stores)
+        orders = raw[["id", "eater_name", "store_name", "menu_name", "price", "quantity", "total"]]
+        totals = legacy_store_totals(raw)
+        dashboard = build_dashboard(raw)
+        cases = [
+            ("가게 상태", lambda: legacy_status(totals), lambda: store_status(dashboard.store_totals)),
+            ("중복 참여자", lambda: legacy_multi_orderers(orders, totals), lambda: current_multi_orderers(dashboard)),
+            ("틱 전체", lambda: (legacy_status(legacy_store_totals(raw)), legacy_multi_orderers(orders, legacy_store_totals(raw))),
+                        lambda: (lambda d: (store_status(d.store_totals), current_multi_orderers(d)))(build_dashboard(raw))),
+        ]
+        for name, legacy, current in cases:
+            old_t = best_of(legacy, repeat) * 1000
+            new_t = best_of(current, repeat) * 1000
+            print(f"{n_orders:>8} {name:<14} {old_t:>10.2f} {new_t:>10.2f} {old_t / new_t:>6.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--stores", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.orders, args.stores, args.repeat)
@@ -0,0 +1,247 @@
+"""동시 접속 부하 테스트
+
+브라우저 탭 N개가 대시보드를 보고 있는 상황을 스레드로 흉내 낸다.
+세션마다 --interval(기본 2초, 예전 run_every) 간격으로 한 틱씩 돌고, 별도 스레드가
+--order-rate / --chat-rate(초당 건수)로 주문과 채팅을 써 넣는다.
+
+틱에서 하는 일(--mode):
+  legacy   예전 fragment들이 틱마다 하던 조회를 그대로 (주문/합계 조회 여러 번 + 채팅 1시간치)
+  cached   지금 방식 (snapshot 공유 캐시 + 데이터 버전 + 채팅 id 이후분만)
+  prefetch cached와 같지만 공유 캐시를 aiodb로 동시에 채운 뒤 읽음 (main.py와 같은 순서)
+  apptest  Streamlit AppTest로 main.py 화면 전체를 다시 실행 (가장 무겁고 현실적)
+
+끝나면 초당 DB 조회 수, 틱 지연 p50/p95/p99, 커넥션 수를 출력한다.
+접속 정보는 db.py의 DB_CONFIG를 쓰고, 로컬 MariaDB로 돌릴 때는 --host 등으로 덮어쓴다.
+--backend sqlite를 주면 네트워크 없이 SQLite 파일(--sqlite-path)로 같은 부하를 돌린다.
+--batched-writes를 주면 화면과 같이 writer.py 큐를 거쳐 묶음으로 쓴다 (커밋 수가 보고서에 나옴).
+--replica를 주면 읽기를 복제본으로 보낸다 (mariadb는 host[:port], sqlite는 파일 경로. 보고서에 주/복제본 읽기 수가 나옴).
+
+    python -m benchmarks.load --sessions 50 --duration 60 --order-rate 2 --chat-rate 1 --mode cached
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+import db
+import migrations
+import writer
+from backends import make_backend
+from dashboard import store_status
+from snapshot import cached_dashboard, data_version, prefetch
+
+
+# --- 틱 정의 ---
+
+def legacy_tick(session):
+    # render_order_status, render_sum_by_store, render_multi_orderers가 각각 조회하던 것
+    for _ in range(3):
+        db.get_current_orders()
+        db.get_store_totals()
+    db.get_popular_store_stats()
+    db.get_recent_chat_messages()
+
+
+def cached_tick(session):
+    dashboard = cached_dashboard()
+    store_status(dashboard.store_totals)
+    version = data_version(("chat_messages",))
+    if session.get("chat_version") != version:
+        if "chat_last_id" not in session:
+            messages = db.get_recent_chat_messages()
+        else:
+            messages = db.get_chat_messages_since(session["chat_last_id"])
+        if messages:
+            session["chat_last_id"] = messages[-1]["id"]
+        session.setdefault("chat_last_id", 0)
+        session["chat_version"] = version
+
+
+def prefetch_tick(session):
+    prefetch()
+    cached_tick(session)
+
+
+def apptest_tick(session):
+    if "app" not in session:
+        from streamlit.testing.v1 import AppTest
+        session["app"] = AppTest.from_file("../main.py", default_timeout=60)
+    app = session["app"]
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+
+
+TICKS = {"legacy": legacy_tick, "cached": cached_tick, "prefetch": prefetch_tick, "apptest": apptest_tick}
+
+
+# --- 측정 ---
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.errors = 0
+        self.writes = 0
+        self.max_in_use = 0
+        self.max_opened = 0
+
+    def tick(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def error(self):
+        with self.lock:
+            self.errors += 1
+
+    def wrote(self):
+        with self.lock:
+            self.writes += 1
+
+
+def session_loop(tick, interval, stop, recorder):
+    session = {}
+    # 모든 세션이 같은 순간에 몰리지 않도록 시작 시점을 흩뿌림
+    stop.wait(random.uniform(0, interval))
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            tick(session)
+            recorder.tick(time.perf_counter() - started)
+        except Exception:
+            recorder.error()
+        stop.wait(max(0.0, interval - (time.perf_counter() - started)))
+
+
+def writer_loop(rate, write, stop, recorder):
+    if rate <= 0:
+        return
+    while not stop.wait(random.expovariate(rate)):
+        try:
+            write()
+            recorder.wrote()
+        except Exception:
+            recorder.error()
+
+
+def monitor_loop(stop, recorder):
+    while not stop.wait(0.2):
+        stats = db.get_pool_stats()
+        recorder.max_in_use = max(recorder.max_in_use, stats["in_use"])
+        recorder.max_opened = max(recorder.max_opened, stats["opened"])
+
+
+def make_writers(batched=False):
+    menus = [row for row in db.get_catalog_rows() if row["menu_id"] is not None]
+    if not menus:
+        raise SystemExit("메뉴가 하나도 없어서 주문을 만들 수 없습니다. 1.sql을 먼저 넣어주세요.")
+
+    def write_order():
+        menu = random.choice(menus)
+        order = (f"부하{random.randint(1, 200)}", menu["store_id"], menu["menu_id"], menu["price"], 1)
+        if batched:
+            writer.submit_order(*order).result(timeout=writer.WRITE_TIMEOUT)
+        else:
+            db.save_order(*order)
+
+    def write_chat():
+        if batched:
+            writer.submit_chat(f"부하{random.randint(1, 200)}", "load test").result(timeout=writer.WRITE_TIMEOUT)
+        else:
+            db.save_chat_message(f"부하{random.randint(1, 200)}", "load test")
+
+    return write_order, write_chat
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def run_load(sessions, duration, interval, order_rate, chat_rate, mode, batched_writes=False):
+    recorder = Recorder()
+    stop = threading.Event()
+    write_order, write_chat = make_writers(batched_writes)
+    before = db.get_pool_stats()
+    reads_before = db.get_read_stats()
+    writes_before = writer.get_writer_stats()
+
+    threads = [threading.Thread(target=session_loop, args=(TICKS[mode], interval, stop, recorder), daemon=True)
+               for _ in range(sessions)]
+    threads.append(threading.Thread(target=writer_loop, args=(order_rate, write_order, stop, recorder), daemon=True))
+    threads.append(threading.Thread(target=writer_loop, args=(chat_rate, write_chat, stop, recorder), daemon=True))
+    threads.append(threading.Thread(target=monitor_loop, args=(stop, recorder), daemon=True))
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    after = db.get_pool_stats()
+    reads_after = db.get_read_stats()
+    writes_after = writer.get_writer_stats()
+    replica_reads = reads_after["replica_reads"] - reads_before["replica_reads"]
+    latencies = sorted(recorder.latencies)
+    return {
+        "mode": mode,
+        "sessions": sessions,
+        "seconds": elapsed,
+        "ticks": len(latencies),
+        "errors": recorder.errors,
+        "writes": recorder.writes,
+        "write_commits": (writes_after["commits"] - writes_before["commits"]) if batched_writes else recorder.writes,
+        "queries_per_sec": (after["checkouts"] - before["checkouts"] + replica_reads) / elapsed,
+        "replica_reads": replica_reads,
+        "pinned_reads": reads_after["pinned_reads"] - reads_before["pinned_reads"],
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_connections_in_use": recorder.max_in_use,
+        "max_connections_opened": recorder.max_opened,
+        "pool_waits": after["waits"] - before["waits"],
+        "reconnects": after["reconnects"] - before["reconnects"],
+    }
+
+
+def print_report(report):
+    width = max(len(key) for key in report)
+    for key, value in report.items():
+        print(f"{key:<{width}}  {value:.2f}" if isinstance(value, float) else f"{key:<{width}}  {value}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="측정 시간(초)")
+    parser.add_argument("--interval", type=float, default=2, help="세션 틱 간격(초)")
+    parser.add_argument("--order-rate", type=float, default=1, help="초당 주문 쓰기 수")
+    parser.add_argument("--chat-rate", type=float, default=0.5, help="초당 채팅 쓰기 수")
+    parser.add_argument("--mode", choices=sorted(TICKS), default="cached")
+    parser.add_argument("--pool-size", type=int, default=db.POOL_SIZE)
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    parser.add_argument("--database")
+    parser.add_argument("--backend", choices=["mariadb", "sqlite"], default=db.DB_BACKEND)
+    parser.add_argument("--batched-writes", action="store_true", help="주문/채팅을 writer.py 큐로 묶어서 씀")
+    parser.add_argument("--sqlite-path", help="--backend sqlite일 때 DB 파일 (없으면 1.sql 데이터로 새로 만듦)")
+    parser.add_argument("--replica", nargs="+", default=db.DB_REPLICAS, help="읽기 전용 복제본 (mariadb: host[:port], sqlite: 파일 경로)")
+    args = parser.parse_args()
+
+    if args.backend == "sqlite":
+        db.configure_backend(make_backend("sqlite", **({"path": args.sqlite_path} if args.sqlite_path else {})),
+                             size=args.pool_size, replicas=[db.replica_backend(path, "sqlite") for path in args.replica])
+    else:
+        overrides = {key: getattr(args, key) for key in ("host", "port", "user", "password", "database") if getattr(args, key) is not None}
+        db.configure_pool(size=args.pool_size, replicas=args.replica, **overrides)
+    migrations.migrate()
+    print_report(run_load(args.sessions, args.duration, args.interval, args.order_rate, args.chat_rate, args.mode,
+                          batched_writes=args.batched_writes))
@@ -0,0 +1,238 @@
+"""데이터 크기별 성능 벤치마크 (합성 데이터)
+
+datagen으로 1.sql 정도(x1)부터 x10 / x100 / x1000 크기의 가게/메뉴/주문/채팅을 만들어 넣고,
+크기마다 db.py의 조회 함수들과 화면 조각들이 하는 pandas 계산을 재서 표로 보여준다.
+--out으로 결과를 JSON 파일로 남기고, 코드를 고친 뒤 --compare로 그 파일과 비교하면
+케이스마다 몇 배 빨라졌는지/느려졌는지 나온다 (--fail-on-regression이면 느려진 게 있을 때 종료 코드 1).
+
+기본은 크기마다 임시 폴더에 새 SQLite 파일을 만들어서 잰다 (서버 필요 없음).
+--backend mariadb면 --database로 지정한 DB를 크기마다 비우고 다시 채운다 (운영 DB에 쓰지 말 것).
+
+    python -m benchmarks.scaling --scales x1 x10 x100 --out before.json
+    python -m benchmarks.scaling --scales x1 x10 x100 --compare before.json
+    python -m benchmarks.scaling --scales x10 --orders 1000000 --repeat 1
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+import pandas as pd
+import datagen
+import db
+import metrics
+import migrations
+from backends import make_backend
+from catalog import Catalog
+from dashboard import build_dashboard, store_status
+from search import MenuSearchIndex
+
+
+# --- 잴 것 ---
+# (이름, 종류, 함수). 함수는 준비된 값(ctx)을 받아서 결과를 돌려주고, 결과 길이를 행 수로 남긴다.
+
+def _prepare(ctx):
+    """크기마다 한 번: pandas 계산 케이스에 넣을 값들을 미리 읽어 둠"""
+    ctx["frames"] = db.get_dashboard_frames()
+    ctx["dashboard"] = build_dashboard(*ctx["frames"])
+    ctx["catalog_rows"] = db.get_catalog_rows()
+    ctx["catalog"] = Catalog(ctx["catalog_rows"])
+    messages = db.get_recent_chat_messages()
+    ctx["chat_last_id"] = messages[-20]["id"] if len(messages) >= 20 else 0
+    popular = ctx["dashboard"].popular
+    ctx["top_store_ids"] = tuple(ctx["dashboard"].store_ids[name] for name in popular["store_name"].head(3))
+    ctx["top_store_names"] = popular["store_name"].head(3).tolist()
+
+
+def _order_status(dashboard, selected):
+    # hh.render_order_status: 필터된 가게의 주문 건수와 '새 주문만'의 기준 id
+    popular = dashboard.popular
+    matched = popular[popular["store_name"].isin(selected)]
+    return int(matched["order_count"].sum()), int(dashboard.orders["id"].max()) if not dashboard.orders.empty else 0
+
+
+def _popular_realtime(dashboard):
+    # sj.popular_realtime: 1등 가게와 막대 그래프 눈금
+    popular = dashboard.popular
+    return (int(popular["order_count"].max()), popular.iloc[0]["store_name"]) if not popular.empty else None
+
+
+def _multi_orderers(dashboard):
+    # sj.render_multi_orderers: 중복 참여자 주문 한 줄씩
+    dup_orders = dashboard.multi_orders
+    return list(zip(dup_orders["id"], dup_orders["eater_name"], dup_orders["store_name"], dup_orders["menu_name"]))
+
+
+CASES = [
+    # DB 조회 (db.py)
+    ("get_current_orders", "db", lambda ctx: db.get_current_orders()),
+    ("get_store_totals", "db", lambda ctx: db.get_store_totals()),
+    ("get_popular_store_stats", "db", lambda ctx: db.get_popular_store_stats()),
+    ("get_recent_chat_messages", "db", lambda ctx: db.get_recent_chat_messages()),
+    ("get_chat_messages_since", "db", lambda ctx: db.get_chat_messages_since(ctx["chat_last_id"])),
+    ("get_orders_page", "db", lambda ctx: db.get_orders_page()[0]),
+    ("get_orders_page(가게 3곳)", "db", lambda ctx: db.get_orders_page(ctx["top_store_ids"])[0]),
+    ("get_dashboard_frames", "db", lambda ctx: db.get_dashboard_frames()[0]),
+    ("get_catalog_rows", "db", lambda ctx: db.get_catalog_rows()),
+    ("get_multi_orders", "db", lambda ctx: db.get_multi_orders()),
+    ("get_data_versions", "db", lambda ctx: db.get_data_versions()),
+    # 화면 조각의 pandas / 파이썬 계산 (DB 없이)
+    ("build_dashboard", "calc", lambda ctx: build_dashboard(*ctx["frames"]).orders),
+    ("store_status (sum_by_store)", "calc", lambda ctx: store_status(ctx["dashboard"].store_totals)),
+    ("order_status 필터", "calc", lambda ctx: _order_status(ctx["dashboard"], ctx["top_store_names"])),
+    ("popular_realtime", "calc", lambda ctx: _popular_realtime(ctx["dashboard"])),
+    ("multi_orderers", "calc", lambda ctx: _multi_orderers(ctx["dashboard"])),
+    ("Catalog (choose_menu)", "calc", lambda ctx: Catalog(ctx["catalog_rows"]).all_stores()),
+    ("MenuSearchIndex.sync", "calc", lambda ctx: MenuSearchIndex().sync(ctx["catalog"])),
+]
+
+
+def _rows(result):
+    try:
+        return len(result)
+    except TypeError:
+        return result if isinstance(result, int) else 1
+
+
+def time_case(func, ctx, repeat):
+    times, rows = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(ctx)
+        times.append(time.perf_counter() - started)
+        rows = _rows(result)
+    return {"min_ms": min(times) * 1000, "median_ms": statistics.median(times) * 1000, "rows": rows}
+
+
+# --- 크기마다 DB 준비 ---
+
+def use_database(args, scale, workdir):
+    """크기마다 빈 DB를 준비한다 (SQLite는 새 파일, MariaDB는 --database를 그대로 씀)"""
+    if args.backend == "sqlite":
+        db.configure_backend(make_backend("sqlite", path=os.path.join(workdir, f"{scale}.sqlite3")))
+    else:
+        overrides = {key: getattr(args, key) for key in ("host", "port", "user", "password", "database") if getattr(args, key) is not None}
+        db.configure_pool(**overrides)
+    migrations.migrate()
+
+
+def run(args):
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "backend": args.backend, "seed": args.seed, "repeat": args.repeat,
+            "python": platform.python_version(), "pandas": pd.__version__, "machine": platform.machine(),
+        },
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="baemin-scaling-") as workdir:
+        for scale in args.scales:
+            spec = datagen.spec_for(scale, stores=args.stores, menus_per_store=args.menus, orders=args.orders,
+                                    chat_messages=args.chat)
+            use_database(args, scale, workdir)
+            loaded = datagen.load(spec, seed=args.seed, reset=True)
+            ctx = {}
+            _prepare(ctx)
+            cases = {name: dict(kind=kind, **time_case(func, ctx, args.repeat)) for name, kind, func in CASES}
+            report["scales"][scale] = {"spec": asdict(spec), "load_seconds": loaded["seconds"], "cases": cases}
+            print_scale(scale, report["scales"][scale])
+        db.configure_backend(db.get_backend())   # 임시 파일을 지우기 전에 풀의 커넥션을 닫음
+    return report
+
+
+# --- 출력 / 비교 ---
+
+NOISE_MS = 0.5   # 이보다 작게 달라진 케이스는 빨라짐/느려짐으로 치지 않음
+
+def print_scale(scale, result):
+    spec = result["spec"]
+    print(f"\n[{scale}] 가게 {spec['stores']:,} / 메뉴 {spec['stores'] * spec['menus_per_store']:,} / "
+          f"주문 {spec['orders']:,} / 채팅 {spec['chat_messages']:,} (넣기 {result['load_seconds']:.1f}초)")
+    print(f"  {'항목':<30} {'종류':<7} {'행':>9} {'최소(ms)':>10} {'중간(ms)':>10}")
+    for name, case in result["cases"].items():
+        print(f"  {name:<30} {case['kind']:<7} {case['rows']:>9,} {case['min_ms']:>10.2f} {case['median_ms']:>10.2f}")
+
+
+def print_growth(report):
+    """크기가 커질 때 케이스마다 시간이 몇 배가 되는지 (첫 크기 기준)"""
+    scales = list(report["scales"])
+    if len(scales) < 2:
+        return
+    first = report["scales"][scales[0]]["cases"]
+    print(f"\n크기별 시간 배율 ({scales[0]} 기준, 최소 시간)")
+    print(f"  {'항목':<30}" + "".join(f" {scale:>9}" for scale in scales[1:]))
+    for name in first:
+        ratios = [report["scales"][scale]["cases"][name]["min_ms"] / max(first[name]["min_ms"], 1e-6) for scale in scales[1:]]
+        print(f"  {name:<30}" + "".join(f" {ratio:>8.1f}x" for ratio in ratios))
+
+
+def compare(report, baseline, threshold):
+    """baseline(이전 --out 파일)과 같은 크기/케이스끼리 비교해서 느려진 케이스 수를 돌려준다."""
+    print(f"\n비교: {baseline['meta']['created_at']} ({baseline['meta']['backend']}) -> "
+          f"{report['meta']['created_at']} ({report['meta']['backend']}), ±{threshold:.0%} 넘으면 표시")
+    regressions = 0
+    for scale, result in report["scales"].items():
+        old = baseline["scales"].get(scale)
+        if old is None:
+            continue
+        if old["spec"] != result["spec"]:
+            print(f"  [{scale}] 데이터 크기가 다릅니다: {old['spec']} / {result['spec']}")
+        print(f"  [{scale}] {'항목':<30} {'이전(ms)':>10} {'지금(ms)':>10} {'배율':>7}")
+        for name, case in result["cases"].items():
+            if name not in old["cases"]:
+                continue
+            before, after = old["cases"][name]["min_ms"], case["min_ms"]
+            ratio = after / max(before, 1e-6)
+            mark = ""
+            if abs(after - before) < NOISE_MS:
+                pass   # 1ms 안팎의 케이스는 몇 배씩 흔들리므로 표시하지 않음
+            elif ratio > 1 + threshold:
+                mark, regressions = "▲ 느려짐", regressions + 1
+            elif ratio < 1 / (1 + threshold):
+                mark = "▼ 빨라짐"
+            print(f"  [{scale}] {name:<30} {before:>10.2f} {after:>10.2f} {ratio:>6.2f}x {mark}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(datagen.SCALES), default=["x1", "x10", "x100"])
+    parser.add_argument("--stores", type=int, help="가게 수 (크기별 값 대신)")
+    parser.add_argument("--menus", type=int, help="가게당 메뉴 수")
+    parser.add_argument("--orders", type=int, help="주문 수 (크기별 값 대신, 수백만 건도 가능)")
+    parser.add_argument("--chat", type=int, help="채팅 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="케이스마다 돌리는 횟수 (최소/중간값을 남김)")
+    parser.add_argument("--out", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--threshold", type=float, default=0.2, help="이만큼(비율) 넘게 달라지면 빨라짐/느려짐으로 표시")
+    parser.add_argument("--fail-on-regression", action="store_true", help="느려진 케이스가 있으면 종료 코드 1")
+    parser.add_argument("--backend", choices=["sqlite", "mariadb"], default="sqlite")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    parser.add_argument("--database", help="--backend mariadb일 때 비우고 채울 DB (필수)")
+    args = parser.parse_args()
+    if args.backend == "mariadb" and not args.database:
+        parser.error("--backend mariadb는 크기마다 DB를 비우므로 --database로 벤치마크용 DB를 지정해야 합니다.")
+
+    # 큰 크기에서는 느린 쿼리 기준을 넘는 게 당연하므로 경고를 끔
+    metrics.logger.setLevel(logging.ERROR)
+    report = run(args)
+    print_growth(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과를 {args.out}에 저장했습니다.")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
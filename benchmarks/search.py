@@ -0,0 +1,72 @@
+"""가게/메뉴 검색 마이크로 벤치마크
+
+가짜 카탈로그(가게 N개 × 메뉴 M개)로 search.MenuSearchIndex를 만들고,
+색인 시간과 검색어별 검색 시간, 그리고 이름을 하나씩 훑는 단순 검색(예전 방식이라면 했을 것)을 비교한다.
+DB 없이 메모리 계산만 잰다.
+
+    python -m benchmarks.search --stores 300 1000 --menus 10
+"""
+import argparse
+import random
+import timeit
+from catalog import Catalog, STORE_CATEGORIES
+from search import MenuSearchIndex, normalize, to_choseong
+
+STORE_NAMES = ["교촌치킨", "BHC 치킨", "맘스터치", "엽기떡볶이", "홍콩반점", "김밥천국", "스타벅스", "본죽", "피자헛", "버거킹"]
+MENU_NAMES = ["후라이드 치킨", "양념 치킨", "떡볶이", "순대", "김밥", "짜장면", "짬뽕", "탕수육", "아메리카노",
+              "불고기 버거", "치즈 피자", "제육덮밥", "김치찌개", "된장찌개", "비빔밥", "돈까스"]
+QUERIES = ["치킨", "ㅊㅋ", "떡", "김치", "ㄱㅊㅉㄱ", "버거킹", "피자", "교촌 치킨"]
+
+
+def make_rows(n_stores, n_menus, seed=0):
+    """db.get_catalog_rows()와 같은 형태의 가짜 카탈로그"""
+    rng = random.Random(seed)
+    rows, menu_id = [], 1
+    for store_id in range(1, n_stores + 1):
+        store_name = f"{rng.choice(STORE_NAMES)} {store_id}호점"
+        category = rng.choice(STORE_CATEGORIES)
+        for _ in range(n_menus):
+            rows.append({
+                "store_id": store_id, "store_name": store_name, "category": category, "min_order_amount": 15000,
+                "menu_id": menu_id, "menu_name": rng.choice(MENU_NAMES), "price": rng.randint(5, 30) * 1000,
+            })
+            menu_id += 1
+    return rows
+
+
+def scan_search(rows, query, limit=20):
+    """색인 없이 전체 이름을 훑는 검색 (비교용)"""
+    query = normalize(query)
+    pattern = to_choseong(query)
+    hits = [row for row in rows
+            if query in normalize(row["menu_name"]) or pattern in to_choseong(normalize(row["menu_name"]))]
+    return hits[:limit]
+
+
+def best_of(func, repeat, number=100):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def run(store_sizes, n_menus, repeat):
+    for n_stores in store_sizes:
+        rows = make_rows(n_stores, n_menus)
+        catalog = Catalog(rows)
+        index = MenuSearchIndex()
+        build = min(timeit.repeat(lambda: MenuSearchIndex().sync(catalog), number=1, repeat=repeat))
+        index.sync(catalog)
+        popularity = {store_id: random.randint(0, 20) for store_id in range(1, n_stores + 1)}
+        print(f"가게 {n_stores}개 / 메뉴 {n_stores * n_menus}개: 색인 {build * 1000:.1f}ms")
+        print(f"  {'검색어':<10} {'훑기(ms)':>10} {'색인(ms)':>10} {'배율':>7}")
+        for query in QUERIES:
+            old_t = best_of(lambda: scan_search(rows, query), repeat, number=5) * 1000
+            new_t = best_of(lambda: index.search(query, popularity=popularity), repeat) * 1000
+            print(f"  {query:<10} {old_t:>10.3f} {new_t:>10.3f} {old_t / new_t:>6.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--menus", type=int, default=10, help="가게당 메뉴 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.stores, args.menus, args.repeat)
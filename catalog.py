@@ -0,0 +1,58 @@
+# ---------------------------------------------------------
+# 가게/메뉴 카탈로그 (메모리 캐시용)
+# ---------------------------------------------------------
+# 카테고리 → 가게 → 메뉴 선택 화면은 rerun마다 get_categories/get_stores/get_menus를 불렀지만,
+# 카탈로그는 데이터 매니저(add_page.py)에서 등록할 때만 바뀐다.
+# stores+menus를 한 번에 읽어서 아래 Catalog로 만들어 두고(snapshot.cached_catalog),
+# 가게/메뉴가 등록되면 이벤트/데이터 버전으로 무효화한다.
+
+# stores.category enum 순서 (1.sql). MariaDB는 enum을 이 순서로 정렬한다.
+STORE_CATEGORIES = ['패스트푸드', '카페·디저트', '한식', '찜·탕', '분식', '중식', '돈까스·회', '피자', '치킨', '양식', '고기', '아시안', '족발·보쌈']
+
+
+class Catalog:
+    """카테고리별 가게, 가게별 메뉴 인덱스 (여러 세션이 공유하므로 수정하지 말 것)"""
+
+    def __init__(self, rows):
+        """rows: db.get_catalog_rows()의 결과 (가게 id, 메뉴 id 순으로 정렬된 stores LEFT JOIN menus)"""
+        self._stores_by_id = {}
+        self._stores_by_category = {}
+        self._menus_by_store = {}
+        self._category_by_store = {}
+        for row in rows:
+            store_id = row['store_id']
+            if store_id not in self._stores_by_id:
+                store = {"id": store_id, "name": row['store_name'], "min_order_amount": row['min_order_amount']}
+                self._stores_by_id[store_id] = store
+                self._menus_by_store[store_id] = []
+                self._category_by_store[store_id] = row['category']
+                if row['category'] is not None:
+                    self._stores_by_category.setdefault(row['category'], []).append(store)
+            if row['menu_id'] is not None:
+                self._menus_by_store[store_id].append({"id": row['menu_id'], "menu_name": row['menu_name'], "price": row['price']})
+        self._categories = sorted(
+            self._stores_by_category,
+            key=lambda c: STORE_CATEGORIES.index(c) if c in STORE_CATEGORIES else len(STORE_CATEGORIES),
+        )
+
+    def categories(self):
+        """가게가 하나라도 있는 카테고리 (get_categories()와 같은 순서)"""
+        return self._categories
+
+    def stores(self, category):
+        """get_stores(category)와 같은 형태: [{id, name, min_order_amount}, ...]"""
+        return self._stores_by_category.get(category, [])
+
+    def store(self, store_id):
+        return self._stores_by_id.get(store_id)
+
+    def all_stores(self):
+        """전체 가게 (id 순)"""
+        return list(self._stores_by_id.values())
+
+    def category(self, store_id):
+        return self._category_by_store.get(store_id)
+
+    def menus(self, store_id):
+        """get_menus(store_id)와 같은 형태: [{id, menu_name, price}, ...]"""
+        return self._menus_by_store.get(store_id, [])
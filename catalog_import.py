@@ -0,0 +1,212 @@
+import csv
+import io
+import json
+import re
+import time
+from dataclasses import dataclass, field
+import db
+from catalog import STORE_CATEGORIES
+
+# ---------------------------------------------------------
+# 가게/메뉴 한꺼번에 등록 (CSV / JSON)
+# ---------------------------------------------------------
+# add_page.py는 가게 하나, 메뉴 하나씩 폼으로 넣어서 실제 가게 목록(수백 곳, 메뉴 수천 개)을 넣기 어렵다.
+# 여기서는 파일을 한 줄씩 읽어 검사하고, 가게 IMPORT_CHUNK_SIZE곳씩 묶어서
+# db.upsert_catalog()로 넣는다 (묶음마다 트랜잭션 하나, executemany).
+#
+#     python manage.py import-catalog stores.csv
+#
+# CSV: 한 줄이 메뉴 하나 (가게 정보는 줄마다 반복, 메뉴 없이 가게만 넣으려면 menu_name을 비움)
+#     store_name,category,rating,min_order_amount,working_days,open_time,close_time,menu_name,price
+#     교촌치킨 부트캠프점,치킨,4.8,16000,"월, 화, 수, 목, 금",11:00,22:00,허니콤보,23000
+# JSON: 위와 같은 키를 가진 객체 목록, 또는 가게마다 "menus": [{"menu_name", "price"}]를 가진 가게 목록
+#     [{"store_name": "교촌치킨 부트캠프점", "category": "치킨", "menus": [{"menu_name": "허니콤보", "price": 23000}]}]
+# 같은 이름의 가게가 이미 있으면 비어 있지 않은 값만 고치고, 같은 메뉴가 있으면 가격만 고친다.
+
+IMPORT_CHUNK_SIZE = 500    # 한 트랜잭션에 넣는 가게 수
+MAX_ERRORS = 200           # 보고서에 남기는 잘못된 줄 수
+
+CSV_COLUMNS = ["store_name", "category", "rating", "min_order_amount", "working_days",
+               "open_time", "close_time", "menu_name", "price"]
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+_TIME = re.compile(r"^([01]?\d|2[0-3]):[0-5]\d$")
+
+
+@dataclass
+class ImportReport:
+    """import_catalog()의 결과"""
+    rows: int = 0                 # 읽은 줄(메뉴) 수
+    skipped: int = 0              # 잘못되어 건너뛴 줄 수
+    chunks: int = 0               # 트랜잭션 수
+    stores_inserted: int = 0
+    stores_updated: int = 0
+    menus_inserted: int = 0
+    menus_updated: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)   # (줄 번호, 메시지), 앞의 MAX_ERRORS개만
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return (f"{self.rows}줄 ({self.skipped}줄 건너뜀) / 가게 추가 {self.stores_inserted}·수정 {self.stores_updated}, "
+                f"메뉴 추가 {self.menus_inserted}·수정 {self.menus_updated} / "
+                f"{self.seconds:.2f}초, 초당 {self.rows_per_sec:,.0f}줄, 트랜잭션 {self.chunks}번")
+
+
+# --- 읽기 ---
+
+def read_csv(file):
+    """CSV 파일(텍스트 또는 바이트)에서 (줄 번호, dict)를 하나씩"""
+    if isinstance(file, (bytes, bytearray)):
+        file = io.StringIO(file.decode("utf-8-sig"))
+    elif isinstance(file, io.IOBase) and not isinstance(file, io.TextIOBase):
+        # 바이트 파일 (streamlit 업로드 파일 등)
+        file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    for line_no, row in enumerate(csv.DictReader(file), start=2):
+        yield line_no, row
+
+def read_json(data):
+    """JSON(문자열/바이트/파싱된 목록)에서 (순번, dict)를 하나씩. 가게 안의 menus는 메뉴마다 한 줄로 편다."""
+    if isinstance(data, (str, bytes, bytearray)):
+        data = json.loads(data)
+    if isinstance(data, dict):
+        data = data.get("stores", [data])
+    for i, item in enumerate(data, start=1):
+        if not isinstance(item, dict):
+            yield i, {}
+            continue
+        menus = item.get("menus")
+        if menus is None:
+            yield i, item
+            continue
+        store = {key: value for key, value in item.items() if key != "menus"}
+        if not menus:
+            yield i, store
+        for menu in menus:
+            yield i, {**store, **(menu if isinstance(menu, dict) else {"menu_name": menu})}
+
+def read_file(path):
+    """확장자(.json / 그 외는 CSV)를 보고 읽는다."""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8-sig") as f:
+            yield from read_json(f.read())
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            yield from read_csv(f)
+
+
+# --- 검사 ---
+
+def _text(row, key, max_len=255):
+    value = row.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    if len(value) > max_len:
+        raise ValueError(f"{key}가 너무 깁니다 ({max_len}자까지)")
+    return value or None
+
+def _number(row, key, cast, low=None, high=None):
+    value = row.get(key)
+    if value is None or str(value).strip() == "":
+        return None
+    try:
+        number = cast(str(value).replace(",", "").replace("원", "").strip())
+    except ValueError:
+        raise ValueError(f"{key}가 숫자가 아닙니다: {value!r}")
+    if low is not None and number < low:
+        raise ValueError(f"{key}는 {low} 이상이어야 합니다: {value!r}")
+    if high is not None and number > high:
+        raise ValueError(f"{key}는 {high} 이하여야 합니다: {value!r}")
+    return number
+
+def validate_row(row):
+    """한 줄을 검사해서 (가게 정보 dict, (메뉴명, 가격) 또는 None). 잘못되면 ValueError."""
+    name = _text(row, "store_name") or _text(row, "name")
+    if not name:
+        raise ValueError("store_name이 비어 있습니다")
+    category = _text(row, "category", 20)
+    if category not in STORE_CATEGORIES:
+        raise ValueError(f"category는 {', '.join(STORE_CATEGORIES)} 중 하나여야 합니다: {category!r}")
+    working_days = _text(row, "working_days")
+    if working_days:
+        days = [day.strip() for day in re.split(r"[,\s/]+", working_days) if day.strip()]
+        wrong = [day for day in days if day not in WEEKDAYS]
+        if wrong:
+            raise ValueError(f"working_days는 {'/'.join(WEEKDAYS)}만 쓸 수 있습니다: {', '.join(wrong)}")
+        working_days = ", ".join(sorted(set(days), key=WEEKDAYS.index))
+    for key in ("open_time", "close_time"):
+        value = _text(row, key, 10)
+        if value and not _TIME.match(value):
+            raise ValueError(f"{key}는 HH:MM 형식이어야 합니다: {value!r}")
+    rating = _number(row, "rating", float, 0, 5)
+    store = {
+        "name": name,
+        "category": category,
+        "rating": round(rating, 1) if rating is not None else None,
+        "min_order_amount": _number(row, "min_order_amount", int, 0),
+        "working_days": working_days,
+        "open_time": _text(row, "open_time", 10),
+        "close_time": _text(row, "close_time", 10),
+    }
+    menu_name = _text(row, "menu_name")
+    if not menu_name:
+        return store, None
+    price = _number(row, "price", int, 0)
+    if price is None:
+        raise ValueError(f"메뉴 '{menu_name}'의 price가 비어 있습니다")
+    return store, (menu_name, price)
+
+
+# --- 넣기 ---
+
+def _merge(chunk, store, menu):
+    """같은 가게의 여러 줄을 하나로 (비어 있지 않은 값은 나중 줄이 이김, 메뉴는 대소문자 무시하고 나중 가격)"""
+    key = store["name"].casefold()
+    merged = chunk.get(key)
+    if merged is None:
+        merged = chunk[key] = {**store, "menus": {}}
+    else:
+        merged.update({k: v for k, v in store.items() if v is not None})
+    if menu:
+        merged["menus"][menu[0].casefold()] = menu
+
+def import_catalog(rows, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False, progress=None):
+    """(줄 번호, dict)들을 검사해서 가게 chunk_size곳씩 트랜잭션으로 넣고 ImportReport를 돌려준다.
+
+    dry_run: 검사만 하고 DB에는 넣지 않음
+    progress: 묶음을 넣을 때마다 progress(report)를 부름 (화면 진행 표시용)
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    chunk = {}
+
+    def flush():
+        if chunk and not dry_run:
+            stores = [{**store, "menus": dict(store["menus"].values())} for store in chunk.values()]
+            counts = db.upsert_catalog(stores)
+            for key, value in counts.items():
+                setattr(report, key, getattr(report, key) + value)
+            report.chunks += 1
+        chunk.clear()
+        report.seconds = time.perf_counter() - started
+        if progress:
+            progress(report)
+
+    for line_no, row in rows:
+        report.rows += 1
+        try:
+            store, menu = validate_row(row)
+        except ValueError as e:
+            report.skipped += 1
+            if len(report.errors) < MAX_ERRORS:
+                report.errors.append((line_no, str(e)))
+            continue
+        if store["name"].casefold() not in chunk and len(chunk) >= chunk_size:
+            flush()
+        _merge(chunk, store, menu)
+    flush()
+    report.seconds = time.perf_counter() - started
+    return report
@@ -1,7 +1,47 @@
 import streamlit as st
+from concurrent.futures import TimeoutError
+from collections import deque
+from datetime import datetime, timedelta
 from db import *
+from metrics import instrument_render, record_payload
+from snapshot import *
+from writer import submit_chat, WRITE_TIMEOUT
+from live import LIVE_POLL_INTERVAL
 
-@st.fragment(run_every=2)
+CHAT_BUFFER_SIZE = 200  # 세션마다 들고 있는 최근 메시지 수
+
+
+def sync_chat_buffer():
+    """세션의 채팅 링 버퍼를 최신으로 맞춘다.
+
+    처음에는 최근 1시간치를 한 번 읽고, 그 뒤로는 채팅 버전이 바뀐 경우에만
+    마지막으로 본 id 이후의 새 메시지만 가져와 뒤에 붙인다.
+    """
+    version = data_version(("chat_messages",))
+    buffer = st.session_state.get("chat_buffer")
+    if buffer is None:
+        buffer = deque(get_recent_chat_messages(limit=CHAT_BUFFER_SIZE), maxlen=CHAT_BUFFER_SIZE)
+        st.session_state.chat_buffer = buffer
+        st.session_state.chat_version = version
+        # created_at은 DB 서버 시각이라 앱 서버 시계와의 차이(시간대 포함)를 한 번 재 둠
+        st.session_state.chat_clock_offset = get_db_now() - datetime.now()
+    elif st.session_state.get("chat_version") != version:
+        last_id = buffer[-1]['id'] if buffer else 0
+        new_messages = get_chat_messages_since(last_id, limit=CHAT_BUFFER_SIZE)
+        buffer.extend(new_messages)
+        # 한 번에 다 못 가져왔으면 다음 틱에 이어서 가져오도록 버전은 그대로 둠
+        if len(new_messages) < CHAT_BUFFER_SIZE:
+            st.session_state.chat_version = version
+
+    # 1시간이 지난 메시지는 앞에서부터 버림 (DB 서버 시각 기준, 처음 읽을 때의 NOW() - INTERVAL 1 HOUR와 같게)
+    cutoff = datetime.now() + st.session_state.chat_clock_offset - timedelta(hours=1)
+    while buffer and buffer[0]['created_at'] < cutoff:
+        buffer.popleft()
+    return buffer
+
+# 채팅은 이 조각만 LIVE_POLL_INTERVAL마다 다시 돌고(새 메시지만 메모리 버퍼에 붙임), 전체 화면은 다시 그리지 않는다.
+@st.fragment(run_every=LIVE_POLL_INTERVAL)
+@instrument_render("render_chat_content")
 def render_chat_content():
     st.header("💬 실시간 소통")
     st.caption("최근 1시간 내의 대화만 표시됩니다.")
@@ -16,9 +56,29 @@ def render_chat_content():
     # [보안] 금지된 닉네임 리스트 정의 (소문자로 비교 예정)
     RESERVED_NICKNAMES = ["system", "admin", "administrator", "root", "관리자", "운영자", "공지", "🎲 룰렛봇"]
 
-    messages = get_recent_chat_messages()
-    
-    with st.container(height=600, border=True):
+    # 메시지 칸을 먼저 자리만 잡아두고, 보낸 메시지를 저장한 뒤에 채움 (보낸 사람도 다시 그리기 없이 바로 보임)
+    messages_box = st.container(height=600, border=True)
+
+    if prompt := st.chat_input("메시지 입력..."):
+        if not username:
+            st.error("닉네임을 먼저 입력해주세요.")
+        elif username.strip().lower() in RESERVED_NICKNAMES:
+            # [보안] 닉네임 검증 로직
+            st.error("🚫 해당 닉네임은 시스템 예약어로 사용할 수 없습니다.")
+        elif "룰렛봇" in username:
+             st.error("🚫 '룰렛봇'을 사칭할 수 없습니다.")
+        else:
+            try:
+                submit_chat(username, prompt).result(timeout=WRITE_TIMEOUT)
+            except TimeoutError:
+                # 큐에 들어간 메시지는 곧 저장되므로 다시 보내지 않도록 알려주기만 함
+                st.toast("메시지를 저장 중입니다. 잠시 후 채팅창에 나타납니다.")
+
+    # 새 메시지가 있을 때만 마지막으로 본 id 이후분을 가져옴
+    messages = sync_chat_buffer()
+    record_payload(messages)
+
+    with messages_box:
         if not messages:
             st.info("아직 대화가 없습니다.")
         
@@ -31,15 +91,3 @@ def render_chat_content():
                 time_str = msg['created_at'].strftime("%H:%M")
                 st.markdown(f"**{msg['username']}** ({time_str})")
                 st.write(msg['message'])
-
-    if prompt := st.chat_input("메시지 입력..."):
-        if not username:
-            st.error("닉네임을 먼저 입력해주세요.")
-        elif username.strip().lower() in RESERVED_NICKNAMES:
-            # [보안] 닉네임 검증 로직
-            st.error("🚫 해당 닉네임은 시스템 예약어로 사용할 수 없습니다.")
-        elif "룰렛봇" in username:
-             st.error("🚫 '룰렛봇'을 사칭할 수 없습니다.")
-        else:
-            save_chat_message(username, prompt)
-            st.rerun()
\ No newline at end of file
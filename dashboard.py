@@ -0,0 +1,83 @@
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# 대시보드 스냅샷: 주문 조회 한 번으로 화면에 필요한 집계를 전부 계산
+# ---------------------------------------------------------
+# 예전에는 화면 조각마다 get_current_orders()와 get_store_totals(),
+# get_popular_store_stats()를 따로 불렀지만, 가게별 합계/주문 건수는 결국 같은 주문 목록의
+# GROUP BY라서 주문 목록 한 번만 읽고 pandas로 한꺼번에 계산한다.
+# (가게별 합계/건수는 이제 쓰기 때마다 갱신되는 store_totals 요약 테이블에서 받아온다)
+
+ORDER_COLUMNS = ["id", "eater_name", "store_name", "menu_name", "price", "quantity", "total"]
+STORE_TOTAL_COLUMNS = ["store_name", "total", "min_order_amount"]
+POPULAR_COLUMNS = ["store_name", "order_count"]
+
+
+@dataclass
+class DashboardSnapshot:
+    """대시보드 화면들이 같이 쓰는 집계 묶음 (여러 세션이 공유하므로 수정하지 말 것)"""
+    orders: pd.DataFrame                 # 주문 목록 (최신순, get_current_orders()와 같은 컬럼)
+    store_totals: pd.DataFrame           # 가게별 합계 (합계 큰 순, get_store_totals()와 같은 컬럼)
+    popular: pd.DataFrame                # 가게별 주문 건수 (많은 순, get_popular_store_stats()와 같은 컬럼)
+    reached_stores: list = field(default_factory=list)   # 최소주문금액을 넘긴 가게 이름
+    multi_eaters: list = field(default_factory=list)     # 성공한 파티 2곳 이상에 들어간 사람
+    multi_orders: pd.DataFrame = None    # 위 사람들의 성공한 파티 주문
+    store_ids: dict = field(default_factory=dict)        # 가게 이름 -> store_id (주문 목록 필터를 SQL로 넘길 때 사용)
+
+
+def build_dashboard(raw_orders, totals=None):
+    """주문 목록(store_id, min_order_amount 포함)으로 DashboardSnapshot을 만든다.
+
+    totals: 가게별 store_name/total/min_order_amount/order_count 표 (db의 store_totals 요약 테이블).
+    주어지면 주문 목록을 다시 GROUP BY 하지 않고 그대로 쓴다.
+    """
+    orders = raw_orders[ORDER_COLUMNS].reset_index(drop=True)
+
+    if totals is not None:
+        by_store = totals
+    else:
+        by_store = raw_orders.groupby("store_id", sort=False).agg(
+            store_name=("store_name", "first"),
+            total=("total", "sum"),
+            min_order_amount=("min_order_amount", "first"),
+            order_count=("id", "size"),
+        )
+    store_totals = by_store.sort_values("total", ascending=False, kind="stable")[STORE_TOTAL_COLUMNS].reset_index(drop=True)
+    popular = by_store.sort_values("order_count", ascending=False, kind="stable")[POPULAR_COLUMNS].reset_index(drop=True)
+
+    store_ids = dict(zip(by_store["store_name"], by_store["store_id"] if "store_id" in by_store else by_store.index))
+
+    reached = store_totals[store_totals["total"] >= store_totals["min_order_amount"]]["store_name"]
+    success_orders = orders[orders["store_name"].isin(reached)]
+    # 같은 가게에서 메뉴 여러 개를 시킨 건 중복이 아니므로 서로 다른 가게 수로 판단
+    party_count = success_orders.groupby("eater_name", sort=False)["store_name"].nunique()
+    multi_eaters = party_count[party_count > 1].index.tolist()
+
+    return DashboardSnapshot(
+        orders=orders,
+        store_totals=store_totals,
+        popular=popular,
+        reached_stores=reached.tolist(),
+        multi_eaters=multi_eaters,
+        multi_orders=success_orders[success_orders["eater_name"].isin(multi_eaters)],
+        store_ids=store_ids,
+    )
+
+
+def store_status(store_totals):
+    """가게별 주문 가능 여부 표.
+
+    store_totals에 '선택'(체크박스, 미달 가게는 None), '상태' 문구, reached(최소주문금액 달성 여부)
+    컬럼을 붙여서 돌려준다. 행마다 파이썬 함수를 부르지 않고 컬럼 단위로 한 번에 계산한다.
+    """
+    shortfall = (store_totals["min_order_amount"] - store_totals["total"]).to_numpy(dtype="int64")
+    reached = shortfall <= 0
+    message = "❌ " + pd.Series(shortfall, index=store_totals.index).map("{:,}원 부족".format)
+
+    display = store_totals.copy()
+    display.insert(0, "선택", np.where(reached, False, None))
+    display["상태"] = np.where(reached, "✅ 주문 가능", message)
+    display["reached"] = reached
+    return display
@@ -0,0 +1,174 @@
+import itertools
+import random
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+import db
+from catalog import STORE_CATEGORIES
+
+# ---------------------------------------------------------
+# 합성 데이터 (벤치마크용 가게/메뉴/주문/채팅)
+# ---------------------------------------------------------
+# 1.sql에는 가게 19곳 / 메뉴 90개 / 채팅 20개뿐이라 데이터가 10배~1000배일 때 쿼리와 화면 계산이
+# 어떻게 느려지는지 알 수 없다. 여기서는 seed가 같으면 항상 같은 가게/메뉴/주문/채팅을 만들고,
+# LOAD_CHUNK_SIZE행씩 db.bulk_load()로 넣는다 (주문 수백만 건도 메모리에 다 올리지 않음).
+#
+#     python manage.py generate-data --scale x100 --reset
+#     python manage.py generate-data --scale x10 --orders 1000000 --seed 7
+#
+# 테이블마다 seed에서 따로 난수를 뽑으므로 주문 수만 바꿔도 가게/메뉴는 그대로다.
+# 시각(created_at)만 실행 시각 기준이다 (채팅은 최근 2시간에 고르게 퍼져서 절반쯤이 1시간 조회 범위에 들어감).
+# 주문은 인기 있는 가게에 몰리게(순위의 -0.8제곱 비율) 뽑아서 최소주문금액을 넘는 가게와 못 넘는 가게가 섞인다.
+
+LOAD_CHUNK_SIZE = 5000   # 한 트랜잭션에 넣는 행 수
+
+
+@dataclass(frozen=True)
+class DataSpec:
+    """만들 데이터 크기"""
+    stores: int
+    menus_per_store: int
+    orders: int
+    chat_messages: int
+    eaters: int              # 주문하는 사람 수 (중복 참여자가 생기도록 주문 수보다 적게)
+
+    def scaled(self, factor):
+        """가게당 메뉴 수는 그대로, 나머지는 factor배"""
+        return replace(self, stores=self.stores * factor, orders=self.orders * factor,
+                       chat_messages=self.chat_messages * factor, eaters=self.eaters * factor)
+
+
+BASE_SPEC = DataSpec(stores=20, menus_per_store=5, orders=20, chat_messages=20, eaters=10)   # 1.sql 정도
+SCALES = {"x1": 1, "x10": 10, "x100": 100, "x1000": 1000}
+
+
+def spec_for(scale="x1", **overrides):
+    """SCALES 이름으로 DataSpec. None이 아닌 overrides(stores=..., orders=... 등)로 덮어씀"""
+    spec = BASE_SPEC.scaled(SCALES[scale])
+    return replace(spec, **{key: value for key, value in overrides.items() if value is not None})
+
+
+# --- 이름 재료 ---
+
+_CATEGORY_WORDS = {
+    '패스트푸드': (["버거하우스", "맥스버거", "치즈킹"], ["불고기 버거", "치즈 버거", "감자튀김", "치킨 너겟"]),
+    '카페·디저트': (["커피공방", "더리터", "빵굽는집"], ["아메리카노", "카페라떼", "크로플", "딸기 케이크"]),
+    '한식': (["팔도국밥", "엄마밥상", "한솥"], ["섞어국밥", "제육덮밥", "김치찌개", "된장찌개", "비빔밥"]),
+    '찜·탕': (["달인의 찜닭", "김치찜은 못참지", "감자탕집"], ["순살 찜닭", "삼겹 김치찜", "감자탕", "해물탕"]),
+    '분식': (["엽기떡볶이", "김밥천국", "신전분식"], ["떡볶이", "순대", "김밥", "튀김", "라볶이"]),
+    '중식': (["상해", "삼국지", "홍콩반점"], ["짜장면", "짬뽕", "탕수육", "볶음밥", "짬짜면"]),
+    '돈까스·회': (["돈까스클럽", "바다회관", "카츠야"], ["등심 돈까스", "치즈 돈까스", "모둠회", "연어덮밥"]),
+    '피자': (["피자스쿨", "도우앤", "피자헛"], ["치즈 피자", "페퍼로니 피자", "포테이토 피자", "콤비네이션 피자"]),
+    '치킨': (["교촌치킨", "BHC 치킨", "굽네치킨"], ["후라이드 치킨", "양념 치킨", "허니콤보", "간장 치킨"]),
+    '양식': (["파스타하우스", "브런치랩", "스테이크앤"], ["토마토 파스타", "크림 파스타", "리조또", "스테이크"]),
+    '고기': (["고기굽는남자", "삼겹살공장", "소갈비집"], ["삼겹살", "목살", "양념 갈비", "차돌박이"]),
+    '아시안': (["포메인", "쌀국수집", "타이키친"], ["쌀국수", "팟타이", "분짜", "똠양꿍"]),
+    '족발·보쌈': (["가장맛있는족발", "원할머니보쌈", "족발야시장"], ["앞다리 족발", "보쌈", "막국수", "불족발"]),
+}
+_AREAS = ["부트캠프", "시지", "알파시티", "펜타힐즈", "경산", "수성", "동성로", "반월당"]
+_WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+_CHAT_LINES = ["오늘 뭐 먹어요?", "{store} 어때요?", "{store} 최소금액 얼마 남았어요?", "저 {menu} 담았어요",
+               "심부름 누가 가요?", "10분 뒤 마감합니다", "ㅋㅋㅋㅋ", "{store} 너무 멀어요", "저도 끼워주세요"]
+
+
+def _rng(seed, table):
+    # 테이블마다 따로: 주문 수를 바꿔도 가게/메뉴는 같게
+    return random.Random(f"{seed}:{table}")
+
+
+# --- 만들기 ---
+
+def generate(spec, seed=0, first_store_id=1, first_menu_id=1, now=None):
+    """{테이블: 행 iterator} (db.BULK_LOAD_COLUMNS 순서의 튜플, 넣어야 하는 순서대로)
+
+    가게/메뉴는 목록으로, 주문/채팅은 넣는 동안 하나씩 만드는 generator로 돌려준다.
+    """
+    now = now or datetime.now().replace(microsecond=0)
+    rng = _rng(seed, "stores")
+    stores = []
+    for i in range(spec.stores):
+        category = STORE_CATEGORIES[i % len(STORE_CATEGORIES)] if i < len(STORE_CATEGORIES) else rng.choice(STORE_CATEGORIES)
+        brand = rng.choice(_CATEGORY_WORDS[category][0])
+        days = _WEEKDAYS[:5] if rng.random() < 0.6 else _WEEKDAYS
+        stores.append((
+            first_store_id + i, f"{brand} {rng.choice(_AREAS)}{i + 1}호점", category,
+            round(rng.uniform(3.5, 5.0), 1), rng.randint(10, 30) * 1000, ", ".join(days),
+            f"{rng.randint(9, 11):02d}:00", f"{rng.randint(20, 23):02d}:00",
+        ))
+
+    rng = _rng(seed, "menus")
+    menus, menus_by_store = [], []
+    for store_id, _, category, *_ in stores:
+        words = _CATEGORY_WORDS[category][1]
+        store_menus = []
+        for j in range(spec.menus_per_store):
+            name = words[j % len(words)] if j < len(words) else f"{rng.choice(words)} {j // len(words) + 1}호"
+            menu = (first_menu_id + len(menus), store_id, name, rng.randint(20, 300) * 100)
+            menus.append(menu)
+            store_menus.append(menu)
+        menus_by_store.append(store_menus)
+
+    return {
+        "stores": stores,
+        "menus": menus,
+        "orders": _orders(spec, seed, stores, menus_by_store, now),
+        "chat_messages": _chat_messages(spec, seed, stores, menus, now),
+    }
+
+
+def _orders(spec, seed, stores, menus_by_store, now):
+    rng = _rng(seed, "orders")
+    # 가게 순서를 섞고 앞쪽일수록 많이 뽑히게 (인기 가게에 몰림)
+    ranked = list(range(len(stores)))
+    rng.shuffle(ranked)
+    weights = [0.0] * len(stores)
+    for rank, index in enumerate(ranked):
+        weights[index] = (rank + 1) ** -0.8
+    cum_weights = list(itertools.accumulate(weights))
+    indexes = range(len(stores))
+    for _ in range(spec.orders if stores and spec.menus_per_store else 0):
+        index = rng.choices(indexes, cum_weights=cum_weights)[0]
+        menu_id, store_id, menu_name, price = rng.choice(menus_by_store[index])
+        yield (f"user{rng.randrange(spec.eaters)}", store_id, menu_id, stores[index][1], menu_name, price,
+               rng.choices((1, 2, 3), (6, 3, 1))[0], now - timedelta(seconds=rng.randrange(3 * 3600)))
+
+
+def _chat_messages(spec, seed, stores, menus, now):
+    rng = _rng(seed, "chat_messages")
+    window = 2 * 3600
+    for i in range(spec.chat_messages):
+        line = rng.choice(_CHAT_LINES)
+        if stores:
+            line = line.format(store=rng.choice(stores)[1], menu=rng.choice(menus)[2] if menus else "")
+        # 오래된 것부터 (id 순서와 시각 순서가 같게)
+        yield (f"user{rng.randrange(spec.eaters)}", line, now - timedelta(seconds=window * (spec.chat_messages - i) // spec.chat_messages))
+
+
+# --- 넣기 ---
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, size)):
+        yield chunk
+
+
+def load(spec, seed=0, reset=False, chunk_size=LOAD_CHUNK_SIZE, progress=None):
+    """spec 크기의 합성 데이터를 지금 DB에 넣고 {테이블: 행 수, "seconds": 걸린 시간}을 돌려준다.
+
+    reset: 넣기 전에 가게/메뉴/주문/채팅을 전부 지움 (없으면 기존 데이터 뒤에 이어서 넣음)
+    progress: 묶음을 넣을 때마다 progress(테이블, 지금까지 넣은 행 수)
+    """
+    started = time.perf_counter()
+    if reset:
+        db.delete_all_data()
+    ids = db.next_ids()
+    counts = {}
+    for table, rows in generate(spec, seed, ids["stores"], ids["menus"]).items():
+        counts[table] = 0
+        for chunk in _chunks(rows, chunk_size):
+            counts[table] += db.bulk_load(table, chunk)
+            if progress:
+                progress(table, counts[table])
+    db.finish_bulk_load()
+    counts["seconds"] = time.perf_counter() - started
+    return counts
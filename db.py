@@ -1,74 +1,813 @@
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
 import pymysql
 import pandas as pd
+import events
+import metrics
+from backends import make_backend
+from dashboard import build_dashboard
+
+# ---------------------------------------------------------
+# 1. DB 접속 설정 & 커넥션 풀
+# ---------------------------------------------------------
+# 접속 정보는 환경 변수로 바꾼다 (없으면 아래 기본값)
+DB_CONFIG = {
+    "host": os.environ.get("BAEMIN_DB_HOST", "172.30.1.12"),      # DB 주소
+    "port": int(os.environ.get("BAEMIN_DB_PORT", "3306")),
+    "user": os.environ.get("BAEMIN_DB_USER", "root"),             # DB 유저명
+    "password": os.environ.get("BAEMIN_DB_PASSWORD", "1234"),     # DB 비밀번호
+    "database": os.environ.get("BAEMIN_DB_NAME", "baemin"),       # DB 이름
+    "charset": "utf8mb4",
+}
+
+# 읽기 전용 복제본 (쉼표로 구분. mariadb는 "host" 또는 "host:port", sqlite는 파일 경로). 비어 있으면 읽기도 위 DB로
+DB_REPLICAS = [replica.strip() for replica in os.environ.get("BAEMIN_DB_REPLICAS", "").split(",") if replica.strip()]
+READ_PIN_SECONDS = float(os.environ.get("BAEMIN_READ_PIN_SECONDS", "3"))   # 쓰고 나서 읽기도 주 DB로 보내는 시간(초)
+REPLICA_RETRY_SECONDS = 10   # 접속이 안 된 복제본을 빼 두는 시간(초)
+
+# 'mariadb'(DB_CONFIG 서버) 또는 'sqlite'(서버 없이 파일 하나, 경로는 BAEMIN_SQLITE_PATH)
+DB_BACKEND = os.environ.get("BAEMIN_DB_BACKEND", "mariadb")
+
+POOL_SIZE = 10            # 프로세스 전체에서 동시에 열어둘 최대 커넥션 수
+POOL_TIMEOUT = 5          # 풀이 가득 찼을 때 빈 커넥션을 기다리는 최대 시간(초)
+POOL_PING_INTERVAL = 5    # 이 시간(초) 이상 놀고 있던 커넥션은 꺼낼 때 ping으로 살아있는지 확인
+
+logger = logging.getLogger("baemin.db")
+
+
+class PooledConnection:
+    """풀에서 빌려온 커넥션.
+
+    DB 커넥션(pymysql/sqlite3)처럼 그대로 쓰면 되고, close() 하면 실제로 끊지 않고 풀에 반납한다.
+    `with get_db_connection() as conn:` 형태로 쓰면 예외가 나도 자동으로 반납된다.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise pymysql.err.InterfaceError("이미 풀에 반납된 커넥션입니다.")
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+    @property
+    def raw(self):
+        """실제 DB 커넥션 (pandas처럼 커넥션 종류를 보고 동작이 달라지는 곳에 넘길 때)"""
+        return self._conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # 반납을 잊은 경우(st.rerun() 예외 등)에도 커넥션이 새지 않도록
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """프로세스 전체가 공유하는 크기 제한 커넥션 풀 (스레드 안전)"""
+
+    def __init__(self, backend, size=POOL_SIZE, timeout=POOL_TIMEOUT, ping_interval=POOL_PING_INTERVAL):
+        self.backend = backend
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self._idle = []          # (커넥션, 반납 시각) - 마지막에 반납된 것부터 재사용
+        self._opened = 0         # 현재 열려있는 실제 커넥션 수 (대여 중 + 대기 중)
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,      # 커넥션을 빌려간 횟수
+            "waits": 0,          # 풀이 가득 차서 기다린 횟수
+            "wait_seconds": 0.0, # 기다린 시간 합계
+            "timeouts": 0,       # 기다리다 포기한 횟수
+            "connects": 0,       # 새로 연결한 횟수
+            "reconnects": 0,     # 끊긴 커넥션을 다시 연결한 횟수
+        }
+
+    def _connect(self):
+        return self.backend.connect()
+
+    def acquire(self):
+        with self._cond:
+            self._stats["checkouts"] += 1
+            if not self._idle and self._opened >= self.size:
+                self._stats["waits"] += 1
+                started = time.monotonic()
+                ready = self._cond.wait_for(lambda: self._idle or self._opened < self.size, timeout=self.timeout)
+                self._stats["wait_seconds"] += time.monotonic() - started
+                if not ready:
+                    self._stats["timeouts"] += 1
+                    raise TimeoutError(f"DB 커넥션 풀 대기 시간({self.timeout}초) 초과")
+            if self._idle:
+                conn, released_at = self._idle.pop()
+            else:
+                conn, released_at = None, None
+                self._opened += 1  # 연결하는 동안 다른 스레드가 자리를 차지하지 않도록 미리 예약
+
+        try:
+            if conn is None:
+                conn = self._connect()
+                self._count("connects")
+            elif time.monotonic() - released_at >= self.ping_interval:
+                conn = self._ensure_alive(conn)
+        except Exception:
+            self._discard()
+            raise
+        return PooledConnection(self, conn)
+
+    def _ensure_alive(self, conn):
+        """오래 놀던 커넥션은 ping 해보고, 끊겨 있으면 새로 연결한다."""
+        try:
+            self.backend.ping(conn)
+            return conn
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            conn = self._connect()
+            self._count("reconnects")
+            return conn
+
+    def release(self, conn):
+        try:
+            # 읽기만 한 커넥션도 트랜잭션 스냅샷이 남아 다음 사용자가 옛날 데이터를 보지 않도록 정리
+            conn.rollback()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            self._discard()
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self):
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+
+    def _count(self, key):
+        with self._cond:
+            self._stats[key] += 1
+
+    def stats(self):
+        """풀 크기 산정용 카운터"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(size=self.size, opened=self._opened, idle=len(self._idle), in_use=self._opened - len(self._idle))
+        return stats
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+# 쓰기 직후 읽기를 주 DB로 보낼 시각 (컨텍스트별: streamlit 세션의 스크립트 스레드, 거기서 aiodb로 띄운 조회는 같이 따라감)
+_read_pinned_until = contextvars.ContextVar("baemin_read_pinned_until", default=0.0)
+
+
+class ReadRouter:
+    """읽기 전용 조회를 복제본 풀로, 나머지는 주 DB 풀로 보낸다 (복제본이 없으면 전부 주 DB).
+
+    - 프로세스마다 복제본 하나를 골라 계속 쓴다. data_versions와 그 뒤에 읽는 주문/카탈로그가
+      같은 복제본에서 와야 공유 캐시(snapshot.py)가 새 버전 번호에 옛날 데이터를 묶어 두지 않는다.
+    - 쓰기를 한 컨텍스트(방금 주문한 세션)는 pin_seconds 동안 읽기도 주 DB로 보낸다 (pin_reads_to_primary).
+      다른 세션의 읽기는 그대로 복제본으로 가므로 점심시간에 쓰기가 몰려도 읽기가 주 DB로 쏠리지 않는다.
+      pin_seconds는 복제 지연(SHOW SLAVE STATUS의 Seconds_Behind_Master)보다 길게 잡을 것.
+    - 복제본에 접속이 안 되면 retry_seconds 동안 빼 두고 다음 복제본(없으면 주 DB)으로 보낸다.
+    """
+
+    def __init__(self, primary, replicas=(), pin_seconds=READ_PIN_SECONDS, retry_seconds=REPLICA_RETRY_SECONDS):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.pin_seconds = pin_seconds
+        self.retry_seconds = retry_seconds
+        self._first = random.randrange(len(self.replicas)) if self.replicas else 0
+        self._down_until = [0.0] * len(self.replicas)
+        self._lock = threading.Lock()
+        self._stats = {
+            "primary_reads": 0,  # 복제본이 없어서 / 모두 접속이 안 돼서 주 DB로 간 읽기
+            "pinned_reads": 0,   # 쓰기 직후라 주 DB로 간 읽기
+            "replica_reads": 0,  # 복제본으로 간 읽기
+            "replica_errors": 0, # 복제본 접속 실패
+        }
+
+    def pin(self, seconds=None):
+        if self.replicas:
+            _read_pinned_until.set(time.monotonic() + (self.pin_seconds if seconds is None else seconds))
+
+    def is_pinned(self):
+        return bool(self.replicas) and time.monotonic() < _read_pinned_until.get()
+
+    def acquire(self):
+        now = time.monotonic()
+        if self.is_pinned():
+            self._count("pinned_reads")
+            return self.primary.acquire()
+        for offset in range(len(self.replicas)):
+            index = (self._first + offset) % len(self.replicas)
+            if now < self._down_until[index]:
+                continue
+            try:
+                conn = self.replicas[index].acquire()
+            except Exception as e:
+                logger.warning("복제본 %s에 접속하지 못해 %s초 동안 뺍니다: %s",
+                               self.replicas[index].backend.describe(), self.retry_seconds, e)
+                with self._lock:
+                    self._down_until[index] = now + self.retry_seconds
+                    self._stats["replica_errors"] += 1
+                continue
+            self._count("replica_reads")
+            return conn
+        self._count("primary_reads")
+        return self.primary.acquire()
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            down = sum(until > time.monotonic() for until in self._down_until)
+        stats.update(replicas=len(self.replicas), replicas_down=down)
+        return stats
+
+    def close_all(self):
+        for pool in self.replicas:
+            pool.close_all()
+
+
+def _default_backend(name=DB_BACKEND):
+    return make_backend(name, **DB_CONFIG) if name == "mariadb" else make_backend(name)
+
+def replica_backend(replica, name=DB_BACKEND):
+    """DB_REPLICAS 항목 하나("host[:port]" 또는 SQLite 파일 경로)로 백엔드 생성 (계정/DB 이름은 DB_CONFIG와 같음)"""
+    if name == "mariadb":
+        host, _, port = replica.partition(":")
+        return make_backend(name, **{**DB_CONFIG, "host": host, "port": int(port) if port else DB_CONFIG["port"]})
+    return make_backend(name, path=replica)
+
+_backend = _default_backend()
+_pool = ConnectionPool(_backend)
+_router = ReadRouter(_pool, [ConnectionPool(replica_backend(replica)) for replica in DB_REPLICAS])
+metrics.add_gauge_source(lambda: {f"db_pool_{name}": value for name, value in _pool.stats().items()})
+metrics.add_gauge_source(lambda: {f"db_read_{name}": int(value) for name, value in _router.stats().items()})
 
 # ---------------------------------------------------------
 # 2. [주문 & 채팅] DB 연결 및 쿼리 함수
 # ---------------------------------------------------------
 def get_db_connection():
-    return pymysql.connect(
-        host="172.30.1.12",      # DB 주소
-        user="root",           # DB 유저명
-        password="1234",   # DB 비밀번호
-        database="baemin",   # DB 이름
-        charset='utf8mb4'
-    )
+    """주 DB 풀에서 커넥션을 빌려온다. 다 쓰면 close() 하거나 with 문으로 사용 (쓰기와 쓰기 전 확인용 조회)"""
+    return _pool.acquire()
+
+def get_read_connection():
+    """읽기 전용 조회용 커넥션 (복제본이 있으면 복제본, 쓰기 직후나 복제본이 없으면 주 DB - ReadRouter 참고)"""
+    return _router.acquire()
+
+def pin_reads_to_primary(seconds=None):
+    """지금 컨텍스트(이 세션)의 읽기를 seconds(기본 READ_PIN_SECONDS)초 동안 주 DB로 - 방금 쓴 것을 바로 읽어야 할 때
+
+    db.py의 쓰기 함수는 커밋 후 자동으로 부르고, writer.py는 쓰기를 큐에 넣을 때 부른다.
+    """
+    _router.pin(seconds)
+
+def reads_pinned():
+    """지금 컨텍스트의 읽기가 주 DB로 고정되어 있는지 (snapshot.py가 복제본에서 읽은 공유 캐시와 섞지 않으려고 확인)"""
+    return _router.is_pinned()
+
+def get_pool_stats():
+    return _pool.stats()
+
+def get_read_stats():
+    """읽기 라우팅 카운터와 복제본 풀 상태"""
+    stats = _router.stats()
+    stats["replica_pools"] = {pool.backend.describe(): pool.stats() for pool in _router.replicas}
+    return stats
+
+def get_backend():
+    return _backend
+
+def configure_backend(backend, size=POOL_SIZE, replicas=(), pin_seconds=READ_PIN_SECONDS):
+    """백엔드(backends.make_backend() 결과)나 풀 크기, 복제본 백엔드 목록을 바꿔서 풀을 새로 만든다 (벤치마크·테스트용)"""
+    global _backend, _pool, _router
+    _pool.close_all()
+    _router.close_all()
+    _backend = backend
+    _pool = ConnectionPool(backend, size=size)
+    _router = ReadRouter(_pool, [ConnectionPool(replica, size=size) for replica in replicas], pin_seconds=pin_seconds)
+
+def configure_pool(size=POOL_SIZE, replicas=None, **db_config):
+    """MariaDB 접속 정보(host, port, ...)나 풀 크기, 복제본("host[:port]" 목록, None이면 DB_REPLICAS)을 바꿔서 풀을 새로 만든다"""
+    DB_CONFIG.update(db_config)
+    backend = _default_backend("mariadb") if db_config else _backend
+    replicas = DB_REPLICAS if replicas is None else replicas
+    configure_backend(backend, size=size, replicas=[replica_backend(replica, backend.name) for replica in replicas])
+
+def dict_cursor(conn):
+    """행을 {컬럼: 값} dict로 돌려주는 커서 (pymysql의 DictCursor)"""
+    return _backend.dict_cursor(conn)
+
+# --- 쿼리 실행 (metrics.py로 시간/행 수 기록) ---
+
+def execute(cursor, query, params=None):
+    """cursor.execute() 대신 사용. 실행 시간과 행 수가 쿼리 통계에 남는다."""
+    with metrics.timed_query(query) as record:
+        _backend.execute(cursor, query, params)
+        record.rows = max(cursor.rowcount, 0)
+    return cursor
+
+def executemany(cursor, query, seq_of_params):
+    with metrics.timed_query(query) as record:
+        _backend.executemany(cursor, query, seq_of_params)
+        record.rows = max(cursor.rowcount, 0)
+    return cursor
+
+def read_df(query, conn, params=None):
+    """pd.read_sql() 대신 사용"""
+    with metrics.timed_query(query) as record:
+        df = pd.read_sql(_backend.translate(query), getattr(conn, "raw", conn), params=params)
+        record.rows = len(df)
+    return df
+
+# --- 쓰기 알림 ---
+# 주문/채팅을 쓰는 함수는 커밋 후 변경된 테이블 이름으로 이벤트를 발행한다.
+# (snapshot.py의 공유 캐시와 live.py의 화면 갱신이 이 이벤트를 구독한다)
+def notify_write(table):
+    pin_reads_to_primary()   # 쓴 세션은 자기 쓰기를 바로 읽도록 잠깐 주 DB에서 읽음
+    events.publish(table)
+
+# --- 데이터 버전 ---
+# data_versions 테이블에 테이블별 버전 숫자를 두고, 쓰기 트랜잭션 안에서 1씩 올린다.
+# 화면 쪽은 이 숫자만 (PK 조회 한 번으로) 확인해서 바뀐 게 없으면 다시 읽지 않는다.
+VERSIONED_TABLES = ("orders", "stores", "menus", "chat_messages", "orders_history")
+
+def bump_version(cursor, table):
+    """쓰기 트랜잭션 안에서 호출 (commit은 호출한 쪽에서)"""
+    execute(cursor, "UPDATE data_versions SET version = version + 1 WHERE table_name = %s", (table,))
+
+def get_data_versions():
+    """{테이블 이름: 버전} 조회"""
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        execute(cursor, "SELECT table_name, version FROM data_versions")
+        versions = {name: version for name, version in cursor.fetchall()}
+    return versions
 
 # --- 채팅 관련 DB 함수 ---
 
-def get_recent_chat_messages():
-    """최근 1시간 이내의 채팅 내역만 가져오기"""
-    conn = get_db_connection()
-    cursor = conn.cursor(pymysql.cursors.DictCursor)
+CHAT_FETCH_LIMIT = 200  # 한 번에 가져오는 최대 메시지 수
+
+def get_recent_chat_messages(limit=CHAT_FETCH_LIMIT):
+    """최근 1시간 이내의 채팅 내역 중 마지막 limit개만 가져오기 (created_at 인덱스 범위 조회)"""
     query = """
-        SELECT username, message, created_at 
+        SELECT id, username, message, created_at 
         FROM chat_messages 
         WHERE created_at >= NOW() - INTERVAL 1 HOUR 
-        ORDER BY created_at ASC
+        ORDER BY created_at DESC, id DESC
+        LIMIT %s
     """
-    cursor.execute(query)
-    messages = cursor.fetchall()
-    conn.close()
+    with get_read_connection() as conn:
+        cursor = dict_cursor(conn)
+        execute(cursor, query, (limit,))
+        messages = cursor.fetchall()
+    return list(reversed(messages))
+
+def get_db_now():
+    """DB 서버 기준 지금 시각 (created_at과 같은 시간대 - 앱 서버와 시간대/시계가 다를 수 있음)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        execute(cursor, "SELECT NOW()")
+        now = cursor.fetchone()[0]
+    return datetime.fromisoformat(now) if isinstance(now, str) else now
+
+def get_chat_messages_since(last_id, limit=CHAT_FETCH_LIMIT):
+    """last_id 이후에 새로 올라온 메시지만 오래된 순으로 가져오기 (PK 범위 조회)"""
+    query = """
+        SELECT id, username, message, created_at 
+        FROM chat_messages 
+        WHERE id > %s 
+        ORDER BY id ASC
+        LIMIT %s
+    """
+    with get_read_connection() as conn:
+        cursor = dict_cursor(conn)
+        execute(cursor, query, (last_id, limit))
+        messages = cursor.fetchall()
     return messages
 
 def save_chat_message(username, message):
     """채팅 메시지 DB 저장"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
     query = "INSERT INTO chat_messages (username, message) VALUES (%s, %s)"
-    cursor.execute(query, (username, message))
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        execute(cursor, query, (username, message))
+        bump_version(cursor, "chat_messages")
+        conn.commit()
+    notify_write("chat_messages")
+
+# --- 가게별 합계 요약 (store_totals) ---
+# 가게별 주문 합계/건수를 매번 orders 전체에서 GROUP BY 하지 않도록,
+# 주문을 쓰거나 지울 때 같은 트랜잭션 안에서 store_totals 행을 더하고 뺀다.
+# 읽을 때는 가게 수만큼만 읽으면 된다. 어긋났는지는 check_store_totals(),
+# 다시 맞추는 건 rebuild_store_totals() (`python manage.py check-totals / rebuild-totals`).
+
+STORE_TOTALS_QUERY = """
+    SELECT store_id, SUM(price * quantity) as total, COUNT(*) as order_count
+    FROM orders
+    GROUP BY store_id
+"""
+
+def _add_store_totals(cursor, deltas):
+    """deltas: {store_id: (합계 변화량, 건수 변화량)} - 쓰기 트랜잭션 안에서 호출"""
+    if not deltas:
+        return
+    query = """
+        INSERT INTO store_totals (store_id, total, order_count) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE total = total + VALUES(total), order_count = order_count + VALUES(order_count)
+    """
+    executemany(cursor, query, [(store_id, total, count) for store_id, (total, count) in deltas.items()])
+    # 주문이 다 빠진 가게는 요약에서도 지움 (GROUP BY 결과에 안 나오는 것과 같게)
+    if any(count < 0 for _, count in deltas.values()):
+        execute(cursor, "DELETE FROM store_totals WHERE order_count <= 0")
+
+def _order_deltas(orders, sign=1):
+    """(store_id, 금액) 목록을 가게별 (합계, 건수) 변화량으로 묶는다."""
+    deltas = {}
+    for store_id, amount in orders:
+        total, count = deltas.get(store_id, (0, 0))
+        deltas[store_id] = (total + sign * amount, count + sign)
+    return deltas
+
+def _delete_orders_by_id(cursor, order_ids):
+    """주문 삭제 + 요약 테이블 차감 (쓰기 트랜잭션 안에서 호출)"""
+    format_strings = ','.join(['%s'] * len(order_ids))
+    # 지울 행을 잠그면서 금액을 읽어둬야 동시에 지워도 두 번 빼지 않음
+    execute(cursor, f"SELECT store_id, price * quantity FROM orders WHERE id IN ({format_strings}) FOR UPDATE",
+            tuple(order_ids))
+    deleted = cursor.fetchall()
+    execute(cursor, f"DELETE FROM orders WHERE id IN ({format_strings})", tuple(order_ids))
+    _add_store_totals(cursor, _order_deltas(deleted, sign=-1))
+
+def check_store_totals():
+    """요약 테이블과 orders를 다시 집계한 값이 다른 가게 목록 (비어 있으면 정상)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        execute(cursor, STORE_TOTALS_QUERY)
+        actual = {store_id: (int(total), count) for store_id, total, count in cursor.fetchall()}
+        execute(cursor, "SELECT store_id, total, order_count FROM store_totals WHERE order_count > 0")
+        stored = {store_id: (int(total), count) for store_id, total, count in cursor.fetchall()}
+    return [
+        {"store_id": store_id, "expected": actual.get(store_id, (0, 0)), "stored": stored.get(store_id, (0, 0))}
+        for store_id in sorted(actual.keys() | stored.keys())
+        if actual.get(store_id) != stored.get(store_id)
+    ]
+
+def rebuild_store_totals():
+    """orders 전체를 다시 집계해서 요약 테이블을 새로 채운다."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # orders를 잠가서 다시 채우는 동안 들어온 주문이 빠지지 않게 함
+        execute(cursor, "SELECT COUNT(*) FROM orders FOR UPDATE")
+        execute(cursor, "DELETE FROM store_totals")
+        execute(cursor, "INSERT INTO store_totals (store_id, total, order_count)" + STORE_TOTALS_QUERY)
+        bump_version(cursor, "orders")
+        conn.commit()
+    notify_write("orders")
+
+# --- 주문 라운드 (점심 한 판) ---
+# 주문은 라운드 단위로 모은다. orders에는 아직 마감하지 않은 현재 라운드의 주문만 있고,
+# 마감(close_order_round)하면 같은 트랜잭션 안에서 orders_history로 옮겨진다.
+# 그래서 화면이 2초마다 읽는 쿼리는 항상 이번 판 주문만 읽고,
+# 지난 기록 분석(get_round_summaries 등)은 orders를 건드리지 않는다.
+
+def _current_round_id(cursor, lock=False):
+    """열려 있는 라운드 id (없으면 새로 연다) - 쓰기 트랜잭션 안에서 호출
+
+    lock=True면 마감과 동시에 들어온 주문이 마감된 라운드에 붙지 않도록 라운드 행을 공유 잠금한다.
+    """
+    query = "SELECT id FROM order_rounds WHERE closed_at IS NULL ORDER BY id DESC LIMIT 1"
+    execute(cursor, query + (" LOCK IN SHARE MODE" if lock else ""))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    execute(cursor, "INSERT INTO order_rounds (started_at) VALUES (NOW())")
+    return cursor.lastrowid
+
+def close_order_round():
+    """이번 라운드를 마감하고 주문을 orders_history로 옮긴 뒤 새 라운드를 연다.
+
+    마감한 라운드 id를 돌려준다.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        execute(cursor, "SELECT id FROM order_rounds WHERE closed_at IS NULL ORDER BY id DESC LIMIT 1 FOR UPDATE")
+        row = cursor.fetchone()
+        round_id = row[0] if row else _current_round_id(cursor)
+        _archive_round(cursor, round_id)
+        execute(cursor, "INSERT INTO order_rounds (started_at) VALUES (NOW())")
+        # 남은 주문(새 라운드)만으로 요약을 다시 채움 - 방금 비웠으니 보통 0건
+        execute(cursor, "DELETE FROM store_totals")
+        execute(cursor, "INSERT INTO store_totals (store_id, total, order_count)" + STORE_TOTALS_QUERY)
+        bump_version(cursor, "orders")
+        bump_version(cursor, "orders_history")
+        conn.commit()
+    notify_write("orders")
+    notify_write("orders_history")
+    return round_id
+
+def _archive_round(cursor, round_id):
+    """라운드 하나의 주문을 통째로 orders_history로 옮기고 라운드 요약을 남긴다. (INSERT ... SELECT 한 번)"""
+    execute(cursor, """
+        INSERT INTO orders_history
+            (id, round_id, eater_name, store_id, store_name, category, menu_id, menu_name, price, quantity, created_at)
+        SELECT o.id, %s, o.eater_name, o.store_id, COALESCE(s.name, o.store_name), s.category,
+               o.menu_id, COALESCE(m.menu_name, o.menu_name), o.price, o.quantity, o.created_at
+        FROM orders o
+        LEFT JOIN stores s ON o.store_id = s.id
+        LEFT JOIN menus m ON o.menu_id = m.id
+        WHERE o.round_id = %s
+    """, (round_id, round_id))
+    execute(cursor, "DELETE FROM orders WHERE round_id = %s", (round_id,))
+    execute(cursor, "SELECT COUNT(*), COUNT(DISTINCT eater_name), COALESCE(SUM(price * quantity), 0) "
+                    "FROM orders_history WHERE round_id = %s", (round_id,))
+    order_count, eater_count, total = cursor.fetchone()
+    execute(cursor, """
+        UPDATE order_rounds
+        SET closed_at = COALESCE(closed_at, NOW()), order_count = %s, eater_count = %s, total = %s
+        WHERE id = %s
+    """, (order_count, eater_count, int(total), round_id))
+
+def archive_closed_rounds():
+    """마감됐는데 orders에 주문이 남아 있는 라운드를 한꺼번에 보관 (옮긴 라운드 id 목록)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        execute(cursor, """
+            SELECT DISTINCT o.round_id FROM orders o
+            JOIN order_rounds r ON o.round_id = r.id
+            WHERE r.closed_at IS NOT NULL
+            ORDER BY o.round_id
+        """)
+        round_ids = [row[0] for row in cursor.fetchall()]
+        for round_id in round_ids:
+            _archive_round(cursor, round_id)
+        if round_ids:
+            execute(cursor, "DELETE FROM store_totals")
+            execute(cursor, "INSERT INTO store_totals (store_id, total, order_count)" + STORE_TOTALS_QUERY)
+            bump_version(cursor, "orders")
+            bump_version(cursor, "orders_history")
+        conn.commit()
+    if round_ids:
+        notify_write("orders")
+        notify_write("orders_history")
+    return round_ids
+
+# --- 지난 기록 분석 (orders_history만 읽음) ---
+
+def get_round_summaries(limit=30):
+    """마감된 라운드 목록 (최근 순, 마감할 때 계산해 둔 요약)"""
+    query = """
+        SELECT id as round_id, started_at, closed_at, order_count, eater_count, total
+        FROM order_rounds
+        WHERE closed_at IS NOT NULL
+        ORDER BY id DESC
+        LIMIT %s
+    """
+    with get_read_connection() as conn:
+        df = read_df(query, conn, params=(limit,))
+    return df
+
+def get_history_store_stats(limit=20):
+    """지난 라운드 전체에서 가게별 주문 건수/금액/등장한 라운드 수"""
+    query = """
+        SELECT store_name, category, COUNT(*) as order_count,
+               SUM(price * quantity) as total, COUNT(DISTINCT round_id) as rounds
+        FROM orders_history
+        GROUP BY store_id, store_name, category
+        ORDER BY order_count DESC
+        LIMIT %s
+    """
+    with get_read_connection() as conn:
+        df = read_df(query, conn, params=(limit,))
+    return df
+
+def get_history_orders(since_round=None):
+    """보관된 주문 전체 (Parquet 내보내기용)"""
+    query = "SELECT * FROM orders_history"
+    params = None
+    if since_round is not None:
+        query += " WHERE round_id >= %s"
+        params = (since_round,)
+    with get_read_connection() as conn:
+        df = read_df(query + " ORDER BY round_id, id", conn, params=params)
+    return df
 
 # --- 주문 관련 DB 함수 ---
 
 def get_categories():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT DISTINCT category FROM stores ORDER BY category")
-    categories = [row[0] for row in cursor.fetchall()]
-    conn.close()
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        execute(cursor, "SELECT DISTINCT category FROM stores ORDER BY category")
+        categories = [row[0] for row in cursor.fetchall()]
     return categories
 
 def get_stores(category):
-    conn = get_db_connection()
-    cursor = conn.cursor(pymysql.cursors.DictCursor)
     query = "SELECT id, name, min_order_amount FROM stores WHERE category = %s"
-    cursor.execute(query, (category,))
-    stores = cursor.fetchall()
-    conn.close()
+    with get_read_connection() as conn:
+        cursor = dict_cursor(conn)
+        execute(cursor, query, (category,))
+        stores = cursor.fetchall()
     return stores
 
 def get_menus(store_id):
-    conn = get_db_connection()
-    cursor = conn.cursor(pymysql.cursors.DictCursor)
     query = "SELECT id, menu_name, price FROM menus WHERE store_id = %s"
-    cursor.execute(query, (store_id,))
-    menus = cursor.fetchall()
-    conn.close()
+    with get_read_connection() as conn:
+        cursor = dict_cursor(conn)
+        execute(cursor, query, (store_id,))
+        menus = cursor.fetchall()
     return menus
 
+def get_catalog_rows():
+    """가게+메뉴 전체를 한 번에 조회 (catalog.Catalog 생성용)"""
+    query = """
+        SELECT s.id as store_id, s.name as store_name, s.category, s.min_order_amount,
+               m.id as menu_id, m.menu_name, m.price
+        FROM stores s
+        LEFT JOIN menus m ON m.store_id = s.id
+        ORDER BY s.id, m.id
+    """
+    with get_read_connection() as conn:
+        cursor = dict_cursor(conn)
+        execute(cursor, query)
+        rows = cursor.fetchall()
+    return rows
+
+# --- 카탈로그 한꺼번에 등록 (catalog_import.py) ---
+# 가게는 이름, 메뉴는 (가게, 메뉴명)이 같으면 고치고 없으면 넣는다.
+# stores.name에는 UNIQUE 키가 없어서(예전 데이터에 같은 이름이 있을 수 있음) 어느 행을 고칠지는 여기서 정한다:
+# 이름이 같은 가게가 여러 개면 id가 가장 작은 것. 이름 비교는 DB 콜레이션(_ai_ci)처럼 대소문자/끝 공백을 무시한다.
+
+def _name_key(name):
+    return name.rstrip().casefold()
+
+def _first_ids(rows):
+    """(id, 이름) 목록 -> {이름 키: 가장 작은 id}"""
+    ids = {}
+    for row_id, name in sorted(rows):
+        ids.setdefault(_name_key(name), row_id)
+    return ids
+
+def upsert_catalog(stores):
+    """가게/메뉴 묶음을 한 트랜잭션으로 등록하거나 고친다.
+
+    stores: [{name, category, rating, min_order_amount, working_days, open_time, close_time, menus: {메뉴명: 가격}}]
+            (None인 가게 정보는 기존 값을 그대로 둠)
+    반환: {"stores_inserted", "stores_updated", "menus_inserted", "menus_updated"} 건수
+    """
+    result = {"stores_inserted": 0, "stores_updated": 0, "menus_inserted": 0, "menus_updated": 0}
+    if not stores:
+        return result
+    columns = ("category", "rating", "min_order_amount", "working_days", "open_time", "close_time")
+    names = [store["name"] for store in stores]
+    format_strings = ','.join(['%s'] * len(names))
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        execute(cursor, f"SELECT id, name FROM stores WHERE name IN ({format_strings}) FOR UPDATE", tuple(names))
+        store_ids = _first_ids(cursor.fetchall())
+
+        new_stores = [store for store in stores if _name_key(store["name"]) not in store_ids]
+        old_stores = [store for store in stores if _name_key(store["name"]) in store_ids]
+        if old_stores:
+            assignments = ", ".join(f"{column} = COALESCE(%s, {column})" for column in columns)
+            executemany(cursor, f"UPDATE stores SET {assignments} WHERE id = %s",
+                        [tuple(store[column] for column in columns) + (store_ids[_name_key(store["name"])],)
+                         for store in old_stores])
+        if new_stores:
+            executemany(cursor, f"INSERT INTO stores (name, {', '.join(columns)}) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                        [(store["name"], store["category"], store["rating"] or 0.0, store["min_order_amount"] or 0,
+                          store["working_days"], store["open_time"], store["close_time"]) for store in new_stores])
+            new_names = [store["name"] for store in new_stores]
+            execute(cursor, f"SELECT id, name FROM stores WHERE name IN ({','.join(['%s'] * len(new_names))})",
+                    tuple(new_names))
+            store_ids.update(_first_ids(cursor.fetchall()))
+
+        # 메뉴: 이번 묶음 가게들의 기존 메뉴를 한 번에 읽어서 가격이 바뀐 것만 고치고 없는 것만 넣음
+        menus = {(store_ids[_name_key(store["name"])], menu_name): price
+                 for store in stores for menu_name, price in store["menus"].items()}
+        existing = {}
+        if menus:
+            ids = sorted({store_id for store_id, _ in menus})
+            execute(cursor, f"SELECT id, store_id, menu_name, price FROM menus WHERE store_id IN ({','.join(['%s'] * len(ids))})",
+                    tuple(ids))
+            for menu_id, store_id, menu_name, price in sorted(cursor.fetchall()):
+                existing.setdefault((store_id, _name_key(menu_name)), (menu_id, price))
+        updates = [(price, existing[(store_id, _name_key(name))][0]) for (store_id, name), price in menus.items()
+                   if (store_id, _name_key(name)) in existing and existing[(store_id, _name_key(name))][1] != price]
+        inserts = [(store_id, name, price) for (store_id, name), price in menus.items()
+                   if (store_id, _name_key(name)) not in existing]
+        if updates:
+            executemany(cursor, "UPDATE menus SET price = %s WHERE id = %s", updates)
+        if inserts:
+            executemany(cursor, "INSERT INTO menus (store_id, menu_name, price) VALUES (%s, %s, %s)", inserts)
+
+        bump_version(cursor, "stores")
+        if updates or inserts:
+            bump_version(cursor, "menus")
+        conn.commit()
+    notify_write("stores")
+    if updates or inserts:
+        notify_write("menus")
+    result.update(stores_inserted=len(new_stores), stores_updated=len(old_stores),
+                  menus_inserted=len(inserts), menus_updated=len(updates))
+    return result
+
+# --- 합성 데이터 한꺼번에 넣기 (datagen.py) ---
+# 벤치마크용으로 가게/메뉴/주문/채팅을 수십만~수백만 행 넣는다. 주문마다 save_order()를 부르지 않고
+# 묶음마다 executemany 한 번 + 커밋 한 번으로 넣고, store_totals는 다 넣은 뒤 finish_bulk_load()에서 한 번만 다시 집계한다.
+
+BULK_LOAD_COLUMNS = {
+    "stores": ("id", "name", "category", "rating", "min_order_amount", "working_days", "open_time", "close_time"),
+    "menus": ("id", "store_id", "menu_name", "price"),
+    "orders": ("eater_name", "store_id", "menu_id", "store_name", "menu_name", "price", "quantity", "created_at"),
+    "chat_messages": ("username", "message", "created_at"),
+}
+
+def next_ids():
+    """{"stores": 다음 가게 id, "menus": 다음 메뉴 id} - 합성 데이터는 id를 직접 정해서 넣는다."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        ids = {}
+        for table in ("stores", "menus"):
+            execute(cursor, f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+            ids[table] = int(cursor.fetchone()[0])
+    return ids
+
+def bulk_load(table, rows):
+    """rows(BULK_LOAD_COLUMNS[table] 순서의 튜플)를 한 트랜잭션으로 넣고 넣은 행 수를 돌려준다.
+
+    주문은 열려 있는 라운드에 붙인다. store_totals와 데이터 버전은 finish_bulk_load()에서.
+    """
+    columns = BULK_LOAD_COLUMNS[table]
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        if table == "orders":
+            round_id = _current_round_id(cursor, lock=True)
+            columns += ("round_id",)
+            rows = [tuple(row) + (round_id,) for row in rows]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        executemany(cursor, query, rows)
+        conn.commit()
+    return len(rows)
+
+def finish_bulk_load():
+    """bulk_load()가 끝난 뒤 store_totals를 다시 집계하고 화면 캐시가 새로 읽도록 버전을 올린다."""
+    rebuild_store_totals()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for table in ("stores", "menus", "chat_messages"):
+            bump_version(cursor, table)
+        conn.commit()
+    for table in ("stores", "menus", "chat_messages"):
+        notify_write(table)
+
+def delete_all_data():
+    """가게/메뉴/주문/지난 기록/채팅을 전부 지운다 (합성 데이터를 새로 넣기 전, `generate-data --reset`)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for table in ("orders", "store_totals", "orders_history", "order_rounds", "chat_messages", "menus", "stores"):
+            execute(cursor, f"DELETE FROM {table}")
+        for table in VERSIONED_TABLES:
+            bump_version(cursor, table)
+        conn.commit()
+    for table in VERSIONED_TABLES:
+        notify_write(table)
+
 def get_current_orders():
-    conn = get_db_connection()
     query = """
         SELECT 
             o.id, 
@@ -83,66 +822,296 @@ def get_current_orders():
         JOIN menus m ON o.menu_id = m.id
         ORDER BY o.created_at DESC
     """
-    df = pd.read_sql(query, conn)
-    conn.close()
+    with get_read_connection() as conn:
+        df = read_df(query, conn)
     return df
 
+ORDER_PAGE_SIZE = 50
+
+def get_orders_page(store_ids=None, before_id=None, since_id=None, limit=ORDER_PAGE_SIZE, oldest_first=False):
+    """주문 목록 한 페이지 (id 큰 순 = 최신순). (DataFrame, 다음 페이지 유무)를 돌려준다.
+
+    store_ids: 이 가게들의 주문만 (None이면 전체) - 가게 필터를 WHERE로 DB에서 처리
+    before_id: 이 id보다 작은 주문부터 (키셋 페이지네이션, 이전 페이지의 마지막 id를 넘김)
+    since_id: 이 id보다 큰 주문만 (새로 들어온 주문만 볼 때)
+    oldest_first: id 작은 순으로 (새 주문을 빠짐없이 앞에서부터 볼 때, since_id와 같이 씀)
+    OFFSET 대신 id 범위로 자르므로 몇 번째 페이지든 인덱스에서 limit건만 읽는다.
+    """
+    conditions, params = [], []
+    if store_ids is not None:
+        if not store_ids:
+            return pd.DataFrame(columns=["id", "eater_name", "store_name", "menu_name", "price", "quantity", "total"]), False
+        conditions.append(f"o.store_id IN ({','.join(['%s'] * len(store_ids))})")
+        params.extend(store_ids)
+    if before_id is not None:
+        conditions.append("o.id < %s")
+        params.append(before_id)
+    if since_id is not None:
+        conditions.append("o.id > %s")
+        params.append(since_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT 
+            o.id, 
+            o.eater_name, 
+            s.name as store_name, 
+            m.menu_name, 
+            o.price, 
+            o.quantity, 
+            (o.price * o.quantity) as total 
+        FROM orders o
+        JOIN stores s ON o.store_id = s.id
+        JOIN menus m ON o.menu_id = m.id
+        {where}
+        ORDER BY o.id {'ASC' if oldest_first else 'DESC'}
+        LIMIT %s
+    """
+    params.append(limit + 1)  # 한 건 더 읽어서 다음 페이지가 있는지 확인
+    with get_read_connection() as conn:
+        df = read_df(query, conn, params=tuple(params))
+    return df.head(limit), len(df) > limit
+
 def get_store_totals():
-    conn = get_db_connection()
     query = """
         SELECT 
             s.name as store_name, 
-            SUM(o.price * o.quantity) as total,
+            t.total,
             s.min_order_amount
+        FROM store_totals t
+        JOIN stores s ON t.store_id = s.id
+        ORDER BY t.total DESC
+    """
+    with get_read_connection() as conn:
+        df = read_df(query, conn)
+    return df
+
+def get_dashboard_snapshot():
+    """주문 조회 한 번으로 주문 목록/가게별 합계/인기 순위/중복 참여자를 한꺼번에 계산"""
+    return build_dashboard(*get_dashboard_frames())
+
+def get_dashboard_frames():
+    """get_dashboard_snapshot()이 읽는 (주문 목록, 가게별 요약) DataFrame - DB 조회만 (benchmarks.scaling에서 따로 잼)"""
+    query = """
+        SELECT 
+            o.id, 
+            o.eater_name, 
+            o.store_id, 
+            s.name as store_name, 
+            s.min_order_amount, 
+            m.menu_name, 
+            o.price, 
+            o.quantity, 
+            (o.price * o.quantity) as total 
         FROM orders o
         JOIN stores s ON o.store_id = s.id
-        GROUP BY s.id, s.name, s.min_order_amount
-        ORDER BY total DESC
+        JOIN menus m ON o.menu_id = m.id
+        ORDER BY o.created_at DESC
     """
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    totals_query = """
+        SELECT t.store_id, s.name as store_name, t.total, s.min_order_amount, t.order_count
+        FROM store_totals t
+        JOIN stores s ON t.store_id = s.id
+    """
+    with get_read_connection() as conn:
+        df = read_df(query, conn)
+        totals = read_df(totals_query, conn)
+    return df, totals
 
 def save_order(eater, store_id, menu_id, price, quantity):
-    conn = get_db_connection()
-    cursor = conn.cursor()
     query = """
-        INSERT INTO orders (eater_name, store_id, menu_id, price, quantity)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO orders (eater_name, store_id, menu_id, price, quantity, round_id)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        round_id = _current_round_id(cursor, lock=True)
+        execute(cursor, query, (eater, store_id, menu_id, price, quantity, round_id))
+        _add_store_totals(cursor, {store_id: (price * quantity, 1)})
+        bump_version(cursor, "orders")
+        conn.commit()
+    notify_write("orders")
+
+def _insert_orders(cursor, orders):
+    """주문 여러 건 INSERT + 요약 테이블 반영 (쓰기 트랜잭션 안에서 호출)"""
+    query = """
+        INSERT INTO orders (eater_name, store_id, menu_id, price, quantity, round_id)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """
+    round_id = _current_round_id(cursor, lock=True)
+    # pymysql은 INSERT ... VALUES 형태의 executemany를 여러 줄 INSERT 한 번으로 보냄
+    executemany(cursor, query, [tuple(order) + (round_id,) for order in orders])
+    _add_store_totals(cursor, _order_deltas((store_id, price * quantity) for _, store_id, _, price, quantity in orders))
+    bump_version(cursor, "orders")
+
+def save_orders_bulk(orders):
+    """여러 주문을 한 트랜잭션으로 저장 (커밋 한 번)
+
+    orders: (먹을 사람, store_id, menu_id, 단가, 수량) 튜플의 리스트
     """
-    cursor.execute(query, (eater, store_id, menu_id, price, quantity))
-    conn.commit()
-    conn.close()
+    save_write_batch(orders=orders)
+
+def save_write_batch(orders=(), chat_messages=(), notify=True):
+    """주문과 채팅 여러 건을 한 트랜잭션으로 저장 (writer.py의 묶음 쓰기용)
+
+    orders: (먹을 사람, store_id, menu_id, 단가, 수량) 튜플의 리스트
+    chat_messages: (닉네임, 메시지) 튜플의 리스트
+    각각 넘긴 순서대로 INSERT 되므로 id도 그 순서대로 붙는다.
+    notify=False면 커밋만 하고 notify_write()는 부르는 쪽에서 (커밋 뒤 알림이 실패해도 다시 저장하지 않도록)
+    """
+    if not orders and not chat_messages:
+        return
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        if orders:
+            _insert_orders(cursor, orders)
+        if chat_messages:
+            executemany(cursor, "INSERT INTO chat_messages (username, message) VALUES (%s, %s)",
+                        [tuple(message) for message in chat_messages])
+            bump_version(cursor, "chat_messages")
+        conn.commit()
+    if not notify:
+        return
+    if orders:
+        notify_write("orders")
+    if chat_messages:
+        notify_write("chat_messages")
 
 def delete_orders(order_ids):
     if not order_ids:
         return
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    format_strings = ','.join(['%s'] * len(order_ids))
-    query = f"DELETE FROM orders WHERE id IN ({format_strings})"
-    cursor.execute(query, tuple(order_ids))
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        _delete_orders_by_id(cursor, order_ids)
+        bump_version(cursor, "orders")
+        conn.commit()
+    notify_write("orders")
+
+# --- 중복 참여자 정리 (성공한 파티 2곳 이상) ---
+# 최소주문금액을 넘긴 가게를 2곳 이상 주문한 사람의 주문을 한 번의 GROUP BY 쿼리로 찾고,
+# 정리할 때는 지울 주문 id를 골라서 한 트랜잭션에서 한꺼번에 지운다.
+# 화면(sj.render_multi_orderers)과 `python manage.py resolve-multi`가 같이 쓴다.
+# keep_stores()는 사람마다 남길 가게를 직접 받는다 (파티 배정 추천 적용, sj.render_allocation).
+
+MULTI_ORDERS_QUERY = """
+    SELECT
+        o.id,
+        o.eater_name,
+        o.store_id,
+        s.name as store_name,
+        m.menu_name,
+        o.price,
+        o.quantity,
+        (o.price * o.quantity) as total,
+        t.total as store_total
+    FROM orders o
+    JOIN stores s ON o.store_id = s.id
+    JOIN menus m ON o.menu_id = m.id
+    JOIN store_totals t ON t.store_id = o.store_id AND t.total >= s.min_order_amount
+    JOIN (
+        SELECT o2.eater_name
+        FROM orders o2
+        JOIN store_totals t2 ON t2.store_id = o2.store_id
+        JOIN stores s2 ON s2.id = o2.store_id
+        WHERE t2.total >= s2.min_order_amount
+        GROUP BY o2.eater_name
+        HAVING COUNT(DISTINCT o2.store_id) > 1
+    ) d ON d.eater_name = o.eater_name
+    ORDER BY o.eater_name, o.id
+"""
+
+MULTI_KEEP_RULES = ("first", "largest")
+
+def get_multi_orders():
+    """성공한 파티 2곳 이상에 들어간 사람들의 성공한 파티 주문 (store_total: 그 가게 합계)"""
+    with get_read_connection() as conn:
+        df = read_df(MULTI_ORDERS_QUERY, conn)
+    return df
+
+def _orders_to_drop(rows, keep):
+    """사람마다 남길 가게 하나를 정하고 나머지 가게의 주문 id를 돌려준다.
+
+    keep: "first" - 가장 먼저 주문한 가게를 남김
+          "largest" - 합계가 가장 큰 가게를 남김 (같으면 먼저 주문한 가게)
+          {먹을 사람: store_id} - 사람마다 남길 가게를 직접 지정 (없는 사람은 건드리지 않음)
+    rows: MULTI_ORDERS_QUERY 결과 (id, eater_name, store_id, store_total 포함, id 순)
+    """
+    by_eater = {}
+    for row in rows:
+        by_eater.setdefault(row["eater_name"], []).append(row)
+    drop = []
+    for eater, orders in by_eater.items():
+        if isinstance(keep, dict):
+            if eater not in keep:
+                continue
+            kept = keep[eater]
+        elif keep == "first":
+            kept = orders[0]["store_id"]
+        elif keep == "largest":
+            kept = max(orders, key=lambda row: (row["store_total"], -row["id"]))["store_id"]
+        else:
+            raise ValueError(f"알 수 없는 정리 방법: {keep} ({', '.join(MULTI_KEEP_RULES)} 또는 dict)")
+        drop.extend(row["id"] for row in orders if row["store_id"] != kept)
+    return drop
+
+def resolve_multi_orders(keep="first", dry_run=False):
+    """중복 참여자마다 가게 하나만 남기고 나머지 주문을 한 트랜잭션에서 지운다.
+
+    지운(dry_run이면 지울) 주문 id 목록을 돌려준다.
+    """
+    with get_db_connection() as conn:
+        cursor = dict_cursor(conn)
+        # 가게 합계 행을 잠가서 고르는 동안 들어온 주문 때문에 성공한 파티가 바뀌지 않게 함
+        execute(cursor, "SELECT store_id FROM store_totals FOR UPDATE")
+        execute(cursor, MULTI_ORDERS_QUERY)
+        drop = _orders_to_drop(cursor.fetchall(), keep)
+        if dry_run or not drop:
+            conn.rollback()
+            return drop
+        cursor = conn.cursor()
+        _delete_orders_by_id(cursor, drop)
+        bump_version(cursor, "orders")
+        conn.commit()
+    notify_write("orders")
+    return drop
+
+def keep_stores(choices):
+    """choices: {먹을 사람: 남길 store_id} - 그 사람의 다른 가게 주문을 한 트랜잭션에서 지운다.
+
+    남길 가게에 주문이 없는 사람은 건드리지 않는다(주문이 전부 지워지지 않게). 지운 주문 id 목록을 돌려준다.
+    """
+    if not choices:
+        return []
+    format_strings = ','.join(['%s'] * len(choices))
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        execute(cursor, f"SELECT id, eater_name, store_id FROM orders WHERE eater_name IN ({format_strings}) FOR UPDATE",
+                tuple(choices))
+        # MariaDB의 IN은 대소문자/끝 공백을 무시해서 choices에 없는 이름(나중에 들어온 "Kim " 등)도 걸릴 수 있음 - 그런 줄은 건드리지 않음
+        rows = [(order_id, eater, store_id) for order_id, eater, store_id in cursor.fetchall() if eater in choices]
+        has_kept = {eater for _, eater, store_id in rows if store_id == choices[eater]}
+        drop = [order_id for order_id, eater, store_id in rows if eater in has_kept and store_id != choices[eater]]
+        if not drop:
+            conn.rollback()
+            return []
+        _delete_orders_by_id(cursor, drop)
+        bump_version(cursor, "orders")
+        conn.commit()
+    notify_write("orders")
+    return drop
 
 def clear_orders():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("TRUNCATE TABLE orders")
-    conn.commit()
-    conn.close()
+    """전체 초기화 - 예전처럼 TRUNCATE로 지우지 않고 이번 라운드를 마감해서 지난 기록으로 보관한다."""
+    return close_order_round()
 
 def get_popular_store_stats():
     """가게별 주문 건수(인기 순위) 조회"""
-    conn = get_db_connection()
     # 주문 횟수가 많은 순서대로 정렬
     query = """
-        SELECT s.name as store_name, COUNT(*) as order_count 
-        FROM orders o
-        JOIN stores s ON o.store_id = s.id
-        GROUP BY s.id, s.name 
-        ORDER BY order_count DESC
+        SELECT s.name as store_name, t.order_count 
+        FROM store_totals t
+        JOIN stores s ON t.store_id = s.id
+        ORDER BY t.order_count DESC
     """
-    df = pd.read_sql(query, conn)
-    conn.close()
+    with get_read_connection() as conn:
+        df = read_df(query, conn)
     return df
\ No newline at end of file
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+
+# ---------------------------------------------------------
+# 변경 이벤트 채널 (pub/sub)
+# ---------------------------------------------------------
+# db.py의 쓰기 함수가 커밋하면 테이블 이름(topic)으로 이벤트가 발행된다.
+# 화면 쪽은 topic별 시퀀스 번호만 메모리에서 비교해서, 바뀌었을 때만 다시 그린다.
+#
+# 같은 프로세스 안에서는 EventBus(메모리)로 충분하지만, main.py와 add_page.py처럼
+# streamlit 프로세스가 여러 개면 BAEMIN_EVENT_DIR 환경변수에 공유 폴더를 지정하면
+# FileEventBus가 topic별 파일을 바꿔치기(os.replace)해서 다른 프로세스에 알린다.
+
+EVENT_DIR = os.environ.get("BAEMIN_EVENT_DIR")
+FILE_POLL_INTERVAL = 0.1  # 초. 다른 프로세스의 이벤트 파일을 확인하는 최소 간격
+
+
+class EventBus:
+    """프로세스 내부 pub/sub. topic마다 발행될 때마다 1씩 오르는 시퀀스 번호를 둔다."""
+
+    def __init__(self):
+        self._sequences = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """callback(topic)은 이 프로세스에서 이벤트를 알게 될 때마다 호출된다."""
+        self._subscribers.append(callback)
+
+    def publish(self, topic):
+        self._deliver(topic)
+
+    def _deliver(self, topic):
+        with self._lock:
+            self._sequences[topic] = self._sequences.get(topic, 0) + 1
+        for callback in self._subscribers:
+            callback(topic)
+
+    def sequences(self, topics):
+        """topic들의 현재 시퀀스 번호. 이전 값과 비교해서 변경 여부를 판단한다."""
+        with self._lock:
+            return tuple(self._sequences.get(topic, 0) for topic in topics)
+
+
+class FileEventBus(EventBus):
+    """여러 프로세스용 EventBus. topic마다 파일 하나를 두고 발행할 때마다 새 파일로 바꿔치기한다.
+
+    다른 프로세스는 파일의 (inode, 수정 시각)이 달라진 것을 보고 이벤트를 알아챈다.
+    """
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._stamps = {}
+        self._watched = set()
+        self._polled_at = 0.0
+        self._poll_lock = threading.Lock()
+
+    def _path(self, topic):
+        return os.path.join(self.directory, topic)
+
+    def _stamp(self, topic):
+        try:
+            stat = os.stat(self._path(topic))
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def publish(self, topic):
+        tmp_path = f"{self._path(topic)}.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "w") as f:
+            f.write(str(time.time_ns()))
+        os.replace(tmp_path, self._path(topic))
+        with self._poll_lock:
+            self._stamps[topic] = self._stamp(topic)  # 내가 쓴 건 다시 알리지 않도록
+        self._deliver(topic)
+
+    def sequences(self, topics):
+        self._poll(topics)
+        return super().sequences(topics)
+
+    def _poll(self, topics):
+        now = time.monotonic()
+        with self._poll_lock:
+            self._watched.update(topics)
+            if now - self._polled_at < FILE_POLL_INTERVAL:
+                return
+            self._polled_at = now
+            changed = []
+            for topic in self._watched:
+                stamp = self._stamp(topic)
+                if topic in self._stamps and stamp != self._stamps[topic]:
+                    changed.append(topic)
+                self._stamps[topic] = stamp
+        for topic in changed:
+            self._deliver(topic)
+
+
+bus = FileEventBus(EVENT_DIR) if EVENT_DIR else EventBus()
+
+
+def publish(topic):
+    bus.publish(topic)
+
+def subscribe(callback):
+    bus.subscribe(callback)
+
+def sequences(topics):
+    return bus.sequences(topics)
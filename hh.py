@@ -1,20 +1,28 @@
 import streamlit as st
 from db import *
+from metrics import instrument_render, record_payload
+from snapshot import *
+from dashboard import store_status
+from concurrent.futures import TimeoutError
+from writer import submit_chat, WRITE_TIMEOUT
 import time
 import random
 
-@st.fragment(run_every=2)
+@st.fragment
+@instrument_render("render_order_status")
 def render_order_status():
     st.subheader("📋 현재 주문 현황")
     
-    all_orders = get_current_orders()
-    store_sums_all = get_store_totals()
+    dashboard = cached_dashboard()
+    all_orders = dashboard.orders
+    store_sums_all = dashboard.store_totals
     sorted_store_names = store_sums_all['store_name'].tolist() if not store_sums_all.empty else []
     
     col_btn2, col_filter = st.columns([1, 8])
     
     with col_btn2:
-        if st.button("전체 초기화 🗑️", type="primary", use_container_width=True):
+        if st.button("이번 판 마감 📦", type="primary", use_container_width=True,
+                     help="지금까지의 주문을 지난 기록으로 옮기고 새로 주문을 받습니다."):
             clear_orders()
             st.rerun()
             
@@ -54,9 +62,62 @@ def render_order_status():
                         selected_stores.append(s_name)
     # ----------------------------------------
 
-    filtered_orders = all_orders[all_orders['store_name'].isin(selected_stores)] if not all_orders.empty else all_orders
+    # --- 주문 목록: 가게 필터와 페이지 나누기는 DB에서 처리 (보이는 페이지만 읽어서 보냄) ---
+    if len(selected_stores) == len(sorted_store_names):
+        store_ids = None  # 전체 선택이면 WHERE 없이
+    else:
+        store_ids = tuple(dashboard.store_ids[name] for name in selected_stores if name in dashboard.store_ids)
+
+    col_mode, col_size = st.columns([3, 1])
+    with col_mode:
+        view_mode = st.radio("보기", ["페이지", "새 주문만"], horizontal=True, key="order_view_mode",
+                             label_visibility="collapsed")
+    with col_size:
+        page_size = st.selectbox("한 페이지", [20, ORDER_PAGE_SIZE, 100, 200], index=1, key="order_page_size")
+
+    # 필터나 페이지 크기가 바뀌면 첫 페이지로 (페이지마다 시작 id를 쌓아 두고 이전/다음으로 이동)
+    if st.session_state.get("order_page_key") != (store_ids, page_size):
+        st.session_state.order_page_key = (store_ids, page_size)
+        st.session_state.order_page_cursors = [None]
+    cursors = st.session_state.order_page_cursors
+
+    before_id, since_id = cursors[-1], None
+    if view_mode == "새 주문만":
+        # 처음 이 보기로 바꿨을 때까지의 주문은 본 것으로 치고, 그 뒤에 들어온 것을 오래된 것부터 한 페이지씩 보여줌.
+        # 확인 위치는 가게 필터마다 따로 (가려진 가게의 새 주문을 본 것으로 치지 않도록). 처음 보는 필터는 전체 보기 위치에서 시작
+        if "order_seen_id" not in st.session_state:
+            st.session_state.order_seen_id = {None: int(all_orders["id"].max()) if not all_orders.empty else 0}
+        seen = st.session_state.order_seen_id
+        before_id, since_id = None, seen.setdefault(store_ids, seen[None])
+    oldest_first = since_id is not None
+
+    # 주문 데이터/필터/페이지가 그대로면 지난번 결과를 재사용 (DB 조회 없음)
+    filtered_orders, has_more = session_cached(
+        "order_status_view", ("orders", "stores", "menus"),
+        lambda: get_orders_page(store_ids, before_id=before_id, since_id=since_id, limit=page_size,
+                                oldest_first=oldest_first),
+        store_ids, before_id, since_id, page_size, oldest_first,
+    )
+
+    if view_mode == "페이지":
+        popular = dashboard.popular
+        matched = popular if store_ids is None else popular[popular["store_name"].isin(selected_stores)]
+        col_prev, col_page, col_next = st.columns([1, 3, 1])
+        col_prev.button("◀ 이전", disabled=len(cursors) == 1, use_container_width=True, on_click=cursors.pop)
+        col_page.caption(f"{len(cursors)}페이지 · 전체 {int(matched['order_count'].sum())}건")
+        col_next.button("다음 ▶", disabled=not has_more, use_container_width=True,
+                        on_click=cursors.append, args=(int(filtered_orders["id"].iloc[-1]) if has_more else None,))
+    elif not filtered_orders.empty:
+        def mark_seen():
+            # 오래된 것부터 보여줬으므로 화면의 마지막 주문까지는 이 필터로 전부 본 것
+            seen[store_ids] = int(filtered_orders["id"].iloc[-1])
+        label = f"새 주문 {len(filtered_orders)}건 확인 ✔" + (" (다음 새 주문 보기)" if has_more else "")
+        st.button(label, on_click=mark_seen)
+        if has_more:
+            st.caption(f"새 주문이 {page_size}건보다 많습니다. 오래된 것부터 보여주며, 확인하면 다음 주문이 나옵니다.")
 
     if not filtered_orders.empty:
+        record_payload(filtered_orders)
         event = st.dataframe(
             filtered_orders, 
             column_config={
@@ -72,39 +133,37 @@ def render_order_status():
             if st.button(f"선택한 {len(selected_ids)}개 주문 삭제 🗑️"):
                 delete_orders(selected_ids)
                 st.rerun()
+    elif view_mode == "새 주문만":
+        st.info("새로 들어온 주문이 없습니다.")
     else:
         st.info("선택된 주문이 없거나 체크박스가 모두 해제되어 있습니다.")
 
 # [영역 A] 실시간 주문 현황\
-@st.fragment(run_every=2)
+@st.fragment
+@instrument_render("render_sum_by_store")
 def render_sum_by_store():
     st.subheader("🏪 가게별 주문 가능 여부")
     
-    def get_status(row):
-        if row['total'] >= row['min_order_amount']:
-            return "✅ 주문 가능"
-        diff = row['min_order_amount'] - row['total']
-        return f"❌ {int(diff):,}원 부족"
-
-    all_orders = get_current_orders()
-    store_sums_all = get_store_totals()
+    dashboard = cached_dashboard()
+    all_orders = dashboard.orders
+    store_sums_all = dashboard.store_totals
     
     if not store_sums_all.empty:
-        display_sums = store_sums_all.copy()
-        display_sums['상태'] = display_sums.apply(get_status, axis=1)
-        display_sums.insert(0, "선택", False)
-        display_sums.loc[display_sums['상태'].str.contains("❌"), "선택"] = None
+        # 주문이 그대로면 상태 계산을 건너뛰고 지난번 표를 그대로 사용
+        display_sums = session_cached("sum_by_store_view", ("orders", "stores"), lambda: store_status(store_sums_all))
 
         c_table, c_roulette = st.columns([7, 3])
         with c_table:
+            record_payload(display_sums)
             edited_df = st.data_editor(
                 display_sums,
                 column_config={
                     "선택": st.column_config.CheckboxColumn("선택", default=False),
                     "store_name": "가게명", "total": st.column_config.NumberColumn("합계", format="%d원"),
                     "min_order_amount": st.column_config.NumberColumn("최소", format="%d원"),
+                    "reached": None,
                 },
-                disabled=["store_name", "total", "min_order_amount", "상태"],
+                disabled=["store_name", "total", "min_order_amount", "상태", "reached"],
                 hide_index=True, use_container_width=True, key="roulette_selector"
             )
         with c_roulette:
@@ -113,7 +172,7 @@ def render_sum_by_store():
             if len(sel_rows) == 1:
                 target = sel_rows.iloc[0]['store_name']
                 # [추가 보안 로직] 혹시라도 체크가 되었다면 한 번 더 검사
-                if "❌" in sel_rows.iloc[0]['상태']:
+                if not sel_rows.iloc[0]['reached']:
                     st.error("금액 미달로 주문 불가한 가게입니다.")
                 else:
                     participants = all_orders[all_orders['store_name'] == target]['eater_name'].unique().tolist()
@@ -129,8 +188,10 @@ def render_sum_by_store():
                             st.balloons()
                             try:
                                 message = f"🎉 [룰렛 결과] **{target}** 당첨자: **{winner}**님 축하합니다! (심부름 잘 다녀오세요~ 🏃)"
-                                save_chat_message("🎲 룰렛봇", message)
+                                submit_chat("🎲 룰렛봇", message).result(timeout=WRITE_TIMEOUT)
                                 st.toast("채팅방에 결과가 공유되었습니다!")
+                            except TimeoutError:
+                                st.toast("결과를 채팅방에 저장 중입니다.")
                             except Exception as e:
                                 st.error(f"결과 저장 실패: {e}")
             elif len(sel_rows) > 1:
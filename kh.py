@@ -1,40 +1,50 @@
+import os
+from concurrent.futures import TimeoutError
 import streamlit as st
+import pandas as pd
 from db import *
+from metrics import instrument_render, record_payload
+from snapshot import cached_catalog, cached_menu_search, store_popularity
+from writer import submit_orders, WRITE_TIMEOUT
 
+# 데이터 매니저(add_page.py) 주소 - 서버 주소가 바뀌면 환경 변수 BAEMIN_ADD_PAGE_URL로
+ADD_PAGE_URL = os.environ.get("BAEMIN_ADD_PAGE_URL", "http://172.30.1.12:8502")
+
+@instrument_render("render_choose_menu")
 def render_choose_menu():
     st.subheader("➕ 메뉴 담기")
 
     with st.expander("🙋‍♀️ 원하는 가게나 메뉴가 없으신가요? (등록하러 가기)"):
         st.info("아래 버튼을 누르면 **데이터 매니저(등록 페이지)**가 새 창에서 열립니다.\n\n등록 후 이 페이지를 **새로고침(F5)** 하시면 메뉴가 나타납니다!\n\n등록 후 이상있을 시 금경훈🧙‍♂️ 님을 찾도록.")
-        st.link_button("🚀 가게/메뉴 등록하러 이동하기", "http://172.30.1.12:8502")
+        st.link_button("🚀 가게/메뉴 등록하러 이동하기", ADD_PAGE_URL)
+
+    render_cart()
 
-    categories = get_categories()
+    # 카탈로그는 메모리 캐시에서 읽음 (가게/메뉴가 등록될 때만 DB 조회)
+    catalog = cached_catalog()
+    categories = catalog.categories()
     if not categories:
         st.warning("등록된 가게/카테고리가 없습니다. DB를 확인해주세요.")
         st.stop()
 
-    selected_category = st.pills("음식점 종류", categories, selection_mode="single")
+    selected_store_data, picked_menu_id = pick_store(catalog)
 
-    if selected_category:
-        stores = get_stores(selected_category)
-        if not stores:
-            st.warning("이 카테고리에는 등록된 가게가 없습니다.")
-            st.stop()
-            
-        store_options = {s['name']: s for s in stores}
-        selected_store_name = st.selectbox("음식점 선택 🏠", options=list(store_options.keys()))
-        selected_store_data = store_options[selected_store_name]
+    if selected_store_data:
+        selected_store_name = selected_store_data['name']
         selected_store_id = selected_store_data['id'] # 선택된 이름의 진짜 ID값
         min_amt = selected_store_data['min_order_amount']
         st.caption(f"ℹ️ 이 가게의 최소 주문 금액은 **{min_amt:,}원**입니다.")
 
-        menus = get_menus(selected_store_id)
+        menus = catalog.menus(selected_store_id)
         if not menus:
             st.warning("이 가게에는 등록된 메뉴가 없습니다.")
             st.stop()
             
         menu_options = {f"{m['menu_name']} ({m['price']:,}원)": m for m in menus}
-        selected_menu_label = st.selectbox("메뉴 선택 🍗", list(menu_options.keys()))
+        # 검색에서 메뉴를 골랐으면 그 메뉴가 미리 선택되게
+        menu_ids = [m['id'] for m in menu_options.values()]
+        menu_index = menu_ids.index(picked_menu_id) if picked_menu_id in menu_ids else 0
+        selected_menu_label = st.selectbox("메뉴 선택 🍗", list(menu_options.keys()), index=menu_index)
         selected_menu_data = menu_options[selected_menu_label]
         selected_menu_id = selected_menu_data['id']    # DB의 menu_id 컬럼으로 들어갈 숫자
         selected_price = selected_menu_data['price']    # DB의 price 컬럼으로 들어갈 숫자
@@ -48,18 +58,107 @@ def render_choose_menu():
             with c2:
                 eater_name = st.text_input("먹을 사람 (필수)")
             
-            submitted = st.form_submit_button("주문 목록에 추가하기 ➕")
+            submitted = st.form_submit_button("장바구니에 담기 🛒")
             
             if submitted:
                 if not eater_name:
                     st.error("'먹을 사람' 이름을 입력해주세요!")
                 else:
-                    save_order(
-                        eater_name,
-                        selected_store_id,
-                        selected_menu_id,
-                        selected_menu_data['price'],
-                        quantity
-                    )
-                    st.success(f"{eater_name}님의 주문이 저장되었습니다!")
-                    st.rerun()
\ No newline at end of file
+                    st.session_state.cart.append({
+                        "eater_name": eater_name,
+                        "store_id": selected_store_id,
+                        "store_name": selected_store_name,
+                        "menu_id": selected_menu_id,
+                        "menu_name": selected_menu_data['menu_name'],
+                        "price": selected_price,
+                        "quantity": quantity,
+                    })
+                    st.toast(f"{eater_name}님의 {selected_menu_data['menu_name']}을(를) 장바구니에 담았습니다.")
+                    st.rerun()
+
+
+def pick_store(catalog):
+    """검색어가 있으면 검색 결과에서, 없으면 카테고리 → 가게 순으로 가게를 고른다.
+
+    (가게 dict, 검색에서 고른 menu_id 또는 None)을 돌려주고, 아직 고르지 않았으면 (None, None)
+    """
+    query = st.text_input("🔍 가게/메뉴 검색", placeholder="이름 일부나 초성으로 찾기 (예: 떡볶이, ㄸㅂㅇ)", key="menu_search")
+    if query.strip():
+        # 메모리 인덱스에서 찾음 (DB 조회 없음), 이번 판에 주문이 많은 가게가 위로
+        results = cached_menu_search().search(query, popularity=store_popularity())
+        if not results:
+            st.info("검색 결과가 없습니다. 다른 이름이나 초성으로 찾아보세요.")
+            return None, None
+        result_options = {r['label']: r for r in results}
+        picked = result_options[st.selectbox("검색 결과 🔍", list(result_options.keys()))]
+        return catalog.store(picked['store_id']), picked['menu_id']
+
+    selected_category = st.pills("음식점 종류", catalog.categories(), selection_mode="single")
+    if not selected_category:
+        return None, None
+    stores = catalog.stores(selected_category)
+    if not stores:
+        st.warning("이 카테고리에는 등록된 가게가 없습니다.")
+        return None, None
+
+    store_options = {s['name']: s for s in stores}
+    selected_store_name = st.selectbox("음식점 선택 🏠", options=list(store_options.keys()))
+    return store_options[selected_store_name], None
+
+
+def render_cart():
+    """여러 사람/여러 메뉴를 모아뒀다가 한 번에 주문하는 장바구니"""
+    if "cart" not in st.session_state:
+        st.session_state.cart = []
+    cart = st.session_state.cart
+    if not cart:
+        return
+
+    with st.container(border=True):
+        st.markdown(f"#### 🛒 장바구니 ({len(cart)}건)")
+        cart_df = pd.DataFrame(cart)
+        cart_df["total"] = cart_df["price"] * cart_df["quantity"]
+        record_payload(cart_df)
+        event = st.dataframe(
+            cart_df,
+            column_config={
+                "store_id": None, "menu_id": None, "eater_name": "먹을 사람", "store_name": "가게",
+                "menu_name": "메뉴", "price": st.column_config.NumberColumn("단가", format="%d원"),
+                "quantity": "수량", "total": st.column_config.NumberColumn("합계", format="%d원")
+            },
+            hide_index=True, use_container_width=True, on_select="rerun", selection_mode="multi-row",
+            key="cart_table"
+        )
+
+        c1, c2, c3 = st.columns([2, 1, 1])
+        with c1:
+            if st.button(f"한 번에 주문하기 ({len(cart)}건) ✅", type="primary", use_container_width=True):
+                # 다른 사람들의 쓰기와 묶어서 한 트랜잭션으로 저장 (커밋될 때까지 기다렸다가 화면은 한 번만 다시 그림)
+                future = submit_orders([
+                    (item["eater_name"], item["store_id"], item["menu_id"], item["price"], item["quantity"])
+                    for item in cart
+                ])
+                # 큐에 들어간 뒤에는 결과와 상관없이 장바구니를 비움 (다시 눌러서 두 번 저장되지 않도록)
+                st.session_state.cart = []
+                try:
+                    future.result(timeout=WRITE_TIMEOUT)
+                except TimeoutError:
+                    # 늦어도 writer가 곧 저장함
+                    st.toast(f"{len(cart)}건의 주문을 저장 중입니다. 잠시 후 주문 현황에서 확인해주세요.")
+                except Exception as e:
+                    # 저장 실패는 커밋되지 않은 것이므로 장바구니를 되돌려서 다시 주문할 수 있게
+                    st.session_state.cart = cart
+                    st.error(f"주문 저장 실패: {e}")
+                    return
+                else:
+                    st.toast(f"{len(cart)}건의 주문이 저장되었습니다!")
+                st.rerun()
+        with c2:
+            selected_rows = event.selection.rows
+            if st.button(f"선택 빼기 ({len(selected_rows)})", disabled=not selected_rows, use_container_width=True):
+                st.session_state.cart = [item for i, item in enumerate(cart) if i not in set(selected_rows)]
+                st.rerun()
+        with c3:
+            if st.button("비우기 🗑️", use_container_width=True):
+                st.session_state.cart = []
+                st.rerun()
\ No newline at end of file
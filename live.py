@@ -0,0 +1,36 @@
+import os
+import streamlit as st
+import events
+from snapshot import data_version
+from metrics import instrument_render
+
+# ---------------------------------------------------------
+# 실시간 화면 갱신 (이벤트 감시)
+# ---------------------------------------------------------
+# 예전에는 화면 조각(fragment)마다 run_every=2로 2초마다 전부 다시 그렸지만,
+# 이제는 아래 감시용 fragment 하나만 LIVE_POLL_INTERVAL마다 돌면서 이벤트 번호를 메모리에서 비교하고,
+# 주문/가게/메뉴/지난 기록이 실제로 바뀌었을 때만 페이지를 다시 그린다(st.rerun).
+# 채팅은 전체 화면을 다시 그리지 않도록 chat.py의 render_chat_content가 따로 확인한다.
+#
+# - 같은 프로세스에서 쓴 것: events 시퀀스가 바로 바뀜 (LIVE_POLL_INTERVAL 이내 반영)
+# - 다른 프로세스/DB 직접 수정: data_versions 확인(SNAPSHOT_TTL 주기)으로 잡아냄
+
+# 초. 감시 주기 (탭마다 이 간격으로 스크립트가 한 번씩 돌므로 너무 짧게 두지 말 것)
+LIVE_POLL_INTERVAL = float(os.environ.get("BAEMIN_LIVE_POLL_INTERVAL", "1"))
+LIVE_TOPICS = ("orders", "stores", "menus", "orders_history")
+CHAT_TOPICS = ("chat_messages",)
+
+
+def current_stamp(topics=LIVE_TOPICS):
+    return events.sequences(topics), data_version(topics)
+
+
+@st.fragment(run_every=LIVE_POLL_INTERVAL)
+@instrument_render("watch_live_updates")
+def watch_live_updates():
+    """주문 등이 바뀌었을 때만 전체 화면을 다시 그리는 감시용 fragment (화면에는 아무것도 안 그림)"""
+    stamp = current_stamp()
+    last_stamp = st.session_state.get("live_stamp")
+    st.session_state.live_stamp = stamp
+    if last_stamp is not None and last_stamp != stamp:
+        st.rerun()
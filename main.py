@@ -3,18 +3,37 @@ from kh import *
 from sj import *
 from hh import *
 from chat import *
+from live import watch_live_updates
+from admin import render_admin_panel, render_diagnostics
+import metrics
+import os
+from migrations import ensure_migrated
+from snapshot import prefetch
 
 # ---------------------------------------------------------
 # 1. 페이지 설정 (가장 먼저 실행되어야 함)
 # ---------------------------------------------------------
 st.set_page_config(layout="wide", page_title="점심 메뉴 취합 & 채팅", page_icon="🍚")
 
+# 스키마 마이그레이션 (프로세스당 한 번만 실제로 실행됨)
+ensure_migrated()
+
+# 화면들이 같이 쓰는 주문/카탈로그/지난 기록을 미리 동시에 읽어둠 (바뀐 게 없으면 DB 조회 없음)
+prefetch()
+
+# BAEMIN_METRICS_PORT를 주면 /metrics (Prometheus 텍스트)를 그 포트로 제공
+if os.environ.get("BAEMIN_METRICS_PORT"):
+    metrics.start_metrics_server(int(os.environ["BAEMIN_METRICS_PORT"]))
+
 # 사이드바에 채팅 표시
 with st.sidebar:
     render_chat_content()
 
 st.title("오늘의 점심 메뉴 취합 🍚")
 
+# 주문/채팅이 바뀌었을 때만 화면을 다시 그림 (2초 폴링 대신)
+watch_live_updates()
+
 popular_realtime()
 st.divider()
 render_order_status()
@@ -22,5 +41,18 @@ st.divider()
 render_choose_menu()
 st.divider()
 render_multi_orderers()
+render_allocation()
 st.divider()
-render_sum_by_store()
\ No newline at end of file
+render_sum_by_store()
+render_history()
+
+# 관리자 패널 (주소 뒤에 ?admin=1)
+if st.query_params.get("admin") == "1":
+    st.divider()
+    render_admin_panel()
+
+# 화면 조각별 실행 비용 (주소 뒤에 ?diag=1, 사이드바에 표시)
+if st.query_params.get("diag") == "1":
+    with st.sidebar:
+        st.divider()
+        render_diagnostics()
\ No newline at end of file
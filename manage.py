@@ -0,0 +1,156 @@
+"""운영용 명령 모음
+
+    python manage.py migrate         아직 적용 안 된 스키마 마이그레이션 적용
+    python manage.py status          마이그레이션 적용 현황
+    python manage.py explain         자주 쓰는 쿼리가 인덱스를 타는지 EXPLAIN으로 확인
+    python manage.py check-totals    가게별 합계 요약(store_totals)이 orders와 맞는지 확인
+    python manage.py rebuild-totals  store_totals를 orders에서 다시 집계
+    python manage.py close-round     이번 판 마감 (주문을 orders_history로 옮기고 새 판 시작)
+    python manage.py archive         마감됐는데 orders에 남은 판을 한꺼번에 보관
+    python manage.py resolve-multi [--keep first|largest] [--dry-run]
+                                     성공한 파티 2곳 이상에 들어간 사람마다 가게 하나만 남기고 나머지 주문 삭제
+    python manage.py import-catalog PATH [--chunk-size N] [--dry-run]
+                                     가게/메뉴 CSV·JSON 파일을 한꺼번에 등록 (가게 이름이 같으면 고침)
+    python manage.py generate-data [--scale x1|x10|x100|x1000] [--stores N] [--orders N] [--chat N] [--seed N] [--reset]
+                                     벤치마크용 합성 가게/메뉴/주문/채팅을 한꺼번에 넣기 (--reset: 기존 데이터 전부 삭제 후)
+    python manage.py export-history PATH [--since-round N]
+                                     보관된 주문을 zstd 압축 Parquet 파일로 내보내기 (pyarrow 필요)
+"""
+import argparse
+import logging
+import sys
+import catalog_import
+import datagen
+import db
+import metrics
+import migrations
+
+
+def cmd_migrate(args):
+    applied = migrations.migrate()
+    print(f"적용한 마이그레이션: {applied}" if applied else "이미 최신 스키마입니다.")
+
+
+def cmd_status(args):
+    done = migrations.applied_versions()
+    for version, description, _ in migrations.MIGRATIONS:
+        print(f"[{'x' if version in done else ' '}] {version:>3}  {description}")
+
+
+def cmd_explain(args):
+    failed = 0
+    for result in migrations.check_query_plans():
+        mark = "OK " if result["ok"] else "BAD"
+        failed += not result["ok"]
+        print(f"{mark} {result['name']:<16} {result['table']:<14} key={result['key']} type={result['type']} "
+              f"rows={result['rows']} extra={result['extra'] or ''}")
+        if not result["ok"]:
+            print(f"    기대한 인덱스: {', '.join(result['expected'])}")
+    # CI 등에서 쓸 수 있게 인덱스를 안 타는 쿼리가 있으면 실패 코드로 종료
+    return 1 if failed else 0
+
+
+def cmd_check_totals(args):
+    mismatches = db.check_store_totals()
+    for row in mismatches:
+        print(f"store_id={row['store_id']}  orders 기준 (합계, 건수)={row['expected']}  요약={row['stored']}")
+    print(f"어긋난 가게 {len(mismatches)}곳" if mismatches else "store_totals가 orders와 일치합니다.")
+    return 1 if mismatches else 0
+
+
+def cmd_rebuild_totals(args):
+    db.rebuild_store_totals()
+    print("store_totals를 다시 집계했습니다.")
+
+
+def cmd_close_round(args):
+    print(f"{db.close_order_round()}번째 판을 마감했습니다.")
+
+
+def cmd_archive(args):
+    round_ids = db.archive_closed_rounds()
+    print(f"보관한 판: {round_ids}" if round_ids else "보관할 판이 없습니다.")
+
+
+def cmd_resolve_multi(args):
+    order_ids = db.resolve_multi_orders(keep=args.keep, dry_run=args.dry_run)
+    if not order_ids:
+        print("중복 참여자가 없습니다.")
+    elif args.dry_run:
+        print(f"지울 주문 {len(order_ids)}건: {order_ids}")
+    else:
+        print(f"주문 {len(order_ids)}건을 지웠습니다: {order_ids}")
+
+
+def cmd_import_catalog(args):
+    def progress(report):
+        print(f"  {report.rows}줄 / 가게 {report.stores_inserted + report.stores_updated}곳 / {report.seconds:.1f}초", flush=True)
+
+    report = catalog_import.import_catalog(catalog_import.read_file(args.path), chunk_size=args.chunk_size,
+                                           dry_run=args.dry_run, progress=progress)
+    for line_no, message in report.errors:
+        print(f"{line_no}번째 줄: {message}")
+    print(("[검사만] " if args.dry_run else "") + report.summary())
+    return 1 if report.skipped else 0
+
+
+def cmd_generate_data(args):
+    spec = datagen.spec_for(args.scale, stores=args.stores, menus_per_store=args.menus, orders=args.orders,
+                            chat_messages=args.chat, eaters=args.eaters)
+    print(f"{spec} (seed={args.seed}){' - 기존 데이터를 지우고 넣습니다' if args.reset else ''}")
+    # 수천 행씩 넣는 INSERT는 원래 느린 쿼리 기준을 넘으므로 경고를 끔
+    metrics.logger.setLevel(logging.ERROR)
+
+    def progress(table, count):
+        print(f"  {table}: {count:,}행", end="\r", flush=True)
+
+    counts = datagen.load(spec, seed=args.seed, reset=args.reset, chunk_size=args.chunk_size, progress=progress)
+    print()
+    rows = sum(value for key, value in counts.items() if key != "seconds")
+    print(" / ".join(f"{key} {value:,}" for key, value in counts.items() if key != "seconds") +
+          f" / {counts['seconds']:.1f}초 (초당 {rows / counts['seconds']:,.0f}행)")
+
+
+def cmd_export_history(args):
+    df = db.get_history_orders(args.since_round)
+    try:
+        df.to_parquet(args.path, compression="zstd", index=False)
+    except ImportError:
+        print("Parquet으로 저장하려면 pyarrow가 필요합니다: pip install pyarrow")
+        return 1
+    print(f"{len(df)}건을 {args.path}에 저장했습니다.")
+
+
+COMMANDS = {
+    "migrate": cmd_migrate, "status": cmd_status, "explain": cmd_explain,
+    "check-totals": cmd_check_totals, "rebuild-totals": cmd_rebuild_totals,
+    "close-round": cmd_close_round, "archive": cmd_archive,
+    "resolve-multi": cmd_resolve_multi, "import-catalog": cmd_import_catalog,
+    "generate-data": cmd_generate_data, "export-history": cmd_export_history,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=list(COMMANDS))
+    parser.add_argument("path", nargs="?", default="orders_history.parquet",
+                        help="export-history 저장 경로 / import-catalog로 읽을 파일")
+    parser.add_argument("--since-round", type=int, help="export-history: 이 판부터만 내보내기")
+    parser.add_argument("--keep", choices=db.MULTI_KEEP_RULES, default="first",
+                        help="resolve-multi: 남길 가게 (first: 먼저 주문한 곳, largest: 합계가 큰 곳)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="resolve-multi: 지우지 않고 지울 주문만 출력 / import-catalog: 검사만 하고 넣지 않음")
+    parser.add_argument("--chunk-size", type=int,
+                        help=f"import-catalog: 한 트랜잭션에 넣는 가게 수 (기본 {catalog_import.IMPORT_CHUNK_SIZE}) / "
+                             f"generate-data: 한 트랜잭션에 넣는 행 수 (기본 {datagen.LOAD_CHUNK_SIZE})")
+    parser.add_argument("--scale", choices=list(datagen.SCALES), default="x1",
+                        help="generate-data: 1.sql 정도(x1)의 몇 배로 만들지")
+    for name, what in (("stores", "가게 수"), ("menus", "가게당 메뉴 수"), ("orders", "주문 수"),
+                       ("chat", "채팅 수"), ("eaters", "주문하는 사람 수")):
+        parser.add_argument(f"--{name}", type=int, help=f"generate-data: {what} (--scale 값 대신)")
+    parser.add_argument("--seed", type=int, default=0, help="generate-data: 같은 seed면 같은 데이터")
+    parser.add_argument("--reset", action="store_true", help="generate-data: 가게/메뉴/주문/채팅을 전부 지우고 넣기")
+    args = parser.parse_args()
+    if args.chunk_size is None:
+        args.chunk_size = datagen.LOAD_CHUNK_SIZE if args.command == "generate-data" else catalog_import.IMPORT_CHUNK_SIZE
+    sys.exit(COMMANDS[args.command](args) or 0)
@@ -0,0 +1,365 @@
+import contextvars
+import functools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ---------------------------------------------------------
+# DB 쿼리 계측 (시간 / 행 수 / 호출한 화면 / 쿼리 종류)
+# ---------------------------------------------------------
+# db.py의 모든 쿼리는 timed_query()로 감싸서 실행된다.
+# 결과는 이 프로세스 메모리에만 쌓이고, 관리자 패널(main.py?admin=1)과
+# Prometheus 텍스트(prometheus_text(), BAEMIN_METRICS_PORT를 주면 /metrics로도 제공)로 본다.
+
+SLOW_QUERY_SECONDS = float(os.environ.get("BAEMIN_SLOW_QUERY_MS", "200")) / 1000
+SLOW_LOG_SIZE = 100    # 관리자 패널에 보여줄 최근 느린 쿼리 수
+# Prometheus 히스토그램 버킷 상한(초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+logger = logging.getLogger("baemin.db")
+
+# 지금 실행 중인 화면 조각 이름. 화면 쪽에서 fragment_scope()로 지정하고,
+# 지정이 없으면 호출 스택에서 db.py 바깥의 첫 함수 이름을 쓴다.
+current_fragment = contextvars.ContextVar("current_fragment", default=None)
+
+# 호출자 추적에서 건너뛸 모듈 (쿼리를 대신 실행해주는 쪽)
+_INFRA_MODULES = {"db", "metrics", "snapshot", "catalog", "dashboard", "threading", "contextlib"}
+
+
+def fingerprint(sql):
+    """값만 다른 쿼리를 하나로 묶기 위한 정규화 (문자열/숫자/IN 목록 → ?)"""
+    sql = re.sub(r"'(?:[^'\\]|\\.|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+\b", "?", sql)
+    sql = re.sub(r"%s|%\(\w+\)s", "?", sql)
+    sql = re.sub(r"\(\s*\?(?:\s*,\s*\?)*\s*\)", "(?)", sql)
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def _find_caller():
+    fragment = current_fragment.get()
+    if fragment:
+        return fragment
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.split(".")[0] not in _INFRA_MODULES:
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class _Histogram:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.callers = {}
+
+    def observe(self, seconds, rows, caller):
+        self.count += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.rows += rows
+        for i, upper in enumerate(BUCKETS):
+            if seconds <= upper:
+                self.buckets[i] += 1
+        self.callers[caller] = self.callers.get(caller, 0) + 1
+
+
+class QueryStats:
+    """쿼리 종류(fingerprint)별 히스토그램 + 최근 느린 쿼리 기록"""
+
+    def __init__(self, slow_seconds=SLOW_QUERY_SECONDS):
+        self.slow_seconds = slow_seconds
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._slow = deque(maxlen=SLOW_LOG_SIZE)
+
+    def observe(self, sql, seconds, rows, caller):
+        key = fingerprint(sql)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds, rows, caller)
+            is_slow = seconds >= self.slow_seconds
+            if is_slow:
+                self._slow.append({"at": time.time(), "query": key, "seconds": seconds, "rows": rows, "caller": caller})
+        if is_slow:
+            logger.warning("느린 쿼리 %.1fms (%d행, %s): %s", seconds * 1000, rows, caller, key)
+
+    def summary(self):
+        """쿼리 종류별 요약 (총 시간 큰 순)"""
+        with self._lock:
+            rows = [
+                {
+                    "query": key,
+                    "count": h.count,
+                    "total_ms": h.seconds * 1000,
+                    "avg_ms": h.seconds * 1000 / h.count,
+                    "max_ms": h.max_seconds * 1000,
+                    "rows": h.rows,
+                    "callers": dict(h.callers),
+                }
+                for key, h in self._histograms.items()
+            ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def by_caller(self):
+        """호출한 화면별 쿼리 수"""
+        totals = {}
+        with self._lock:
+            for h in self._histograms.values():
+                for caller, count in h.callers.items():
+                    totals[caller] = totals.get(caller, 0) + count
+        return totals
+
+    def slow_queries(self):
+        with self._lock:
+            return list(self._slow)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._slow.clear()
+
+    def prometheus_lines(self):
+        lines = [
+            "# HELP baemin_db_query_duration_seconds DB query duration by query fingerprint",
+            "# TYPE baemin_db_query_duration_seconds histogram",
+        ]
+        row_lines = [
+            "# HELP baemin_db_query_rows_total Rows returned or affected by query fingerprint",
+            "# TYPE baemin_db_query_rows_total counter",
+        ]
+        with self._lock:
+            for key, h in sorted(self._histograms.items()):
+                label = _label(key)
+                for upper, count in zip(BUCKETS, h.buckets):
+                    lines.append(f'baemin_db_query_duration_seconds_bucket{{query="{label}",le="{upper}"}} {count}')
+                lines.append(f'baemin_db_query_duration_seconds_bucket{{query="{label}",le="+Inf"}} {h.count}')
+                lines.append(f'baemin_db_query_duration_seconds_sum{{query="{label}"}} {h.seconds:.6f}')
+                lines.append(f'baemin_db_query_duration_seconds_count{{query="{label}"}} {h.count}')
+                row_lines.append(f'baemin_db_query_rows_total{{query="{label}"}} {h.rows}')
+        return lines + row_lines
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+query_stats = QueryStats()
+
+
+class _QueryRecord:
+    rows = 0
+
+
+@contextmanager
+def timed_query(sql):
+    """with timed_query(sql) as record: ...; record.rows = 행 수"""
+    record = _QueryRecord()
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        seconds = time.perf_counter() - started
+        query_stats.observe(sql, seconds, record.rows, _find_caller())
+        render = _current_render.get()
+        if render is not None:
+            render.db_seconds += seconds
+            render.queries += 1
+
+
+@contextmanager
+def fragment_scope(name):
+    """이 블록 안에서 실행된 쿼리를 name 화면의 쿼리로 기록"""
+    token = current_fragment.set(name)
+    try:
+        yield
+    finally:
+        current_fragment.reset(token)
+
+
+# ---------------------------------------------------------
+# 화면 조각(render 함수) 계측
+# ---------------------------------------------------------
+# @instrument_render("이름")을 붙인 함수는 실행될 때마다 전체 시간, 그중 DB 시간,
+# 화면으로 보낸 데이터 크기(record_payload), 세션별 실행 횟수가 기록된다.
+
+_current_render = contextvars.ContextVar("current_render", default=None)
+
+
+class _RenderRecord:
+    def __init__(self, name):
+        self.name = name
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.payload_rows = 0
+        self.payload_bytes = 0
+
+
+class RenderStats:
+    """화면 조각별 누적 통계 (프로세스 전체)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def observe(self, record, wall_seconds):
+        with self._lock:
+            stat = self._stats.setdefault(record.name, {
+                "runs": 0, "wall_seconds": 0.0, "db_seconds": 0.0, "max_wall_seconds": 0.0,
+                "queries": 0, "payload_rows": 0, "payload_bytes": 0,
+            })
+            stat["runs"] += 1
+            stat["wall_seconds"] += wall_seconds
+            stat["db_seconds"] += record.db_seconds
+            stat["max_wall_seconds"] = max(stat["max_wall_seconds"], wall_seconds)
+            stat["queries"] += record.queries
+            stat["payload_rows"] += record.payload_rows
+            stat["payload_bytes"] += record.payload_bytes
+
+    def summary(self):
+        """화면 조각별 평균 (전체 시간 큰 순)"""
+        with self._lock:
+            rows = [
+                {
+                    "fragment": name,
+                    "runs": stat["runs"],
+                    "total_ms": stat["wall_seconds"] * 1000,
+                    "avg_ms": stat["wall_seconds"] * 1000 / stat["runs"],
+                    "avg_db_ms": stat["db_seconds"] * 1000 / stat["runs"],
+                    "avg_python_ms": (stat["wall_seconds"] - stat["db_seconds"]) * 1000 / stat["runs"],
+                    "max_ms": stat["max_wall_seconds"] * 1000,
+                    "avg_queries": stat["queries"] / stat["runs"],
+                    "avg_rows": stat["payload_rows"] / stat["runs"],
+                    "avg_kb": stat["payload_bytes"] / 1024 / stat["runs"],
+                }
+                for name, stat in self._stats.items()
+            ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def prometheus_lines(self):
+        seconds = ["# TYPE baemin_render_seconds_total counter"]
+        runs = ["# TYPE baemin_render_runs_total counter"]
+        payload = ["# TYPE baemin_render_payload_bytes_total counter"]
+        with self._lock:
+            for name, stat in sorted(self._stats.items()):
+                label = _label(name)
+                seconds.append(f'baemin_render_seconds_total{{fragment="{label}",part="db"}} {stat["db_seconds"]:.6f}')
+                seconds.append(f'baemin_render_seconds_total{{fragment="{label}",part="python"}} {stat["wall_seconds"] - stat["db_seconds"]:.6f}')
+                runs.append(f'baemin_render_runs_total{{fragment="{label}"}} {stat["runs"]}')
+                payload.append(f'baemin_render_payload_bytes_total{{fragment="{label}"}} {stat["payload_bytes"]}')
+        return seconds + runs + payload
+
+
+render_stats = RenderStats()
+
+
+def instrument_render(name):
+    """render 함수용 데코레이터. @st.fragment보다 안쪽(아래)에 붙인다."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            record = _RenderRecord(name)
+            parent = _current_render.get()
+            token = _current_render.set(record)
+            fragment_token = current_fragment.set(name)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                wall_seconds = time.perf_counter() - started
+                current_fragment.reset(fragment_token)
+                _current_render.reset(token)
+                render_stats.observe(record, wall_seconds)
+                if parent is not None:
+                    parent.db_seconds += record.db_seconds
+                    parent.queries += record.queries
+                _count_session_run(name, wall_seconds, record)
+        return wrapper
+    return decorator
+
+
+def record_payload(data):
+    """화면으로 보내는 표(DataFrame)나 목록의 크기를 지금 실행 중인 render에 기록"""
+    render = _current_render.get()
+    if render is None or data is None:
+        return
+    render.payload_rows += len(data)
+    if hasattr(data, "memory_usage"):
+        render.payload_bytes += int(data.memory_usage(index=False, deep=True).sum())
+    else:
+        render.payload_bytes += sum(len(str(item)) for item in data)
+
+
+def _count_session_run(name, wall_seconds, record):
+    """세션(브라우저 탭)별 실행 횟수와 마지막 실행 시간"""
+    try:
+        import streamlit as st
+        runs = st.session_state.setdefault("_render_runs", {})
+    except Exception:
+        return  # streamlit 밖(벤치마크 등)에서 호출된 경우
+    entry = runs.setdefault(name, {"runs": 0, "last_ms": 0.0, "last_db_ms": 0.0, "last_rows": 0})
+    entry["runs"] += 1
+    entry["last_ms"] = wall_seconds * 1000
+    entry["last_db_ms"] = record.db_seconds * 1000
+    entry["last_rows"] = record.payload_rows
+
+
+# --- Prometheus 텍스트 ---
+
+_gauge_sources = []
+
+def add_gauge_source(source):
+    """source()는 {이름: 숫자}를 돌려주며, prometheus_text()에 baemin_<이름>으로 나간다."""
+    _gauge_sources.append(source)
+
+def prometheus_text():
+    lines = query_stats.prometheus_lines() + render_stats.prometheus_lines()
+    for source in _gauge_sources:
+        for name, value in source().items():
+            lines.append(f"baemin_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(port):
+    """/metrics를 제공하는 HTTP 서버를 백그라운드로 한 번만 띄운다."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
@@ -0,0 +1,256 @@
+import logging
+import re
+import threading
+import db
+from db import get_db_connection, execute, dict_cursor, STORE_TOTALS_QUERY
+
+# ---------------------------------------------------------
+# 스키마 마이그레이션
+# ---------------------------------------------------------
+# 1.sql 이후에 바뀐 스키마를 버전 순서대로 적용한다. 적용한 버전은 schema_migrations에 남고,
+# 각 문장도 IF NOT EXISTS라서 여러 번(여러 프로세스가 동시에) 실행해도 안전하다.
+# main.py/add_page.py가 뜰 때 ensure_migrated()로 한 번 실행되고,
+# 직접 돌릴 때는 `python manage.py migrate`, 인덱스 사용 확인은 `python manage.py explain`.
+#
+# SQLite 백엔드는 빈 DB 파일이면 sqlite_schema.sql(최신 스키마)로 만들고 지금까지의 버전을 전부 적용된 것으로 기록한다.
+# 그 뒤에 추가하는 마이그레이션은 SQL 목록 대신 {"mariadb": [...], "sqlite": [...]}로 백엔드별 문장을 적을 것.
+
+logger = logging.getLogger("baemin.migrations")
+
+# (버전, 설명, SQL 문장들) - 한 번 배포한 항목은 고치지 말고 새 버전을 추가할 것
+# SQL 문장들이 리스트면 MariaDB 전용
+MIGRATIONS = [
+    (1, "테이블별 데이터 버전 (data_versions)", [
+        """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            table_name varchar(50) NOT NULL,
+            version bigint(20) NOT NULL DEFAULT 0,
+            PRIMARY KEY (table_name)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        INSERT IGNORE INTO data_versions (table_name, version)
+        VALUES ('chat_messages', 0), ('menus', 0), ('orders', 0), ('stores', 0)
+        """,
+    ]),
+    (2, "채팅 1시간 조회용 chat_messages.created_at 인덱스", [
+        "CREATE INDEX IF NOT EXISTS idx_chat_created_at ON chat_messages (created_at)",
+    ]),
+    (3, "주문 목록 정렬용 orders.created_at 인덱스", [
+        "CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders (created_at)",
+    ]),
+    (4, "카테고리별 가게 조회용 stores.category 인덱스", [
+        "CREATE INDEX IF NOT EXISTS idx_stores_category ON stores (category)",
+    ]),
+    (5, "가게별 합계/주문 건수 GROUP BY용 커버링 인덱스", [
+        "CREATE INDEX IF NOT EXISTS idx_orders_store_totals ON orders (store_id, price, quantity)",
+    ]),
+    (6, "쓰기 때마다 갱신하는 가게별 합계 요약 (store_totals)", [
+        """
+        CREATE TABLE IF NOT EXISTS store_totals (
+            store_id int(11) NOT NULL,
+            total bigint(20) NOT NULL DEFAULT 0,
+            order_count int(11) NOT NULL DEFAULT 0,
+            PRIMARY KEY (store_id),
+            KEY idx_store_totals_total (total),
+            KEY idx_store_totals_order_count (order_count)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        "REPLACE INTO store_totals (store_id, total, order_count)" + STORE_TOTALS_QUERY,
+    ]),
+    (7, "주문 라운드(order_rounds)와 마감한 주문 보관함(orders_history)", [
+        """
+        CREATE TABLE IF NOT EXISTS order_rounds (
+            id int(11) NOT NULL AUTO_INCREMENT,
+            started_at timestamp NULL DEFAULT current_timestamp(),
+            closed_at timestamp NULL DEFAULT NULL,
+            order_count int(11) NOT NULL DEFAULT 0,
+            eater_count int(11) NOT NULL DEFAULT 0,
+            total bigint(20) NOT NULL DEFAULT 0,
+            PRIMARY KEY (id),
+            KEY idx_order_rounds_closed_at (closed_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        # 지금 orders에 있는 주문은 첫 번째(열린) 라운드로 묶음
+        """
+        INSERT INTO order_rounds (started_at)
+        SELECT COALESCE((SELECT MIN(created_at) FROM orders), NOW()) FROM DUAL
+        WHERE NOT EXISTS (SELECT 1 FROM order_rounds WHERE closed_at IS NULL)
+        """,
+        "ALTER TABLE orders ADD COLUMN IF NOT EXISTS round_id int(11) DEFAULT NULL",
+        "CREATE INDEX IF NOT EXISTS idx_orders_round_id ON orders (round_id)",
+        """
+        UPDATE orders SET round_id = (SELECT MAX(id) FROM order_rounds WHERE closed_at IS NULL)
+        WHERE round_id IS NULL
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS orders_history (
+            id int(11) NOT NULL,
+            round_id int(11) NOT NULL,
+            eater_name varchar(50) NOT NULL,
+            store_id int(11) NOT NULL,
+            store_name varchar(255) DEFAULT NULL,
+            category varchar(50) DEFAULT NULL,
+            menu_id int(11) NOT NULL,
+            menu_name varchar(255) DEFAULT NULL,
+            price int(11) NOT NULL,
+            quantity int(11) DEFAULT 1,
+            created_at timestamp NULL DEFAULT NULL,
+            PRIMARY KEY (id),
+            KEY idx_orders_history_round_id (round_id),
+            KEY idx_orders_history_store_id (store_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        "INSERT IGNORE INTO data_versions (table_name, version) VALUES ('orders_history', 0)",
+    ]),
+]
+
+
+def _ensure_migrations_table(cursor):
+    # MariaDB/SQLite 둘 다 되는 문법으로
+    execute(cursor, """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version int NOT NULL PRIMARY KEY,
+            description varchar(255) NOT NULL,
+            applied_at timestamp NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _statements_for(backend_name, statements):
+    if isinstance(statements, dict):
+        return statements.get(backend_name, [])
+    if backend_name != "mariadb":
+        raise RuntimeError(f"{backend_name}용 마이그레이션 문장이 없습니다. MIGRATIONS에 백엔드별 문장을 적어주세요.")
+    return statements
+
+
+def _record(cursor, version, description):
+    execute(cursor, "INSERT IGNORE INTO schema_migrations (version, description) VALUES (%s, %s)",
+            (version, description))
+
+
+def applied_versions():
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        _ensure_migrations_table(cursor)
+        execute(cursor, "SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cursor.fetchall()}
+    return versions
+
+
+def migrate():
+    """아직 적용하지 않은 마이그레이션을 순서대로 적용하고, 적용한 버전 목록을 돌려준다."""
+    backend = db.get_backend()
+    if backend.bootstrap():
+        # 새로 만든 DB는 이미 최신 스키마
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            for version, description, _ in MIGRATIONS:
+                _record(cursor, version, description)
+            conn.commit()
+        logger.info("빈 DB에 스키마와 기본 데이터를 만들었습니다: %s", backend.describe())
+    done = applied_versions()
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        if version in done:
+            continue
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # DDL은 MariaDB에서 자동 커밋되므로 문장마다 멱등하게 작성해 둠
+            for statement in _statements_for(backend.name, statements):
+                execute(cursor, statement)
+            _record(cursor, version, description)
+            conn.commit()
+        logger.info("마이그레이션 %d 적용: %s", version, description)
+        applied.append(version)
+    return applied
+
+
+_migrated = False
+_migrate_lock = threading.Lock()
+
+def ensure_migrated():
+    """프로세스당 한 번만 migrate() (streamlit은 rerun마다 스크립트를 다시 실행하므로)"""
+    global _migrated
+    with _migrate_lock:
+        if not _migrated:
+            migrate()
+            _migrated = True
+
+
+# ---------------------------------------------------------
+# EXPLAIN으로 자주 쓰는 쿼리가 인덱스를 타는지 확인
+# ---------------------------------------------------------
+# (이름, 쿼리, 파라미터, 확인할 테이블 별칭, 기대하는 인덱스들)
+HOT_QUERIES = [
+    ("주문 목록(최신순)",
+     "SELECT o.id FROM orders o JOIN stores s ON o.store_id = s.id JOIN menus m ON o.menu_id = m.id ORDER BY o.created_at DESC",
+     None, "o", {"idx_orders_created_at"}),
+    ("주문 목록 페이지",
+     "SELECT o.id FROM orders o JOIN stores s ON o.store_id = s.id JOIN menus m ON o.menu_id = m.id WHERE o.id < %s ORDER BY o.id DESC LIMIT 51",
+     (2 ** 31 - 1,), "o", {"PRIMARY"}),
+    ("가게 필터 페이지",
+     "SELECT o.id FROM orders o JOIN stores s ON o.store_id = s.id JOIN menus m ON o.menu_id = m.id WHERE o.store_id IN (%s) ORDER BY o.id DESC LIMIT 51",
+     (1,), "o", {"FK_orders_stores_id", "idx_orders_store_totals", "PRIMARY"}),
+    ("가게별 합계 재집계",
+     STORE_TOTALS_QUERY.strip(),
+     None, "orders", {"idx_orders_store_totals"}),
+    ("최근 1시간 채팅",
+     "SELECT id FROM chat_messages WHERE created_at >= NOW() - INTERVAL 1 HOUR ORDER BY created_at DESC, id DESC LIMIT 200",
+     None, "chat_messages", {"idx_chat_created_at"}),
+    ("새 채팅(id 이후)",
+     "SELECT id FROM chat_messages WHERE id > %s ORDER BY id ASC LIMIT 200",
+     (0,), "chat_messages", {"PRIMARY"}),
+    ("카테고리별 가게",
+     "SELECT id, name, min_order_amount FROM stores WHERE category = %s",
+     ("한식",), "stores", {"idx_stores_category"}),
+    ("카테고리 목록",
+     "SELECT DISTINCT category FROM stores ORDER BY category",
+     None, "stores", {"idx_stores_category"}),
+]
+
+
+def check_query_plans():
+    """HOT_QUERIES를 EXPLAIN 해서 기대한 인덱스를 쓰는지 확인한 결과 목록
+
+    테이블에 행이 거의 없으면 옵티마이저가 전체 스캔을 고를 수 있으니
+    실제 데이터가 쌓인 DB(또는 benchmarks의 합성 데이터)에서 확인할 것.
+    """
+    explain = _sqlite_plan if db.get_backend().name == "sqlite" else _mariadb_plan
+    results = []
+    with get_db_connection() as conn:
+        cursor = dict_cursor(conn)
+        for name, query, params, table, expected in HOT_QUERIES:
+            row = explain(cursor, query, params, table)
+            used = row.get("key")
+            results.append({
+                "name": name,
+                "table": table,
+                "key": used,
+                "type": row.get("type"),
+                "rows": row.get("rows"),
+                "extra": row.get("Extra"),
+                "ok": used in expected,
+                "expected": sorted(expected),
+            })
+    return results
+
+
+def _mariadb_plan(cursor, query, params, table):
+    execute(cursor, "EXPLAIN " + query, params)
+    plan = [row for row in cursor.fetchall() if row["table"] == table]
+    return plan[0] if plan else {}
+
+
+_SQLITE_PLAN = re.compile(r"^(SCAN|SEARCH) (\S+)(?: USING (?:COVERING )?(?:INDEX (\S+)|(INTEGER PRIMARY KEY|PRIMARY KEY)))?")
+
+def _sqlite_plan(cursor, query, params, table):
+    """EXPLAIN QUERY PLAN 결과를 MariaDB EXPLAIN과 같은 key/type/Extra 모양으로"""
+    execute(cursor, "EXPLAIN QUERY PLAN " + query, params)
+    for row in cursor.fetchall():
+        match = _SQLITE_PLAN.match(row["detail"])
+        if match and match.group(2) == table:
+            key = match.group(3) or ("PRIMARY" if match.group(4) else None)
+            return {"key": key, "type": match.group(1), "rows": None, "Extra": row["detail"]}
+    return {}
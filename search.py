@@ -0,0 +1,193 @@
+import bisect
+import heapq
+import threading
+
+# ---------------------------------------------------------
+# 가게/메뉴 검색 인덱스 (메모리)
+# ---------------------------------------------------------
+# 카테고리 → 가게 → 메뉴를 차례로 고르지 않고 이름 일부나 초성("ㅊㅋ" → 치킨)으로 바로 찾는다.
+# 카탈로그(snapshot.cached_catalog)를 한 번 읽어서 만들고, 가게/메뉴가 등록되어 카탈로그가 바뀌면
+# 전부 다시 만들지 않고 바뀐 가게/메뉴만 넣고 뺀다(sync).
+#
+# 이름마다 두 가지 형태로 색인한다.
+#   글자: 소문자로 바꾸고 공백을 뺀 이름 ("BHC 치킨" → "bhc치킨")
+#   초성: 한글은 초성만 남긴 이름 ("bhcㅊㅋ")
+# 형태마다 정렬된 목록(앞부분 일치, bisect)과 1·2글자 n-gram 역색인(중간 일치)을 둔다.
+# 결과는 일치 정도(같음 > 앞부분 > 단어 앞부분 > 중간 > 초성) 다음으로 가게 인기(주문 건수) 순.
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_HANGUL_FIRST, _HANGUL_LAST = ord("가"), ord("힣")
+
+SEARCH_LIMIT = 20
+
+# 일치 정도 (작을수록 위)
+EXACT, PREFIX, WORD_PREFIX, CONTAINS, CHOSEONG_PREFIX, CHOSEONG_CONTAINS = range(6)
+
+
+def normalize(text):
+    return "".join(text.lower().split())
+
+def to_choseong(text):
+    """한글 음절은 초성으로, 나머지 글자는 그대로 ("떡볶이 2" → "ㄸㅂㅇ2")"""
+    return "".join(
+        CHOSEONG[(ord(ch) - _HANGUL_FIRST) // 588] if _HANGUL_FIRST <= ord(ch) <= _HANGUL_LAST else ch
+        for ch in text
+    )
+
+def is_choseong_query(query):
+    """초성(자음)이 하나라도 들어간 검색어인지"""
+    return any(ch in CHOSEONG for ch in query)
+
+def _grams(text):
+    return {text[i:i + n] for n in (1, 2) for i in range(len(text) - n + 1)}
+
+
+class _TextIndex:
+    """문자열 하나당 앞부분 일치(정렬 목록)와 중간 일치(n-gram 역색인)"""
+
+    def __init__(self):
+        self._sorted = []   # (문자열, key) 정렬 목록
+        self._grams = {}    # n-gram -> key 집합
+
+    def add(self, key, texts):
+        # 정렬은 한꺼번에 넣은 뒤 sort()에서 한 번만
+        self._sorted.extend((text, key) for text in texts)
+        grams = self._grams
+        for gram in set().union(*(_grams(text) for text in texts)):
+            if gram in grams:
+                grams[gram].add(key)
+            else:
+                grams[gram] = {key}
+
+    def remove(self, key, texts):
+        for text in texts:
+            i = bisect.bisect_left(self._sorted, (text, key))
+            if i < len(self._sorted) and self._sorted[i] == (text, key):
+                del self._sorted[i]
+        for gram in set().union(*(_grams(text) for text in texts)):
+            keys = self._grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+
+    def sort(self):
+        self._sorted.sort()
+
+    def prefix(self, query):
+        """query로 시작하는 (문자열, key)"""
+        lo = bisect.bisect_left(self._sorted, (query,))
+        hi = bisect.bisect_left(self._sorted, (query + "\U0010ffff",), lo)
+        return self._sorted[lo:hi]
+
+    def contains(self, query, texts_by_key, field):
+        """query를 중간에 포함하는 key 집합
+
+        n-gram 역색인의 교집합으로 후보를 줄이고, 3글자 이상이면 texts_by_key[key][field]로 실제 포함 여부를 확인한다.
+        """
+        if len(query) <= 2:
+            return set(self._grams.get(query, ()))
+        postings = sorted((self._grams.get(query[i:i + 2], set()) for i in range(len(query) - 1)), key=len)
+        candidates = set.intersection(*postings) if postings[0] else set()
+        return {key for key in candidates if any(query in text for text in texts_by_key[key][field])}
+
+
+class MenuSearchIndex:
+    """가게 이름/메뉴 이름 검색 인덱스 (프로세스 공유, snapshot.cached_menu_search로 사용)
+
+    결과 항목은 dict: kind("store"/"menu"), store_id, store_name, category, menu_id, menu_name, price, label
+    """
+
+    def __init__(self):
+        self._entries = {}        # ("store", id) / ("menu", id) -> 결과 항목
+        self._keys = {}           # 위 key -> (글자 형태들, 초성 형태들, 정렬용 값, store_id)
+        self._text = _TextIndex()
+        self._choseong = _TextIndex()
+        self._catalog = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # --- 색인 ---
+
+    def sync(self, catalog):
+        """카탈로그와 달라진 가게/메뉴만 색인에 넣고 뺀다. 바뀐 항목 수를 돌려준다."""
+        if catalog is self._catalog:
+            return 0
+        entries = dict(self._catalog_entries(catalog))
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entries.get(key) != entry]
+            for key in stale:
+                self._remove(key)
+            added = [key for key in entries if key not in self._entries]
+            for key in added:
+                self._add(key, entries[key])
+            self._text.sort()
+            self._choseong.sort()
+            self._catalog = catalog
+        return len(stale) + len(added)
+
+    @staticmethod
+    def _catalog_entries(catalog):
+        for store in catalog.all_stores():
+            category = catalog.category(store["id"])
+            yield ("store", store["id"]), {
+                "kind": "store", "store_id": store["id"], "store_name": store["name"], "category": category,
+                "menu_id": None, "menu_name": None, "price": None,
+                "label": f"🏠 {store['name']} ({category or '기타'})",
+            }
+            for menu in catalog.menus(store["id"]):
+                yield ("menu", menu["id"]), {
+                    "kind": "menu", "store_id": store["id"], "store_name": store["name"], "category": category,
+                    "menu_id": menu["id"], "menu_name": menu["menu_name"], "price": menu["price"],
+                    "label": f"🍗 {menu['menu_name']} ({menu['price']:,}원) · {store['name']}",
+                }
+
+    def _add(self, key, entry):
+        name = entry["menu_name"] if entry["kind"] == "menu" else entry["store_name"]
+        full = normalize(name)
+        # 이름 전체를 맨 앞에 두고 공백으로 나뉜 단어들을 뒤에 (단어 앞부분 일치용)
+        texts = [full] + sorted({normalize(word) for word in name.split()} - {full, ""})
+        choseong = sorted({to_choseong(text) for text in texts})
+        self._entries[key] = entry
+        # 같은 일치 정도/인기면 가게 먼저, 짧은 이름 먼저
+        self._keys[key] = (texts, choseong, (entry["kind"] != "store", len(name), name), entry["store_id"])
+        self._text.add(key, texts)
+        self._choseong.add(key, choseong)
+
+    def _remove(self, key):
+        texts, choseong, _, _ = self._keys.pop(key)
+        del self._entries[key]
+        self._text.remove(key, texts)
+        self._choseong.remove(key, choseong)
+
+    # --- 검색 ---
+
+    def search(self, query, limit=SEARCH_LIMIT, popularity=None):
+        """검색어에 맞는 가게/메뉴를 일치 정도 → 인기 순으로 최대 limit개
+
+        popularity: {store_id: 주문 건수} (없으면 이름 순)
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        popularity = popularity or {}
+        with self._lock:
+            keys = self._keys
+            ranks = {}
+            for text, key in self._text.prefix(query):
+                rank = (EXACT if text == query else PREFIX) if text == keys[key][0][0] else WORD_PREFIX
+                if rank < ranks.get(key, WORD_PREFIX + 1):
+                    ranks[key] = rank
+            ranks.update(dict.fromkeys(self._text.contains(query, keys, 0) - ranks.keys(), CONTAINS))
+            if is_choseong_query(query):
+                pattern = to_choseong(query)
+                ranks.update(dict.fromkeys({key for _, key in self._choseong.prefix(pattern)} - ranks.keys(), CHOSEONG_PREFIX))
+                ranks.update(dict.fromkeys(self._choseong.contains(pattern, keys, 1) - ranks.keys(), CHOSEONG_CONTAINS))
+
+            # (일치 정도, -인기, 가게 먼저, 짧은 이름 먼저, 이름, key)
+            top = heapq.nsmallest(limit, (
+                (rank, -popularity.get(keys[key][3], 0), keys[key][2], key) for key, rank in ranks.items()
+            ))
+            return [self._entries[key] for *_, key in top]
@@ -1,11 +1,15 @@
 import streamlit as st
 from db import *
+from metrics import instrument_render, record_payload
+from snapshot import *
+from allocation import solve, options_from_orders, fed_now
 import altair as alt
 
+@instrument_render("popular_realtime")
 def popular_realtime():
     st.subheader("🔥 실시간 인기 맛집")
 
-    popular_df = get_popular_store_stats()
+    popular_df = cached_dashboard().popular
 
     if not popular_df.empty:
         max_order = int(popular_df['order_count'].max())
@@ -28,42 +32,153 @@ def popular_realtime():
                 color=alt.value("#FF4B4B"),
                 tooltip=['store_name', 'order_count']
             ).properties(height=alt.Step(40))
+            record_payload(popular_df)
             st.altair_chart(chart, use_container_width=True)
     else:
         st.info("아직 집계된 인기 순위가 없습니다.")
 
-@st.fragment(run_every=2)
+@st.fragment
+@instrument_render("render_multi_orderers")
 def render_multi_orderers():
     st.subheader("🕵️ 중복 참여자 점검 (문어발 단속)")
-    store_sums = get_store_totals()
-    if not store_sums.empty:
-        valid_stores = store_sums[store_sums['total'] >= store_sums['min_order_amount']]['store_name'].tolist()
-        current_orders = get_current_orders()
-        if not current_orders.empty and valid_stores:
-            success_orders = current_orders[current_orders['store_name'].isin(valid_stores)]
-            dup_check = success_orders['eater_name'].value_counts()
-            multi_eaters = dup_check[dup_check > 1].index.tolist()
+    dashboard = cached_dashboard()
+    if not dashboard.store_totals.empty:
+        if not dashboard.orders.empty and dashboard.reached_stores:
+            multi_eaters = dashboard.multi_eaters
             
             if multi_eaters:
                 st.error(f"🚨 **비상!** 아래 분들은 성공한 파티 **2곳 이상**에 포함되어 있습니다!")
                 st.write(f"대상자: **{', '.join(multi_eaters)}** (이대로 마감하면 점심값 2배 나갑니다 💸)")
-                st.info("👇 아래에서 포기할 메뉴를 하나 삭제해주세요.")
-                dup_orders = success_orders[success_orders['eater_name'].isin(multi_eaters)]
-                for index, row in dup_orders.iterrows():
+                st.info("👇 아래에서 포기할 메뉴를 삭제하거나, 한 곳만 남기고 한꺼번에 정리하세요.")
+                dup_orders = dashboard.multi_orders
+                record_payload(dup_orders)
+                rows = zip(dup_orders['id'], dup_orders['eater_name'], dup_orders['store_name'], dup_orders['menu_name'])
+                for order_id, eater_name, store_name, menu_name in rows:
                     c1, c2, c3, c4 = st.columns([2, 2, 2, 1])
-                    c1.text(row['eater_name'])
-                    c2.text(row['store_name'])
-                    c3.text(f"{row['menu_name']}")
-                    if c4.button("삭제❌", key=f"del_{index}"):
-                        conn = get_db_connection()
-                        with conn.cursor() as cursor:
-                            sql = "DELETE FROM orders WHERE eater_name=%s AND store_name=%s AND menu_name=%s LIMIT 1"
-                            cursor.execute(sql, (row['eater_name'], row['store_name'], row['menu_name']))
-                        conn.commit()
-                        conn.close()
-                        st.toast(f"{row['store_name']} 주문을 포기하셨습니다.")
+                    c1.text(eater_name)
+                    c2.text(store_name)
+                    c3.text(f"{menu_name}")
+                    if c4.button("삭제❌", key=f"del_{order_id}"):
+                        # 이름이 아니라 주문 id로 지우므로 같은 메뉴를 두 번 시켰어도 누른 줄만 지워짐
+                        delete_orders([int(order_id)])
+                        st.toast(f"{store_name} 주문을 포기하셨습니다.")
                         st.rerun()
+
+                col_rule, col_resolve = st.columns([3, 2])
+                rule = col_rule.radio("남길 가게", ["first", "largest"], horizontal=True, key="multi_keep_rule",
+                                      format_func={"first": "먼저 주문한 가게", "largest": "합계가 큰 가게"}.get)
+                if col_resolve.button("한 곳만 남기고 정리 🧹", use_container_width=True):
+                    dropped = resolve_multi_orders(keep=rule)
+                    st.toast(f"중복 주문 {len(dropped)}건을 정리했습니다.")
+                    st.rerun()
             else:
                 st.success("✅ 중복 참여자가 없습니다. (모두 1인 1메뉴 확정!)")
     else:
-        st.caption("아직 최소주문금액을 달성한 파티가 없습니다.")
\ No newline at end of file
+        st.caption("아직 최소주문금액을 달성한 파티가 없습니다.")
+
+def _allocation_inputs(dashboard):
+    """대시보드 주문 목록을 (먹을 사람, store_id, 금액) 목록과 가게별 최소주문금액으로"""
+    store_ids = dashboard.store_ids
+    orders = [(eater, store_ids[store], int(total))
+              for eater, store, total in zip(dashboard.orders['eater_name'], dashboard.orders['store_name'], dashboard.orders['total'])
+              if store in store_ids]
+    totals = dashboard.store_totals
+    min_amounts = {store_ids[store]: int(amount)
+                   for store, amount in zip(totals['store_name'], totals['min_order_amount']) if store in store_ids}
+    return orders, min_amounts
+
+def suggest_allocation(dashboard, flexible):
+    """지금 주문 + 옮겨도 되는 사람으로 파티 배정 추천 (allocation.solve)"""
+    orders, min_amounts = _allocation_inputs(dashboard)
+    options, current = options_from_orders(orders, flexible)
+    before_reached, before_fed = fed_now(orders, min_amounts)
+    result = solve(options, min_amounts, current)
+    ordered = {}
+    for eater, store_id, _ in orders:
+        ordered.setdefault(eater, set()).add(store_id)
+    return result, before_reached, before_fed, ordered, min_amounts
+
+@st.fragment
+@instrument_render("render_allocation")
+def render_allocation():
+    with st.expander("🧮 파티 배정 추천 (최소주문금액 맞추기)"):
+        dashboard = cached_dashboard()
+        if dashboard.orders.empty:
+            st.caption("아직 주문이 없습니다.")
+            return
+        st.caption("한 사람당 가게 한 곳씩, 최소주문금액을 넘긴 가게에서 먹을 수 있는 사람이 가장 많아지게 배정합니다.")
+        eater_names = sorted(dashboard.orders['eater_name'].unique())
+        flexible = st.multiselect("다른 가게로 옮겨도 괜찮은 사람 (지금 낸 금액만큼 다른 가게에서 시킨다고 봄)",
+                                  eater_names, key="alloc_flexible")
+        if st.button("배정 추천 받기 🧮"):
+            st.session_state.alloc_requested = True
+        if not st.session_state.get("alloc_requested"):
+            return
+
+        # 주문이 바뀌거나 옮겨도 되는 사람이 바뀌면 다시 계산
+        result, before_reached, before_fed, ordered, min_amounts = session_cached(
+            "allocation_view", ("orders", "stores", "menus"),
+            lambda: suggest_allocation(dashboard, flexible), tuple(flexible),
+        )
+        names = {store_id: name for name, store_id in dashboard.store_ids.items()}
+
+        c1, c2, c3 = st.columns(3)
+        c1.metric("먹을 수 있는 사람", f"{len(result.fed)}명", f"{len(result.fed) - len(before_fed):+d}명")
+        c2.metric("최소금액 넘긴 가게", f"{len(result.reached)}곳", f"{len(result.reached) - len(before_reached):+d}곳")
+        c3.metric("계산 시간", f"{result.elapsed_ms:.0f}ms")
+
+        rows = [{
+            "먹을 사람": eater,
+            "지금 가게": ", ".join(sorted(names.get(s, str(s)) for s in ordered.get(eater, ()))),
+            "추천 가게": names.get(store_id, str(store_id)),
+            "먹을 수 있음": store_id in result.reached,
+            "옮김": eater in result.moved,
+        } for eater, store_id in sorted(result.assignment.items())]
+        record_payload(rows)
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+        # 이미 주문한 가게 중 하나를 남기는 사람은 나머지 주문을 지워서 바로 적용할 수 있음
+        choices = {eater: store_id for eater, store_id in result.assignment.items()
+                   if store_id in ordered.get(eater, ()) and len(ordered[eater]) > 1}
+        new_orders = [eater for eater, store_id in result.assignment.items() if store_id not in ordered.get(eater, ())]
+        if new_orders:
+            st.info("새 가게에서 다시 주문해야 하는 사람: " + ", ".join(
+                f"**{eater}** → {names.get(result.assignment[eater])}" for eater in sorted(new_orders)))
+        if choices and st.button(f"추천대로 정리하기 ({len(choices)}명의 다른 가게 주문 삭제) ✅"):
+            dropped = keep_stores(choices)
+            st.session_state.alloc_requested = False
+            st.toast(f"주문 {len(dropped)}건을 정리했습니다.")
+            st.rerun()
+
+@instrument_render("render_history")
+def render_history():
+    """마감한 라운드 기록 (orders_history만 읽으므로 이번 판 주문 조회와는 무관)"""
+    rounds, store_stats = cached_history()
+    with st.expander("📦 지난 점심 기록"):
+        if rounds.empty:
+            st.caption("아직 마감한 판이 없습니다.")
+            return
+        col_rounds, col_stores = st.columns(2)
+        with col_rounds:
+            st.markdown("**최근 마감한 판**")
+            record_payload(rounds)
+            st.dataframe(
+                rounds,
+                column_config={
+                    "round_id": "판", "started_at": "시작", "closed_at": "마감",
+                    "order_count": "주문 수", "eater_count": "인원",
+                    "total": st.column_config.NumberColumn("합계", format="%d원"),
+                },
+                hide_index=True, use_container_width=True,
+            )
+        with col_stores:
+            st.markdown("**누적 인기 가게**")
+            record_payload(store_stats)
+            st.dataframe(
+                store_stats,
+                column_config={
+                    "store_name": "가게", "category": "분류", "order_count": "주문 수",
+                    "total": st.column_config.NumberColumn("합계", format="%d원"), "rounds": "등장한 판",
+                },
+                hide_index=True, use_container_width=True,
+            )
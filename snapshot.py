@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+import streamlit as st
+from db import (
+    get_dashboard_snapshot, get_data_versions, get_catalog_rows,
+    get_round_summaries, get_history_store_stats, reads_pinned,
+)
+from catalog import Catalog
+from search import MenuSearchIndex
+import events
+import aiodb
+
+# ---------------------------------------------------------
+# 대시보드용 공유 스냅샷 캐시
+# ---------------------------------------------------------
+# Streamlit은 세션(브라우저 탭)마다 스레드가 따로 돌지만 프로세스는 하나라서,
+# 여기 모듈 변수에 담아둔 결과는 모든 세션이 같이 본다.
+# 화면 조각이 아무리 많아도 DB에는 data_versions 확인 한 번만 가고,
+# 버전이 바뀌었을 때만 주문 조회(get_dashboard_snapshot) 한 번을 다시 한다.
+
+SNAPSHOT_TTL = 2        # 초. 버전 확인(get_data_versions) 주기 = 이벤트 없이 바뀐 것(다른 프로세스/DB 직접 수정)을 알아채는 최대 지연
+SNAPSHOT_MAX_AGE = 60   # 초. 버전이 그대로여도 이 시간이 지나면 다시 읽음 (DB를 직접 고친 경우 대비)
+
+
+class SnapshotCache:
+    """프로세스 전체가 공유하는 캐시.
+
+    tables를 주면 해당 테이블들의 데이터 버전이 바뀌었을 때만 다시 읽고,
+    없으면 ttl이 지날 때마다 다시 읽는다. 만료되면 한 스레드만 DB에서 다시 읽고
+    (single-flight), 그동안 다른 세션은 직전 값을 그대로 받아간다.
+    반환값은 여러 세션이 공유하므로 수정하지 말 것.
+
+    복제본이 있을 때 쓰기 직후라 읽기가 주 DB로 고정된 세션(db.reads_pinned)은 주 DB에서 읽은 값만 따로 담는
+    칸(_primary)을 쓴다. 주 DB 값과 복제본 값을 한 칸에 번갈아 넣으면 버전이 앞뒤로 오가면서 매번 다시 읽고,
+    다른 세션에 옛날 데이터를 다시 보여주게 된다.
+    """
+
+    def __init__(self, loader, ttl=SNAPSHOT_TTL, tables=None, _pinned=False):
+        self.loader = loader
+        self.ttl = ttl if tables is None else SNAPSHOT_MAX_AGE
+        self.tables = tables
+        self._value = None
+        self._version = None      # 마지막으로 읽었을 때의 데이터 버전
+        self._loaded_at = None    # None이면 비어있거나 무효화된 상태
+        self._generation = 0      # invalidate() 할 때마다 증가
+        self._refresh_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self.hits = 0
+        self.refreshes = 0
+        self._primary = None if _pinned else SnapshotCache(loader, ttl, tables, _pinned=True)
+
+    def _is_fresh(self, version):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+            return False
+        return self.tables is None or version == self._version
+
+    def get(self):
+        if self._primary is not None and reads_pinned():
+            return self._primary.get()
+        version = data_version(self.tables) if self.tables else None
+        with self._state_lock:
+            if self._is_fresh(version):
+                self.hits += 1
+                return self._value
+            has_value = self._value is not None
+
+        # 다른 세션이 이미 갱신 중이면 기다리지 않고 직전 값을 준다
+        if not self._refresh_lock.acquire(blocking=not has_value):
+            with self._state_lock:
+                self.hits += 1
+                return self._value
+        try:
+            with self._state_lock:
+                if self._is_fresh(version):
+                    self.hits += 1
+                    return self._value
+                generation = self._generation
+            value = self.loader()
+            with self._state_lock:
+                self._value = value
+                self._version = version
+                self.refreshes += 1
+                # 읽는 도중에 쓰기가 있었다면 이번 값은 바로 다시 만료 처리
+                self._loaded_at = time.monotonic() if generation == self._generation else None
+            return value
+        finally:
+            self._refresh_lock.release()
+
+    def invalidate(self):
+        with self._state_lock:
+            self._generation += 1
+            self._loaded_at = None
+        if self._primary is not None:
+            self._primary.invalidate()
+
+
+_versions = SnapshotCache(get_data_versions)
+_dashboard = SnapshotCache(get_dashboard_snapshot, tables=("orders", "stores", "menus"))
+_catalog = SnapshotCache(lambda: Catalog(get_catalog_rows()), tables=("stores", "menus"))
+_history = SnapshotCache(lambda: (get_round_summaries(), get_history_store_stats()), tables=("orders_history",))
+_menu_search = MenuSearchIndex()
+
+
+def data_version(tables):
+    """주어진 테이블들의 현재 데이터 버전 (프로세스 공유, SNAPSHOT_TTL마다 한 번만 DB 확인)"""
+    versions = _versions.get()
+    return tuple(versions.get(table) for table in tables)
+
+def cached_dashboard():
+    """주문 목록/가게별 합계/인기 순위/중복 참여자를 담은 DashboardSnapshot"""
+    return _dashboard.get()
+
+def cached_catalog():
+    """카테고리/가게/메뉴 카탈로그 (가게나 메뉴가 등록될 때만 다시 읽음)"""
+    return _catalog.get()
+
+def cached_menu_search():
+    """가게/메뉴 검색 인덱스 (카탈로그가 바뀌었으면 바뀐 가게/메뉴만 다시 색인)"""
+    _menu_search.sync(cached_catalog())
+    return _menu_search
+
+def store_popularity():
+    """{store_id: 이번 판 주문 건수} - 검색 결과 정렬용 (get_popular_store_stats와 같은 값)"""
+    dashboard = cached_dashboard()
+    return {dashboard.store_ids[name]: count
+            for name, count in zip(dashboard.popular["store_name"], dashboard.popular["order_count"])
+            if name in dashboard.store_ids}
+
+def cached_history():
+    """(마감된 라운드 요약, 지난 기록의 가게별 통계) - 라운드를 마감할 때만 다시 읽음"""
+    return _history.get()
+
+async def prefetch_async():
+    """화면을 그리기 전에 공유 캐시들을 동시에 채운다.
+
+    버전 확인 한 번 뒤에, 만료된 캐시(주문 스냅샷/카탈로그/지난 기록)만 각각 DB 스레드에서 동시에 다시 읽는다.
+    그 뒤 화면 조각들이 cached_*()를 부르면 전부 메모리에서 바로 받아간다.
+    """
+    await aiodb.to_thread(_versions.get)
+    await asyncio.gather(*(aiodb.to_thread(cache.get) for cache in (_dashboard, _catalog, _history)))
+
+def prefetch():
+    aiodb.run(prefetch_async())
+
+def invalidate_snapshots():
+    for cache in (_versions, _dashboard, _catalog, _history):
+        cache.invalidate()
+
+def get_snapshot_stats():
+    caches = (("versions", _versions), ("dashboard", _dashboard), ("catalog", _catalog), ("history", _history))
+    return {name: {"hits": cache.hits, "refreshes": cache.refreshes,
+                   "pinned_hits": cache._primary.hits, "pinned_refreshes": cache._primary.refreshes}
+            for name, cache in caches}
+
+
+def session_cached(key, tables, compute, *params):
+    """세션별 계산 결과 캐시.
+
+    fragment가 다시 돌 때, 데이터 버전과 params(필터 선택 등)가
+    지난번과 같으면 compute()를 건너뛰고 지난번 결과를 그대로 돌려준다.
+    """
+    stamp = (data_version(tables), params)
+    entry = st.session_state.get(key)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+    value = compute()
+    st.session_state[key] = (stamp, value)
+    return value
+
+
+def _on_write(table):
+    # 이벤트로 알게 된 쓰기는 버전 확인 주기를 기다리지 않고 바로 반영
+    _versions.invalidate()
+    if table in ("orders", "stores", "menus"):
+        _dashboard.invalidate()
+    if table in ("stores", "menus"):
+        _catalog.invalidate()
+    if table == "orders_history":
+        _history.invalidate()
+
+events.subscribe(_on_write)
@@ -0,0 +1,103 @@
+-- 내장 SQLite 모드(BAEMIN_DB_BACKEND=sqlite)용 스키마
+-- 1.sql + migrations.py를 모두 적용한 MariaDB 스키마와 같은 테이블/인덱스 이름을 쓴다.
+-- 빈 DB 파일이면 backends.SQLiteBackend가 이 파일을 실행한 뒤 1.sql의 INSERT 문으로 기본 데이터를 넣는다.
+-- 스키마를 바꿀 때는 1.sql, migrations.py와 함께 이 파일도 고칠 것.
+
+CREATE TABLE IF NOT EXISTS chat_messages (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  username varchar(50) NOT NULL,
+  message text NOT NULL,
+  created_at timestamp DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_chat_created_at ON chat_messages (created_at);
+
+CREATE TABLE IF NOT EXISTS data_versions (
+  table_name varchar(50) NOT NULL PRIMARY KEY,
+  version bigint NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS stores (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name varchar(255) NOT NULL,
+  category varchar(20) DEFAULT NULL CHECK (category IN (
+    '패스트푸드','카페·디저트','한식','찜·탕','분식','중식','돈까스·회','피자','치킨','양식','고기','아시안','족발·보쌈'
+  )),
+  rating decimal(2,1) DEFAULT 0.0,
+  min_order_amount int DEFAULT 0,
+  working_days varchar(255) DEFAULT NULL,
+  open_time varchar(10) DEFAULT NULL,
+  close_time varchar(10) DEFAULT NULL,
+  created_at timestamp DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS name ON stores (name);
+CREATE INDEX IF NOT EXISTS idx_stores_category ON stores (category);
+
+CREATE TABLE IF NOT EXISTS menus (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  store_id int NOT NULL REFERENCES stores (id) ON DELETE CASCADE,
+  menu_name varchar(255) NOT NULL,
+  price int NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fk_store ON menus (store_id);
+CREATE INDEX IF NOT EXISTS menu_name ON menus (menu_name);
+
+CREATE TABLE IF NOT EXISTS order_rounds (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  started_at timestamp DEFAULT (datetime('now', 'localtime')),
+  closed_at timestamp DEFAULT NULL,
+  order_count int NOT NULL DEFAULT 0,
+  eater_count int NOT NULL DEFAULT 0,
+  total bigint NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_order_rounds_closed_at ON order_rounds (closed_at);
+
+-- AUTOINCREMENT: 보관함(orders_history)이 주문 id를 그대로 쓰므로 지운 id를 다시 쓰면 안 됨
+CREATE TABLE IF NOT EXISTS orders (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  eater_name varchar(50) NOT NULL,
+  store_id int NOT NULL REFERENCES stores (id) ON DELETE CASCADE,
+  menu_id int NOT NULL REFERENCES menus (id) ON DELETE CASCADE,
+  store_name varchar(255) NOT NULL DEFAULT '',
+  menu_name varchar(255) NOT NULL DEFAULT '',
+  price int NOT NULL,
+  quantity int DEFAULT 1,
+  created_at timestamp DEFAULT (datetime('now', 'localtime')),
+  round_id int DEFAULT NULL
+);
+CREATE INDEX IF NOT EXISTS FK_orders_stores ON orders (store_name);
+CREATE INDEX IF NOT EXISTS FK_orders_menus ON orders (menu_name);
+CREATE INDEX IF NOT EXISTS FK_orders_stores_id ON orders (store_id);
+CREATE INDEX IF NOT EXISTS FK_orders_menus_id ON orders (menu_id);
+CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders (created_at);
+CREATE INDEX IF NOT EXISTS idx_orders_store_totals ON orders (store_id, price, quantity);
+CREATE INDEX IF NOT EXISTS idx_orders_round_id ON orders (round_id);
+
+CREATE TABLE IF NOT EXISTS orders_history (
+  id int NOT NULL PRIMARY KEY,
+  round_id int NOT NULL,
+  eater_name varchar(50) NOT NULL,
+  store_id int NOT NULL,
+  store_name varchar(255) DEFAULT NULL,
+  category varchar(50) DEFAULT NULL,
+  menu_id int NOT NULL,
+  menu_name varchar(255) DEFAULT NULL,
+  price int NOT NULL,
+  quantity int DEFAULT 1,
+  created_at timestamp DEFAULT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_history_round_id ON orders_history (round_id);
+CREATE INDEX IF NOT EXISTS idx_orders_history_store_id ON orders_history (store_id);
+
+CREATE TABLE IF NOT EXISTS store_totals (
+  store_id int NOT NULL PRIMARY KEY,
+  total bigint NOT NULL DEFAULT 0,
+  order_count int NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_store_totals_total ON store_totals (total);
+CREATE INDEX IF NOT EXISTS idx_store_totals_order_count ON store_totals (order_count);
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version int NOT NULL PRIMARY KEY,
+  description varchar(255) NOT NULL,
+  applied_at timestamp DEFAULT (datetime('now', 'localtime'))
+);
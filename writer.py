@@ -0,0 +1,167 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import db
+import metrics
+
+# ---------------------------------------------------------
+# 주문/채팅 묶음 쓰기 (백그라운드 writer)
+# ---------------------------------------------------------
+# 점심시간에 여러 사람이 동시에 주문/채팅을 보내면 각자 커밋을 기다리느라 화면이 멈춘다.
+# 여기서는 쓰기를 큐에 넣기만 하고, 백그라운드 스레드 하나가 몇 ms 동안 모인 것들을
+# 여러 줄 INSERT + 커밋 한 번(db.save_write_batch)으로 저장한 뒤 Future로 결과를 알려준다.
+#
+#     submit_chat("닉네임", "안녕").result(timeout=WRITE_TIMEOUT)   # 커밋될 때까지 기다림
+#
+# - 순서: 스레드 하나가 큐 순서대로 저장하므로 같은 종류의 쓰기는 넣은 순서대로 id가 붙는다.
+# - 한 건이 실패해도 같은 묶음의 다른 쓰기는 하나씩 다시 저장해서 실패한 것만 예외를 받는다.
+#   다시 저장하는 건 커밋이 실패했을 때뿐이다. 커밋 뒤 알림(db.notify_write)은 따로 부르고 실패해도 로그만 남긴다.
+# - 종료: 프로세스가 끝날 때(atexit) 큐에 남은 쓰기를 전부 저장하고 나서 멈춘다.
+
+FLUSH_INTERVAL = 0.005   # 초. 첫 쓰기가 들어온 뒤 같이 묶을 쓰기를 기다리는 최대 시간
+MAX_BATCH = 500          # 한 번에 커밋하는 최대 쓰기 수
+WRITE_TIMEOUT = 10       # 초. 화면에서 Future.result()를 기다릴 때 쓰는 기본값
+
+logger = logging.getLogger("baemin.writer")
+
+_STOP = object()
+
+
+class _Write:
+    __slots__ = ("kind", "rows", "future")
+
+    def __init__(self, kind, rows):
+        self.kind = kind          # "orders" / "chat_messages"
+        self.rows = rows          # 한 번에 같이 저장해야 하는 행들 (장바구니 하나 등)
+        self.future = Future()
+
+
+class WriteBatcher:
+    """쓰기 큐 + 백그라운드 저장 스레드 (프로세스당 하나, 첫 쓰기 때 시작)"""
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._stats = {"writes": 0, "rows": 0, "commits": 0, "retries": 0, "failures": 0}
+
+    def submit(self, kind, rows):
+        write = _Write(kind, list(rows))
+        if not write.rows:
+            write.future.set_result(0)
+            return write.future
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("writer가 이미 종료되었습니다.")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+            self._queue.put(write)
+        # 저장은 writer 스레드가 하지만, 넣은 세션이 자기 쓰기를 바로 읽도록 이 컨텍스트의 읽기를 잠깐 주 DB로
+        db.pin_reads_to_primary()
+        return write.future
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            if batch[0] is _STOP:
+                break
+            # 처음 것이 들어온 뒤 flush_interval 동안 들어온 쓰기를 같이 묶음
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                try:
+                    write = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if write is _STOP:
+                    stopping = True
+                    break
+                batch.append(write)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        written = set()
+        try:
+            written |= self._save(batch)
+        except Exception:
+            # 한 건 때문에 묶음 전체가 실패했을 수 있으니 하나씩 다시 (순서 유지)
+            self._count("retries")
+            for write in batch:
+                try:
+                    written |= self._save([write])
+                except Exception as e:
+                    self._count("failures")
+                    logger.exception("%s 저장 실패", write.kind)
+                    write.future.set_exception(e)
+                else:
+                    write.future.set_result(len(write.rows))
+        else:
+            for write in batch:
+                write.future.set_result(len(write.rows))
+        # 이미 커밋된 쓰기는 알림이 실패해도 다시 저장하면 안 됨 (주문/채팅이 두 번 들어감)
+        for kind in sorted(written):
+            try:
+                db.notify_write(kind)
+            except Exception:
+                logger.exception("%s 변경 알림 실패", kind)
+
+    def _save(self, batch):
+        """커밋까지만 하고 저장한 테이블 이름들을 돌려준다."""
+        orders = [row for write in batch if write.kind == "orders" for row in write.rows]
+        chat_messages = [row for write in batch if write.kind == "chat_messages" for row in write.rows]
+        db.save_write_batch(orders=orders, chat_messages=chat_messages, notify=False)
+        with self._lock:
+            self._stats["commits"] += 1
+            self._stats["writes"] += len(batch)
+            self._stats["rows"] += len(orders) + len(chat_messages)
+        return {kind for kind, rows in (("orders", orders), ("chat_messages", chat_messages)) if rows}
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def shutdown(self, timeout=None):
+        """새 쓰기를 막고 큐에 남은 쓰기를 전부 저장할 때까지 기다린다."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+
+
+_writer = WriteBatcher()
+atexit.register(_writer.shutdown)
+metrics.add_gauge_source(lambda: {f"db_writer_{name}": value for name, value in _writer.stats().items()})
+
+
+def submit_orders(orders):
+    """주문 여러 건(같이 저장되거나 같이 실패함)을 큐에 넣고 Future를 돌려준다.
+
+    orders: (먹을 사람, store_id, menu_id, 단가, 수량) 튜플의 리스트
+    """
+    return _writer.submit("orders", orders)
+
+def submit_order(eater, store_id, menu_id, price, quantity):
+    return submit_orders([(eater, store_id, menu_id, price, quantity)])
+
+def submit_chat(username, message):
+    return _writer.submit("chat_messages", [(username, message)])
+
+def get_writer_stats():
+    return _writer.stats()